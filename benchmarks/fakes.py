@@ -0,0 +1,158 @@
+"""
+Local stand-ins for the external services the pipeline talks to
+
+`FakeOpenRouter` serves `/chat/completions` (plain and streamed) from a fixed
+table of scripts, and `FakeCollection` is an in-memory replacement for the
+Mongo collections used by the repositories. Both are deterministic so runs on
+different machines process exactly the same inputs.
+"""
+
+import copy
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    server: "FakeOpenRouter"
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/chat/completions":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        prompt = body["messages"][-1]["content"]
+        text = self.server.scripts.get(prompt, self.server.default_script)
+        model = body.get("model", "fake")
+
+        time.sleep(self.server.latency_s)
+        if body.get("stream"):
+            self._stream(text, model)
+            return
+
+        payload = json.dumps(
+            {
+                "model": model,
+                "choices": [{"message": {"role": "assistant", "content": text}}],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, text: str, model: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        words = text.split(" ")
+        for index, word in enumerate(words):
+            delta = word if index == len(words) - 1 else word + " "
+            chunk = {"model": model, "choices": [{"delta": {"content": delta}}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            if self.server.token_interval_s:
+                time.sleep(self.server.token_interval_s)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeOpenRouter(ThreadingHTTPServer):
+    """OpenRouter-compatible completion server on localhost
+
+    The last user message selects the script; unknown prompts get
+    `default_script`. `latency_s` is added before every response and
+    `token_interval_s` between streamed words, to model a remote LLM.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        scripts: dict[str, str],
+        default_script: str = "",
+        latency_s: float = 0.0,
+        token_interval_s: float = 0.0,
+    ):
+        super().__init__(("127.0.0.1", 0), _CompletionHandler)
+        self.scripts = scripts
+        self.default_script = default_script
+        self.latency_s = latency_s
+        self.token_interval_s = token_interval_s
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeOpenRouter":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class _UpdateResult:
+    def __init__(self, matched_count: int):
+        self.matched_count = matched_count
+        self.modified_count = matched_count
+
+
+def _matches(doc: dict, query: dict) -> bool:
+    return all(doc.get(key) == value for key, value in query.items())
+
+
+def _set_path(doc: dict, dotted: str, value) -> None:
+    *parents, leaf = dotted.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = value
+
+
+class FakeCollection:
+    """In-memory async collection with the subset of the pymongo API we use
+
+    Supports equality filters, `insert_one`, `find_one` and `update_one` with
+    `$set` (dotted paths) and `$unset`.
+    """
+
+    def __init__(self):
+        self.docs: dict = {}
+
+    async def insert_one(self, doc: dict) -> _InsertOneResult:
+        if doc["_id"] in self.docs:
+            raise ValueError(f"Duplicate key: {doc['_id']}")
+        self.docs[doc["_id"]] = copy.deepcopy(doc)
+        return _InsertOneResult(doc["_id"])
+
+    async def find_one(self, query: dict, projection: Optional[dict] = None):
+        for doc in self.docs.values():
+            if _matches(doc, query):
+                return copy.deepcopy(doc)
+        return None
+
+    async def update_one(self, query: dict, update: dict) -> _UpdateResult:
+        for doc in self.docs.values():
+            if _matches(doc, query):
+                for path, value in update.get("$set", {}).items():
+                    _set_path(doc, path, copy.deepcopy(value))
+                for path in update.get("$unset", {}):
+                    doc.pop(path, None)
+                return _UpdateResult(1)
+        return _UpdateResult(0)
@@ -0,0 +1,97 @@
+"""
+Fixed benchmark inputs: scripts of several lengths and synthetic stock clips
+"""
+
+import subprocess
+from pathlib import Path
+
+# Neutral narration; sentences are cycled to reach each target length so the
+# scripts are identical on every machine
+SENTENCES = (
+    "Every night the lighthouse keeper climbed one hundred and twelve steps.",
+    "The lamp at the top had to be wound by hand every four hours.",
+    "If the clockwork stopped, the beam stopped turning, and ships lost their way.",
+    "Nobody in the village remembered a single night when the light went dark.",
+    "Then one winter a storm tore the door from its hinges and flooded the stairs.",
+    "The keeper tied a rope around his waist and climbed through freezing water.",
+    "He reached the lamp with minutes to spare and wound it until his hands bled.",
+    "Three fishing boats came home that night, guided by a light he refused to lose.",
+    "Reliability is rarely dramatic, but it is always somebody doing the work.",
+)
+
+# Name -> approximate word count (~150 spoken words per minute)
+SCRIPT_LENGTHS = {"short": 75, "medium": 150, "long": 300}
+
+
+def build_script(words: int) -> str:
+    """Repeat the fixed sentences until the script has at least `words` words"""
+    sentences: list[str] = []
+    count = 0
+    while count < words:
+        sentence = SENTENCES[len(sentences) % len(SENTENCES)]
+        sentences.append(sentence)
+        count += len(sentence.split())
+    # Paragraph breaks every three sentences, like real LLM output
+    paragraphs = [" ".join(sentences[i : i + 3]) for i in range(0, len(sentences), 3)]
+    return "\n\n".join(paragraphs)
+
+
+def scripts() -> dict[str, str]:
+    """The benchmark scripts by length name"""
+    return {name: build_script(words) for name, words in SCRIPT_LENGTHS.items()}
+
+
+def make_stock_clips(
+    directory: Path,
+    count: int = 2,
+    duration_s: float = 150.0,
+    ffmpeg: str = "ffmpeg",
+) -> list[Path]:
+    """
+    Render synthetic 1080p landscape clips with ffmpeg's test sources
+
+    Clips are only generated if missing, and have a keyframe every second like
+    typical stock footage.
+
+    Args:
+        directory: Stock videos directory to write into
+        count: Number of clips
+        duration_s: Length of each clip; must exceed the longest narration
+        ffmpeg: ffmpeg executable
+
+    Returns:
+        Paths of the clips
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    sources = ("testsrc2", "smptehdbars", "rgbtestsrc", "testsrc")
+    clips = []
+    for index in range(count):
+        path = directory / f"synthetic_{index}.mp4"
+        clips.append(path)
+        if path.exists():
+            continue
+        source = sources[index % len(sources)]
+        subprocess.run(
+            [
+                ffmpeg,
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-y",
+                "-f",
+                "lavfi",
+                "-i",
+                f"{source}=size=1920x1080:rate=30:duration={duration_s}",
+                "-c:v",
+                "libx264",
+                "-preset",
+                "ultrafast",
+                "-g",
+                "30",
+                "-pix_fmt",
+                "yuv420p",
+                str(path),
+            ],
+            check=True,
+        )
+    return clips
@@ -0,0 +1,112 @@
+"""
+Measure how long the API takes to import, and which heavy modules it pulls in
+
+Runs `import storytelling_videos.main` in fresh interpreters with
+`-X importtime` and reports the wall time, the slowest top-level packages and
+whether any ML/video dependency was imported at startup.
+
+    PYTHONPATH=. python benchmarks/import_time.py --runs 5 --budget-ms 1000
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Dependencies that must only be imported on first use or in worker processes
+HEAVY_MODULES = ("torch", "kokoro", "whisperx", "whisper", "moviepy", "soundfile")
+
+PROBE = """
+import json, sys
+import {module}
+print(json.dumps(sorted(m for m in {heavy!r} if m in sys.modules)))
+"""
+
+
+def measure_once(module: str) -> tuple[float, dict[str, int], list[str]]:
+    """
+    Import the module in a fresh interpreter
+
+    Returns:
+        Wall time in seconds, cumulative import time per top-level package in
+        microseconds, and the heavy modules that ended up imported
+    """
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            PROBE.format(module=module, heavy=HEAVY_MODULES),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    packages: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[12:].split("|")
+        cumulative = cumulative.strip()
+        # Nested imports are indented; keep only top-level ones
+        if not cumulative.isdigit() or name[1:].startswith(" "):
+            continue
+        top = name.strip().split(".")[0]
+        packages[top] = max(packages.get(top, 0), int(cumulative))
+
+    heavy = json.loads(proc.stdout.strip().splitlines()[-1])
+    return elapsed, packages, heavy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="storytelling_videos.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="Exit non-zero if the median import time exceeds this",
+    )
+    args = parser.parse_args()
+
+    timings = []
+    packages: dict[str, int] = {}
+    heavy: list[str] = []
+    for _ in range(args.runs):
+        elapsed, packages, heavy = measure_once(args.module)
+        timings.append(elapsed * 1000)
+
+    median = statistics.median(timings)
+    print(f"import {args.module}: {args.runs} runs")
+    print(
+        f"  wall ms  median {median:.0f}  min {min(timings):.0f}  "
+        f"max {max(timings):.0f}"
+    )
+    print("  slowest packages (cumulative ms, last run):")
+    for name, micros in sorted(packages.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"    {micros / 1000:8.1f}  {name}")
+
+    failed = False
+    if heavy:
+        print(f"  FAIL heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    else:
+        print(f"  ok   none of {', '.join(HEAVY_MODULES)} imported at startup")
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"  FAIL median {median:.0f} ms exceeds {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+"""
+Benchmark the pipeline stages and the full pipeline on CPU with local stand-ins
+
+Runs TTS (KokoroVoice), subtitles (WhisperXSubtitleGenerator), rendering
+(VideoGeneration) and the complete VideoPipeline against fixed scripts of
+several lengths and synthetic stock clips. OpenRouter is replaced by a local
+fake server and Mongo by an in-memory collection, or a real instance with
+`--mongo-uri`. Every timed run starts from an empty artifact store, so nothing
+is served from cache; models are loaded during untimed warm-up runs.
+
+    python benchmarks/pipeline_bench.py --runs 5 --save baseline.json
+    python benchmarks/pipeline_bench.py --runs 5 --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from fakes import FakeCollection, FakeOpenRouter
+from fixtures import make_stock_clips, scripts
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+STAGES = ("tts", "srt", "video", "pipeline")
+FAKE_MODEL = "bench/fake-llm"
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Linearly interpolated percentile of `values` (q in 0..100)"""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(timings: list[float]) -> dict:
+    """Latency distribution of one case, in seconds"""
+    summary = {f"p{q}": round(percentile(timings, q), 4) for q in PERCENTILES}
+    summary.update(
+        mean=round(statistics.fmean(timings), 4),
+        min=round(min(timings), 4),
+        max=round(max(timings), 4),
+    )
+    return summary
+
+
+def stage_medians(stage_metrics: list[dict]) -> dict:
+    """Median of every numeric value the stages reported (cpu_s, fps, ...)"""
+    values: dict[str, list[float]] = {}
+    for metrics in stage_metrics:
+        for name, value in metrics.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values.setdefault(name, []).append(value)
+    return {name: round(statistics.median(v), 4) for name, v in values.items()}
+
+
+def machine_info() -> dict:
+    """What the numbers were measured on; baselines only compare like for like"""
+    try:
+        ffmpeg = subprocess.run(
+            ["ffmpeg", "-version"], capture_output=True, text=True
+        ).stdout.splitlines()[0]
+    except (OSError, IndexError):
+        ffmpeg = None
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "ffmpeg": ffmpeg,
+    }
+
+
+def configure_environment(args: argparse.Namespace, base_url: str) -> None:
+    """Point the app at the stand-ins; must run before it is imported"""
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    os.environ["OPENROUTER_BASE_URL"] = base_url
+    os.environ["OPENROUTER_API"] = "bench"
+    os.environ["INFERENCE_SOCKET"] = ""
+    # Every pipeline run should pay the (fake) generation latency
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["MONGODB_URI"] = args.mongo_uri or "mongodb://localhost:27017"
+    os.environ["MONGODB_DB"] = "storytelling_bench"
+    for name in ("CLIENT_ID", "CLIENT_SECRET", "USER_AGENT"):
+        os.environ.setdefault(name, "bench")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.threads:
+        for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ[name] = str(args.threads)
+
+
+class Bench:
+    """Runs the selected cases in a scratch workspace and collects results"""
+
+    def __init__(self, args: argparse.Namespace, workdir: Path):
+        # Imported here so configure_environment() has taken effect
+        from storytelling_videos.core.config_core import settings
+        from storytelling_videos.models.job_schema import SubtitleMode
+
+        self.args = args
+        self.workdir = workdir
+        self.settings = settings
+        self.srt_mode = SubtitleMode(args.srt_mode)
+        self.scripts = scripts()
+        self.audio_s: dict[str, float] = {}
+        self.results: dict[str, dict] = {}
+        self.failures: dict[str, str] = {}
+        self._store_index = 0
+
+    def fresh_store(self) -> Path:
+        """Switch to an empty artifact store so the next run is uncached"""
+        self._store_index += 1
+        root = self.workdir / "artifacts" / f"run-{self._store_index}"
+        self.settings.ARTIFACTS_DIR = str(root)
+        return root
+
+    async def measure(
+        self, case: str, length: str, run: Callable[[], Awaitable[dict]]
+    ) -> None:
+        """Time `run` over warm-up and measured iterations
+
+        A run that raises fails the whole case; the error is recorded in
+        `failures` and the remaining cases still run.
+        """
+        from storytelling_videos.core.metrics import peak_rss_bytes
+
+        timings: list[float] = []
+        stage_metrics: list[dict] = []
+        for iteration in range(self.args.warmup + self.args.runs):
+            store = self.fresh_store()
+            started = time.perf_counter()
+            try:
+                result = await run()
+            except Exception as e:
+                self.failures[f"{case}/{length}"] = f"{type(e).__name__}: {e}"
+                print(f"  {case:<8} {length:<6} FAILED: {type(e).__name__}: {e}")
+                return
+            finally:
+                elapsed = time.perf_counter() - started
+                shutil.rmtree(store, ignore_errors=True)
+            if iteration < self.args.warmup:
+                continue
+            timings.append(elapsed)
+            stage_metrics.append(result.get("metrics", {}))
+
+        audio_s = self.audio_s[length]
+        summary = summarize(timings)
+        self.results[f"{case}/{length}"] = {
+            "runs": len(timings),
+            "audio_s": round(audio_s, 3),
+            "wall_s": summary,
+            # Seconds of narration handled per wall-clock second at the median
+            "x_realtime": round(audio_s / summary["p50"], 3),
+            "stage": stage_medians(stage_metrics),
+            "peak_rss_mb": round(peak_rss_bytes() / (1024 * 1024), 1),
+        }
+        print(
+            f"  {case:<8} {length:<6} p50 {summary['p50']:8.3f}s  "
+            f"p95 {summary['p95']:8.3f}s  {audio_s / summary['p50']:6.2f}x realtime"
+        )
+
+    def prepare(self, length: str) -> str:
+        """Synthesize narration and subtitles once for the later stages"""
+        from storytelling_videos.models.job_schema import SubtitleMode
+        from storytelling_videos.services.audio_buffer import AudioBuffer
+        from storytelling_videos.services.pipeline_service import VideoPipeline
+
+        script_uuid = f"bench-{length}"
+        self.settings.ARTIFACTS_DIR = str(self.workdir / "artifacts" / "setup")
+        pipeline = VideoPipeline(script_uuid, self.scripts[length])
+        # Kokoro mode also writes the subtitles the render stage burns in
+        result = pipeline.generate_tts(
+            voice=self.args.voice, subtitle_mode=SubtitleMode.KOKORO
+        )
+        self.audio_s[length] = AudioBuffer.from_file(
+            Path(result["audio_path"])
+        ).duration
+        return script_uuid
+
+    async def run(self, stages: list[str], lengths: list[str], stock: Path) -> None:
+        from storytelling_videos.models.database_schema import StoryDB
+        from storytelling_videos.models.job_schema import SubtitleMode
+        from storytelling_videos.repositories.mongodb_repo import MongoRepo
+        from storytelling_videos.services.openrouter_service import (
+            OpenRouterService,
+        )
+        from storytelling_videos.services.pipeline_service import VideoPipeline
+
+        args = self.args
+        for length in lengths:
+            script = self.scripts[length]
+            script_uuid = self.prepare(length)
+
+            async def tts() -> dict:
+                return VideoPipeline(f"{script_uuid}-tts", script).generate_tts(
+                    voice=args.voice, subtitle_mode=SubtitleMode.KOKORO
+                )
+
+            async def srt() -> dict:
+                return VideoPipeline(script_uuid, script).generate_srt(
+                    model_name=args.whisper_model, subtitle_mode=self.srt_mode
+                )
+
+            async def video() -> dict:
+                return VideoPipeline(script_uuid, script).generate_video(
+                    stock_video_path=str(stock), seed=args.seed
+                )
+
+            async def pipeline() -> dict:
+                repo = MongoRepo()
+                generation = await OpenRouterService.generate_story(
+                    prompt=length, model=FAKE_MODEL
+                )
+                story = await repo.post_to_mongodb(
+                    StoryDB(
+                        topic=length,
+                        content=generation.content,
+                        model=generation.model,
+                    )
+                )
+                story = await repo.get_from_mongodb(story.id)
+                return VideoPipeline(story.id, story.content).run_complete_pipeline(
+                    voice=args.voice,
+                    model_name=args.whisper_model,
+                    stock_video_path=str(stock),
+                    subtitle_mode=self.srt_mode,
+                    seed=args.seed,
+                )
+
+            cases = {"tts": tts, "srt": srt, "video": video, "pipeline": pipeline}
+            for stage in stages:
+                await self.measure(stage, length, cases[stage])
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """
+    Print median latency against a saved baseline
+
+    Returns:
+        Whether any case is slower than the baseline by more than `tolerance`
+    """
+    if baseline.get("machine") != machine_info():
+        print("  note: baseline was recorded on a different machine or toolchain")
+    regressed = False
+    print(f"  {'case':<16} {'p50':>9} {'baseline':>9} {'delta':>8}")
+    for case, result in results.items():
+        previous = baseline.get("results", {}).get(case)
+        if previous is None:
+            print(f"  {case:<16} {result['wall_s']['p50']:9.3f} {'-':>9}")
+            continue
+        now, before = result["wall_s"]["p50"], previous["wall_s"]["p50"]
+        delta = (now - before) / before if before else 0.0
+        flag = ""
+        if delta > tolerance:
+            flag = "  REGRESSION"
+            regressed = True
+        elif delta < -tolerance:
+            flag = "  faster"
+        print(f"  {case:<16} {now:9.3f} {before:9.3f} {delta:+8.1%}{flag}")
+    return regressed
+
+
+async def run_bench(args: argparse.Namespace, workdir: Path) -> Bench:
+    stock_dir = workdir / "stock_videos"
+    clips = make_stock_clips(stock_dir, count=args.stock_clips)
+
+    if not args.mongo_uri:
+        from storytelling_videos.repositories import mongodb_repo
+
+        stories = FakeCollection()
+        mongodb_repo.get_stories_collection = lambda: stories
+
+    bench = Bench(args, workdir)
+    try:
+        await bench.run(args.stages, args.lengths, clips[0])
+    finally:
+        from storytelling_videos.core.openrouter_core import close_openrouter_client
+
+        await close_openrouter_client()
+        if args.mongo_uri:
+            from storytelling_videos.core.mongodb_core import close_mongo_client
+
+            await close_mongo_client()
+    return bench
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument(
+        "--lengths",
+        nargs="+",
+        choices=tuple(scripts()),
+        default=list(scripts()),
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--voice", default="am_liam")
+    parser.add_argument("--whisper-model", default="tiny")
+    parser.add_argument(
+        "--srt-mode", choices=("kokoro", "align", "whisperx"), default="align"
+    )
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--stock-clips", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument(
+        "--llm-latency-ms",
+        type=float,
+        default=0.0,
+        help="Delay the fake OpenRouter adds before every response",
+    )
+    parser.add_argument(
+        "--mongo-uri", default=None, help="Use this Mongo instead of the fake"
+    )
+    parser.add_argument(
+        "--workdir", type=Path, default=None, help="Kept after the run if given"
+    )
+    parser.add_argument("--save", type=Path, default=None, help="Write results")
+    parser.add_argument(
+        "--baseline", type=Path, default=None, help="Compare against saved results"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Relative p50 slowdown that counts as a regression",
+    )
+    args = parser.parse_args()
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="storytelling-bench-"))
+    workdir = workdir.resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    fake_scripts = scripts()
+
+    with FakeOpenRouter(
+        fake_scripts, latency_s=args.llm_latency_ms / 1000
+    ) as openrouter:
+        configure_environment(args, openrouter.base_url)
+        # Output paths are relative to the working directory
+        previous_cwd = Path.cwd()
+        sys.path.insert(0, str(REPO_ROOT))
+        os.chdir(workdir)
+        try:
+            print(f"pipeline benchmark in {workdir} ({args.runs} runs per case)")
+            bench = asyncio.run(run_bench(args, workdir))
+        finally:
+            os.chdir(previous_cwd)
+            if args.workdir is None:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    # A partial report would read as a clean run (or skip the regression
+    # check for the failed cases), so failures end the suite here
+    if bench.failures:
+        print(f"{len(bench.failures)} case(s) failed:", file=sys.stderr)
+        for case, error in bench.failures.items():
+            print(f"  {case}: {error}", file=sys.stderr)
+        return 1
+
+    results = bench.results
+
+    report = {
+        "machine": machine_info(),
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("save", "baseline", "workdir", "mongo_uri")
+        },
+        "results": results,
+    }
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"results written to {args.save}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        print(f"compared with {args.baseline}:")
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,56 +1,214 @@
-from functools import lru_cache
-
-from pydantic import Field, field_validator
-from pydantic_settings import BaseSettings, SettingsConfigDict
-
-
-class Settings(BaseSettings):
-    """
-    Application-wide configuration.
-    """
-
-    # Core App Info
-    PROJECT_NAME: str = Field(default="StoryTelling", description="Project name")
-    ENVIRONMENT: str = Field(
-        default="dev", description="App environment: dev | qa | staging | production"
-    )
-    DEBUG: bool = Field(default=False, description="Enable debug mode for development")
-
-    # Database
-    MONGODB_URI: str = Field(..., description="MongoDB connection string")
-    MONGODB_DB: str = Field(default="mongo_sync", description="Mongo database name")
-
-    # OpenRouter
-    OPENROUTER_API: str = Field(..., description="OpenRouter API String")
-
-    CLIENT_ID: str = Field(..., description="reddit client id")
-    CLIENT_SECRET: str = Field(..., description="reddit client secret")
-    USER_AGENT: str = Field(..., description="reddit user agent")
-
-    # --- Logging / Monitoring ---
-    LOG_LEVEL: str = Field(
-        default="INFO",
-        description="Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)",
-    )
-
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        case_sensitive=False,  # Easier for Docker/Kubernetes environments
-        extra="ignore",  # Ignore unexpected env vars
-    )
-
-    @field_validator("MONGODB_URI")
-    @classmethod
-    def ensure_mongo_uri(cls, v: str) -> str:
-        if not (v.startswith("mongodb://") or v.startswith("mongodb+srv://")):
-            raise ValueError("MONGODB_URI must start with mongodb:// or mongodb+srv://")
-        return v
-
-
-@lru_cache(maxsize=1)
-def get_settings() -> Settings:
-    return Settings()
-
-
-settings = get_settings()
+from functools import lru_cache
+
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """
+    Application-wide configuration.
+    """
+
+    # Core App Info
+    PROJECT_NAME: str = Field(default="StoryTelling", description="Project name")
+    ENVIRONMENT: str = Field(
+        default="dev", description="App environment: dev | qa | staging | production"
+    )
+    DEBUG: bool = Field(default=False, description="Enable debug mode for development")
+
+    # Database
+    MONGODB_URI: str = Field(..., description="MongoDB connection string")
+    MONGODB_DB: str = Field(default="mongo_sync", description="Mongo database name")
+
+    # OpenRouter
+    OPENROUTER_API: str = Field(..., description="OpenRouter API String")
+    OPENROUTER_BASE_URL: str = Field(
+        default="https://openrouter.ai/api/v1",
+        description="OpenRouter API base URL (point at a local fake to benchmark)",
+    )
+
+    OPENROUTER_MAX_CONNECTIONS: int = Field(
+        default=20, description="Connection pool size of the OpenRouter client"
+    )
+    OPENROUTER_MAX_KEEPALIVE: int = Field(
+        default=10, description="Idle connections kept open to OpenRouter"
+    )
+    OPENROUTER_HTTP2: bool = Field(
+        default=False, description="Use HTTP/2 to OpenRouter (needs the h2 package)"
+    )
+    OPENROUTER_CONNECT_TIMEOUT: float = Field(
+        default=10.0, description="Connect and write timeout in seconds"
+    )
+    OPENROUTER_READ_TIMEOUT: float = Field(
+        default=180.0, description="Read timeout in seconds; long completions need it"
+    )
+    OPENROUTER_MAX_RETRIES: int = Field(
+        default=3, description="Retries on 408/429/5xx and transport errors"
+    )
+    OPENROUTER_RETRY_BASE_DELAY: float = Field(
+        default=1.0, description="First backoff in seconds, doubled per retry"
+    )
+    OPENROUTER_RETRY_MAX_DELAY: float = Field(
+        default=30.0, description="Longest backoff, including Retry-After"
+    )
+    OPENROUTER_MODEL_CONCURRENCY: int = Field(
+        default=4, description="Concurrent requests per model"
+    )
+    OPENROUTER_FALLBACK_MODEL: str = Field(
+        default="", description="Model for hedged requests; empty disables hedging"
+    )
+    OPENROUTER_HEDGE_AFTER_SECONDS: float = Field(
+        default=45.0,
+        description="Start the fallback model if the primary has not answered",
+    )
+
+    CLIENT_ID: str = Field(..., description="reddit client id")
+    CLIENT_SECRET: str = Field(..., description="reddit client secret")
+    USER_AGENT: str = Field(..., description="reddit user agent")
+
+    # --- LLM generation cache ---
+    LLM_CACHE_ENABLED: bool = Field(
+        default=False, description="Reuse generations for identical prompts"
+    )
+    LLM_CACHE_SIZE: int = Field(
+        default=512, description="Generations kept in the in-process LRU"
+    )
+    LLM_CACHE_TTL_SECONDS: int = Field(
+        default=7 * 24 * 3600, description="How long a cached generation is served"
+    )
+
+    # --- Streaming preview ---
+    STREAM_MIN_SENTENCE_CHARS: int = Field(
+        default=40,
+        description="Merge streamed sentences up to this length before TTS",
+    )
+
+    # --- Pipeline workers ---
+    TTS_WORKERS: int = Field(default=1, description="Worker threads for TTS jobs")
+    SRT_WORKERS: int = Field(
+        default=1, description="Worker threads for subtitle generation jobs"
+    )
+    VIDEO_WORKERS: int = Field(
+        default=2, description="Worker threads for video rendering jobs"
+    )
+    RENDER_PROCESSES: int = Field(
+        default=2, description="Worker processes for batch video renders"
+    )
+    WHISPERX_BATCH_SIZE: int = Field(
+        default=16, description="WhisperX batch size, shared across batch files"
+    )
+    JOB_LEASE_SECONDS: float = Field(
+        default=60.0,
+        description="How long a worker owns a job without renewing its lease",
+    )
+
+    # --- Model registry ---
+    MODEL_MEMORY_BUDGET_MB: int = Field(
+        default=4096,
+        description="Memory budget for loaded models before LRU eviction",
+    )
+
+    # --- Inference server ---
+    INFERENCE_SOCKET: str = Field(
+        default="",
+        description="Unix socket of the shared model server; empty runs in-process",
+    )
+    INFERENCE_AUTHKEY: str = Field(
+        default="",
+        description=(
+            "Shared secret for the model server; empty uses a random key the "
+            "server keeps next to its socket (<INFERENCE_SOCKET>.key)"
+        ),
+    )
+    INFERENCE_BATCH_WINDOW_MS: int = Field(
+        default=20, description="How long the model server collects a batch"
+    )
+    INFERENCE_BATCH_MAX: int = Field(
+        default=16, description="Maximum requests handled per model-server batch"
+    )
+
+    # --- Artifact cache ---
+    ARTIFACTS_DIR: str = Field(
+        default="artifacts", description="Root of the content-addressed artifact store"
+    )
+
+    # --- Video rendering ---
+    RENDER_ENGINE: str = Field(
+        default="ffmpeg", description="Video render engine: ffmpeg | moviepy"
+    )
+    FFMPEG_BINARY: str = Field(default="ffmpeg", description="ffmpeg executable")
+    FFPROBE_BINARY: str = Field(default="ffprobe", description="ffprobe executable")
+    RENDER_SEGMENTS: int = Field(
+        default=1,
+        description="Encode a video as up to this many parallel chunks; 1 disables",
+    )
+    RENDER_MIN_SEGMENT_SECONDS: float = Field(
+        default=5.0, description="Shortest chunk of a segmented render"
+    )
+    PROXY_GOP_SECONDS: float = Field(
+        default=1.0, description="Keyframe interval of pre-cropped stock proxies"
+    )
+    PREVIEW_WIDTH: int = Field(default=360, description="Width of draft previews")
+    PREVIEW_HEIGHT: int = Field(default=640, description="Height of draft previews")
+    PREVIEW_PRESET: str = Field(
+        default="ultrafast", description="x264 preset of draft previews"
+    )
+    CAPTION_FORMAT: str = Field(
+        default="ass",
+        description=(
+            "Burned-in captions: ass (phrase lines, karaoke) | overlay (the same "
+            "phrases pre-rasterized with Pillow) | srt (per word)"
+        ),
+    )
+    CAPTION_FONT_PATH: str = Field(
+        default="",
+        description=(
+            "TrueType font for overlay captions; unset tries the style font "
+            "(Arial), then DejaVu Sans / Liberation Sans, then Pillow's default"
+        ),
+    )
+    CAPTION_MAX_WORDS: int = Field(default=4, description="Most words per caption line")
+    CAPTION_MAX_CHARS: int = Field(
+        default=20, description="Most characters per caption line"
+    )
+    CAPTION_MAX_GAP_SECONDS: float = Field(
+        default=0.6, description="Pause that starts a new caption line"
+    )
+
+    # --- Logging / Monitoring ---
+    LOG_LEVEL: str = Field(
+        default="INFO",
+        description="Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)",
+    )
+    LOG_DIR: str = Field(
+        default="logs", description="Directory of the log files (one per process)"
+    )
+    LOG_FORMAT: str = Field(
+        default="text", description="Log file format: text | json (one object per line)"
+    )
+    LOG_FILE_MAX_MB: int = Field(
+        default=20, description="Rotate the log file once it reaches this size"
+    )
+    LOG_FILE_BACKUPS: int = Field(default=5, description="Rotated log files to keep")
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,  # Easier for Docker/Kubernetes environments
+        extra="ignore",  # Ignore unexpected env vars
+    )
+
+    @field_validator("MONGODB_URI")
+    @classmethod
+    def ensure_mongo_uri(cls, v: str) -> str:
+        if not (v.startswith("mongodb://") or v.startswith("mongodb+srv://")):
+            raise ValueError("MONGODB_URI must start with mongodb:// or mongodb+srv://")
+        return v
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings()
+
+
+settings = get_settings()
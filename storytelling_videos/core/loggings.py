@@ -1,46 +1,202 @@
-import logging
-import sys
-from pathlib import Path
-
-import colorlog
-
-
-def get_logger(name: str) -> logging.Logger:
-    """Get a configured logger instance with colored console output."""
-    logger = logging.getLogger(name)
-
-    if not logger.handlers:
-        logger.setLevel(logging.DEBUG)
-
-        # Console handler with color
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
-
-        console_formatter = colorlog.ColoredFormatter(
-            "%(log_color)s%(asctime)s - %(name)s - [%(levelname)s]%(reset)s %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-            log_colors={
-                "DEBUG": "cyan",
-                "INFO": "green",
-                "WARNING": "yellow",
-                "ERROR": "red",
-                "CRITICAL": "bold_red",
-            },
-        )
-        console_handler.setFormatter(console_formatter)
-
-        # File handler (no color)
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
-        file_handler = logging.FileHandler(log_dir / "app.log")
-        file_handler.setLevel(logging.DEBUG)
-        file_formatter = logging.Formatter(
-            fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
-        file_handler.setFormatter(file_formatter)
-
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
-
-    return logger
+"""
+Logging that never blocks the caller
+
+Every logger puts records on one queue; a background `QueueListener` owns the
+only console handler and the only (rotating) file handler. Records carry the
+id of the job they were logged for, taken from a context variable.
+
+Each process writes its own `app-<pid>.log`: uvicorn workers rotating one
+shared file would rename it under each other and lose records.
+"""
+
+import atexit
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import colorlog
+
+from storytelling_videos.core.config_core import settings
+
+APP_LOGGER = "storytelling_videos"
+
+# Pipeline job the current code runs for; set per job task and copied into
+# executor threads, so every record of a job can be filtered by its id
+job_id_var: ContextVar[Optional[str]] = ContextVar("job_id", default=None)
+
+_lock = threading.Lock()
+_handler: Optional[QueueHandler] = None
+_sinks: list[logging.Handler] = []
+_listeners: list[QueueListener] = []
+_worker_queue: Any = None
+# Loggers outside the package that were given the queue handler directly
+_external: list[logging.Logger] = []
+
+
+class JobContextFilter(logging.Filter):
+    """Tag records with the job id of the calling context"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Records forwarded from worker processes are already tagged
+        if not hasattr(record, "job_id"):
+            record.job_id = job_id_var.get()
+        record.job_tag = f"[job {record.job_id}] " if record.job_id else ""
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, e.g. `jq 'select(.job_id == "...")'`"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "job_id": getattr(record, "job_id", None),
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _build_sinks() -> list[logging.Handler]:
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(settings.LOG_LEVEL.upper())
+    console_handler.setFormatter(
+        colorlog.ColoredFormatter(
+            "%(log_color)s%(asctime)s - %(name)s - [%(levelname)s]%(reset)s "
+            "%(job_tag)s%(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+            log_colors={
+                "DEBUG": "cyan",
+                "INFO": "green",
+                "WARNING": "yellow",
+                "ERROR": "red",
+                "CRITICAL": "bold_red",
+            },
+        )
+    )
+
+    log_dir = Path(settings.LOG_DIR)
+    log_dir.mkdir(parents=True, exist_ok=True)
+    file_handler = RotatingFileHandler(
+        log_dir / f"app-{os.getpid()}.log",
+        maxBytes=settings.LOG_FILE_MAX_MB * 1024 * 1024,
+        backupCount=settings.LOG_FILE_BACKUPS,
+        encoding="utf-8",
+    )
+    file_handler.setLevel(logging.DEBUG)
+    if settings.LOG_FORMAT == "json":
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(
+            logging.Formatter(
+                fmt="%(asctime)s - %(name)s - %(levelname)s - %(job_tag)s%(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
+        )
+    return [console_handler, file_handler]
+
+
+def _start_listener(log_queue: Any) -> None:
+    listener = QueueListener(log_queue, *_sinks, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+
+def _install(handler: QueueHandler) -> None:
+    """Route the package logger (and external ones) to `handler`"""
+    global _handler
+    handler.addFilter(JobContextFilter())
+    for logger in (logging.getLogger(APP_LOGGER), *_external):
+        if _handler is not None:
+            logger.removeHandler(_handler)
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(handler)
+    _handler = handler
+
+
+def _configure() -> None:
+    if _handler is not None:
+        return
+    with _lock:
+        if _handler is not None:
+            return
+        _sinks.extend(_build_sinks())
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _start_listener(log_queue)
+        atexit.register(stop_logging)
+        _install(QueueHandler(log_queue))
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a logger that writes through the shared, non-blocking queue."""
+    _configure()
+    logger = logging.getLogger(name)
+    in_package = name == APP_LOGGER or name.startswith(APP_LOGGER + ".")
+    if not in_package and logger not in _external:
+        with _lock:
+            _external.append(logger)
+            logger.setLevel(logging.DEBUG)
+            logger.addHandler(_handler)
+    return logger
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener threads."""
+    with _lock:
+        while _listeners:
+            _listeners.pop().stop()
+
+
+def worker_log_queue() -> Any:
+    """
+    Queue for worker processes to send their records to this process
+
+    Pass it to `init_worker_logging` as a process pool initializer, so workers
+    log through the same console and file handlers instead of opening (and
+    rotating) the log file themselves.
+    """
+    global _worker_queue
+    _configure()
+    with _lock:
+        if _worker_queue is None:
+            _worker_queue = multiprocessing.get_context("spawn").Queue()
+            _start_listener(_worker_queue)
+        return _worker_queue
+
+
+def init_worker_logging(log_queue: Any) -> None:
+    """Process pool initializer: forward every record to the parent process."""
+    with _lock:
+        while _listeners:
+            _listeners.pop().stop()
+        _install(QueueHandler(log_queue))
+
+
+@contextmanager
+def bind_job_id(job_id: Optional[str]) -> Iterator[None]:
+    """Tag every record logged inside the block with `job_id`."""
+    token = job_id_var.set(job_id)
+    try:
+        yield
+    finally:
+        job_id_var.reset(token)
+
+
+def with_job_id(job_id: Optional[str], func: Callable, *args, **kwargs) -> Any:
+    """Call `func` with `job_id` bound; picklable, for process pools."""
+    with bind_job_id(job_id):
+        return func(*args, **kwargs)
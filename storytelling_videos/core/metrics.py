@@ -0,0 +1,296 @@
+"""
+In-process metrics in the Prometheus text exposition format
+"""
+
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# Wall-time buckets from a cached stage (ms) to a long render (minutes)
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+RATE_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250)
+
+
+def _label_key(labelnames: tuple[str, ...], labels: dict) -> tuple[str, ...]:
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)
+    )
+    return f"{{{pairs}}}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DURATION_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., sum, count]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                names = (*self.labelnames, "le")
+                for bound, count in zip(self.buckets, state):
+                    labels = _format_labels(names, (*key, f"{bound:g}"))
+                    lines.append(f"{self.name}_bucket{labels} {count:g}")
+                labels = _format_labels(names, (*key, "+Inf"))
+                lines.append(f"{self.name}_bucket{labels} {state[-1]:g}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {state[-2]}")
+                lines.append(f"{self.name}_count{labels} {state[-1]:g}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together for `/metrics`"""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.register(
+    Histogram(
+        "storytelling_stage_duration_seconds",
+        "Wall time of pipeline stages",
+        ("stage",),
+    )
+)
+STAGE_CPU = REGISTRY.register(
+    Histogram(
+        "storytelling_stage_cpu_seconds",
+        "CPU time of pipeline stages, including ffmpeg child processes",
+        ("stage",),
+    )
+)
+STAGE_FAILURES = REGISTRY.register(
+    Counter(
+        "storytelling_stage_failures_total",
+        "Pipeline stages that raised",
+        ("stage",),
+    )
+)
+STAGES_IN_PROGRESS = REGISTRY.register(
+    Gauge(
+        "storytelling_stages_in_progress",
+        "Pipeline stages currently running",
+        ("stage",),
+    )
+)
+PEAK_RSS = REGISTRY.register(
+    Gauge("storytelling_peak_rss_bytes", "Peak resident set size of this process")
+)
+TTS_SPEED = REGISTRY.register(
+    Histogram(
+        "storytelling_tts_audio_seconds_per_second",
+        "Seconds of audio synthesized per wall-clock second",
+        buckets=RATE_BUCKETS,
+    )
+)
+ALIGNMENT_RTF = REGISTRY.register(
+    Histogram(
+        "storytelling_alignment_realtime_factor",
+        "Subtitle processing time divided by audio duration",
+        ("mode",),
+        buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+    )
+)
+ENCODE_FPS = REGISTRY.register(
+    Histogram(
+        "storytelling_encode_fps",
+        "Frames encoded per wall-clock second",
+        ("engine",),
+        buckets=RATE_BUCKETS + (500, 1000),
+    )
+)
+LLM_CACHE_REQUESTS = REGISTRY.register(
+    Counter(
+        "storytelling_llm_cache_requests_total",
+        "Story generations by cache outcome",
+        ("result",),
+    )
+)
+OPENROUTER_RETRIES = REGISTRY.register(
+    Counter(
+        "storytelling_openrouter_retries_total",
+        "OpenRouter requests retried, by status code or transport error",
+        ("reason",),
+    )
+)
+OPENROUTER_HEDGES = REGISTRY.register(
+    Counter(
+        "storytelling_openrouter_hedges_total",
+        "Hedged generations by the model that answered first",
+        ("winner",),
+    )
+)
+
+
+def _cpu_seconds() -> float:
+    """CPU time of this process and its waited-for children (ffmpeg)"""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[dict]:
+    """
+    Measure one pipeline stage
+
+    Yields a dict that is filled with `wall_s`, `cpu_s` and `peak_rss_mb`
+    when the block exits; callers add stage-specific throughput to it. CPU
+    time is process-wide, so it includes any stage running concurrently.
+
+    Args:
+        stage: Stage name, used as the metric label
+    """
+    stats: dict = {"stage": stage}
+    STAGES_IN_PROGRESS.inc(stage=stage)
+    wall_start = time.perf_counter()
+    cpu_start = _cpu_seconds()
+    try:
+        yield stats
+    except BaseException:
+        STAGE_FAILURES.inc(stage=stage)
+        raise
+    finally:
+        STAGES_IN_PROGRESS.dec(stage=stage)
+        wall = time.perf_counter() - wall_start
+        cpu = _cpu_seconds() - cpu_start
+        rss = peak_rss_bytes()
+        stats.update(
+            wall_s=round(wall, 3),
+            cpu_s=round(cpu, 3),
+            peak_rss_mb=round(rss / (1024 * 1024), 1),
+        )
+        STAGE_DURATION.observe(wall, stage=stage)
+        STAGE_CPU.observe(cpu, stage=stage)
+        PEAK_RSS.set(rss)
+
+
+def observe_worker_stage(stats: dict) -> None:
+    """
+    Record a stage measured by `stage_timer` in a worker process
+
+    Metrics observed in a process pool worker stay in that worker's registry;
+    the parent replays the returned stats so `/metrics` still sees them.
+
+    Args:
+        stats: The dict yielded by `stage_timer` in the worker
+    """
+    stage = stats["stage"]
+    STAGE_DURATION.observe(stats["wall_s"], stage=stage)
+    STAGE_CPU.observe(stats["cpu_s"], stage=stage)
+    if "encode_fps" in stats:
+        ENCODE_FPS.observe(stats["encode_fps"], engine="ffmpeg")
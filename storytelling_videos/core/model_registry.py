@@ -0,0 +1,178 @@
+import gc
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelKey:
+    """Identity of one loaded model configuration."""
+
+    kind: str
+    name: str
+    lang: Optional[str] = None
+    device: Optional[str] = None
+    compute_type: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Entry:
+    model: Any
+    size_mb: float
+    loaded_at: float
+    last_used: float
+
+
+def estimate_size_mb(model: Any) -> Optional[float]:
+    """Sum parameter and buffer sizes of torch modules reachable from `model`."""
+    candidates = [model]
+    if isinstance(model, tuple):
+        candidates = list(model)
+    candidates += [getattr(c, "model", None) for c in candidates]
+
+    total = 0
+    seen: set[int] = set()
+    for candidate in candidates:
+        if candidate is None or not hasattr(candidate, "parameters"):
+            continue
+        if id(candidate) in seen:
+            continue
+        seen.add(id(candidate))
+        try:
+            total += sum(p.numel() * p.element_size() for p in candidate.parameters())
+            total += sum(b.numel() * b.element_size() for b in candidate.buffers())
+        except Exception:
+            continue
+    return total / (1024 * 1024) if total else None
+
+
+class ModelRegistry:
+    """Bounded LRU cache of loaded models keyed on (model, lang, device, compute)
+
+    Models are evicted least-recently-used first once the summed size estimate
+    exceeds the memory budget. Loads of the same key are serialized, loads of
+    different keys can run concurrently.
+    """
+
+    def __init__(self, budget_mb: float):
+        self.budget_mb = budget_mb
+        self._entries: "OrderedDict[ModelKey, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks: dict[ModelKey, threading.Lock] = {}
+
+    def get(
+        self,
+        key: ModelKey,
+        loader: Callable[[], Any],
+        size_mb: Optional[float] = None,
+    ) -> Any:
+        """
+        Return a loaded model, loading (and evicting) if needed
+
+        Args:
+            key: Model configuration
+            loader: Builds the model on a miss
+            size_mb: Size estimate, used when it cannot be measured from torch
+                parameters
+
+        Returns:
+            The model object
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.last_used = time.time()
+                self._entries.move_to_end(key)
+                return entry.model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return entry.model
+
+            logger.info(f"[Models] Loading {key}")
+            started = time.time()
+            model = loader()
+            measured = estimate_size_mb(model)
+            size = measured if measured is not None else (size_mb or 0.0)
+            logger.info(
+                f"[Models] Loaded {key.kind}:{key.name} "
+                f"(~{size:.0f} MB) in {time.time() - started:.1f}s"
+            )
+
+            with self._lock:
+                now = time.time()
+                self._entries[key] = _Entry(model, size, now, now)
+                self._evict_over_budget(keep=key)
+        return model
+
+    def unload(self, key: ModelKey) -> bool:
+        """Drop a model from the registry. Returns whether it was loaded."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        logger.info(f"[Models] Unloaded {key.kind}:{key.name}")
+        del entry
+        self._release_memory()
+        return True
+
+    def loaded(self) -> list[dict]:
+        """Describe loaded models, least recently used first."""
+        with self._lock:
+            return [
+                {
+                    **key.as_dict(),
+                    "size_mb": round(entry.size_mb, 1),
+                    "loaded_at": entry.loaded_at,
+                    "last_used": entry.last_used,
+                }
+                for key, entry in self._entries.items()
+            ]
+
+    def used_mb(self) -> float:
+        with self._lock:
+            return sum(entry.size_mb for entry in self._entries.values())
+
+    def _evict_over_budget(self, keep: ModelKey) -> None:
+        evicted = False
+        while self.used_mb() > self.budget_mb:
+            victim = next((k for k in self._entries if k != keep), None)
+            if victim is None:
+                logger.warning(
+                    f"[Models] {keep.kind}:{keep.name} alone exceeds the "
+                    f"{self.budget_mb} MB budget"
+                )
+                break
+            self._entries.pop(victim)
+            logger.info(f"[Models] Evicted {victim.kind}:{victim.name} (LRU)")
+            evicted = True
+        if evicted:
+            self._release_memory()
+
+    @staticmethod
+    def _release_memory() -> None:
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+@lru_cache(maxsize=1)
+def get_model_registry() -> ModelRegistry:
+    """Get or create the process-wide model registry."""
+    return ModelRegistry(budget_mb=settings.MODEL_MEMORY_BUDGET_MB)
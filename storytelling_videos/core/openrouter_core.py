@@ -1,19 +1,57 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from functools import lru_cache
+from typing import Awaitable, Callable, Optional, TypeVar
 
 import httpx
 
 from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.core.metrics import OPENROUTER_HEDGES, OPENROUTER_RETRIES
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Rate limits, timeouts and transient upstream errors; everything else is final
+RETRY_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 
 @lru_cache(maxsize=1)
 def get_openrouter_client() -> httpx.AsyncClient:
     """Get or create an OpenRouter API client."""
+    http2 = settings.OPENROUTER_HTTP2 and _http2_available()
+    if settings.OPENROUTER_HTTP2 and not http2:
+        logger.warning(
+            "OPENROUTER_HTTP2 is set but h2 is not installed, using HTTP/1.1"
+        )
     return httpx.AsyncClient(
-        base_url="https://openrouter.ai/api/v1",
+        base_url=settings.OPENROUTER_BASE_URL,
         headers={
             "Authorization": f"Bearer {settings.OPENROUTER_API}",
         },
-        timeout=30.0,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.OPENROUTER_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENROUTER_MAX_KEEPALIVE,
+        ),
+        # Completions can take minutes; only the read timeout is long
+        timeout=httpx.Timeout(
+            connect=settings.OPENROUTER_CONNECT_TIMEOUT,
+            read=settings.OPENROUTER_READ_TIMEOUT,
+            write=settings.OPENROUTER_CONNECT_TIMEOUT,
+            pool=settings.OPENROUTER_READ_TIMEOUT,
+        ),
     )
 
 
@@ -24,3 +62,133 @@ async def close_openrouter_client():
         await client.aclose()
     finally:
         get_openrouter_client.cache_clear()
+        _model_semaphores.clear()
+
+
+_model_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def model_semaphore(model: str) -> asyncio.Semaphore:
+    """Limit concurrent requests per model to OPENROUTER_MODEL_CONCURRENCY."""
+    semaphore = _model_semaphores.get(model)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.OPENROUTER_MODEL_CONCURRENCY)
+        _model_semaphores[model] = semaphore
+    return semaphore
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """
+    Backoff before retry number `attempt + 1`
+
+    Honors the server's Retry-After, otherwise exponential backoff with full
+    jitter so concurrent batch requests do not retry in lockstep. Both are
+    capped at OPENROUTER_RETRY_MAX_DELAY.
+    """
+    cap = settings.OPENROUTER_RETRY_MAX_DELAY
+    if response is not None:
+        after = _retry_after(response)
+        if after is not None:
+            return min(after, cap)
+    backoff = settings.OPENROUTER_RETRY_BASE_DELAY * 2**attempt
+    return random.uniform(0, min(cap, backoff))
+
+
+async def post_completion(payload: dict) -> dict:
+    """
+    POST a chat completion, retrying rate limits and transient failures
+
+    The request holds its model's concurrency slot while it backs off, so a
+    rate-limited model is not hit by other requests in the meantime.
+
+    Args:
+        payload: Chat completion request body
+
+    Returns:
+        Decoded JSON response
+
+    Raises:
+        httpx.HTTPStatusError: On a non-retryable status or after the last retry
+        httpx.TransportError: If the last attempt failed to connect or timed out
+    """
+    client = get_openrouter_client()
+    model = payload["model"]
+    retries = settings.OPENROUTER_MAX_RETRIES
+    attempt = 0
+    async with model_semaphore(model):
+        while True:
+            try:
+                response = await client.post("/chat/completions", json=payload)
+            except httpx.TransportError as e:
+                if attempt == retries:
+                    raise
+                reason, delay = type(e).__name__, retry_delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUS or attempt == retries:
+                    response.raise_for_status()
+                    return response.json()
+                reason = str(response.status_code)
+                delay = retry_delay(attempt, response)
+            attempt += 1
+            OPENROUTER_RETRIES.inc(reason=reason)
+            logger.warning(
+                f"OpenRouter {model} failed ({reason}), "
+                f"retry {attempt}/{retries} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+
+async def hedged(
+    primary: Callable[[], Awaitable[T]],
+    fallback: Callable[[], Awaitable[T]],
+    delay: float,
+) -> T:
+    """
+    Run `primary`, and also `fallback` if it has not finished after `delay`
+
+    The first successful result wins and the other request is cancelled. If
+    `primary` fails before the delay, `fallback` starts right away. When both
+    fail, the primary's error is raised.
+    """
+    first = asyncio.ensure_future(primary())
+    second: Optional[asyncio.Future] = None
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if first in done and first.exception() is None:
+            return first.result()
+
+        # Primary is slow, or already failed: start the fallback model
+        second = asyncio.ensure_future(fallback())
+        pending = {second} if first in done else {first, second}
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    winner = "primary" if task is first else "fallback"
+                    OPENROUTER_HEDGES.inc(winner=winner)
+                    return task.result()
+        raise first.exception()
+    finally:
+        for task in (first, second):
+            if task is not None and not task.done():
+                task.cancel()
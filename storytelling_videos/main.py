@@ -7,7 +7,11 @@ from storytelling_videos.core.config_core import settings
 from storytelling_videos.core.loggings import get_logger
 from storytelling_videos.core.mongodb_core import close_mongo_client, get_mongo_client
 from storytelling_videos.core.openrouter_core import close_openrouter_client
+from storytelling_videos.repositories.job_repo import JobRepo
+from storytelling_videos.repositories.mongodb_repo import MongoRepo
 from storytelling_videos.routers._base import router
+from storytelling_videos.services.job_service import get_job_manager
+from storytelling_videos.services.llm_cache_service import get_generation_cache
 
 logger = get_logger(__name__)
 
@@ -17,9 +21,17 @@ async def lifespan(app: FastAPI):
     logger.info("Starting StoryTelling Videos API.")
     # Startup phase
     get_mongo_client()
+    await MongoRepo().ensure_indexes()
+    await JobRepo().ensure_indexes()
+    if settings.LLM_CACHE_ENABLED:
+        await get_generation_cache().ensure_indexes()
+    job_manager = get_job_manager()
+    job_manager.start()
+    await job_manager.recover()
 
     yield
 
+    await job_manager.shutdown()
     await close_mongo_client()
     await close_openrouter_client()
 
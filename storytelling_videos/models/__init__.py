@@ -1,3 +1,50 @@
-from storytelling_videos.models.database_schema import StoryCreate, StoryDB, StoryResponse
+from storytelling_videos.models.database_schema import (
+    StoryCreate,
+    StoryDB,
+    StoryListResponse,
+    StoryResponse,
+    StorySummary,
+)
+from storytelling_videos.models.job_schema import (
+    BatchCreate,
+    BatchItem,
+    BatchResponse,
+    JobCreate,
+    JobDB,
+    JobResponse,
+    JobStatus,
+    StageCheckpoint,
+    SubtitleMode,
+)
+from storytelling_videos.models.model_schema import (
+    LoadedModel,
+    ModelKind,
+    ModelRegistryResponse,
+    ModelSpec,
+)
+from storytelling_videos.models.render_schema import RenderPlan, RenditionProfile
+from storytelling_videos.models.stock_schema import StockClip
 
-__all__ = ["StoryCreate", "StoryDB", "StoryResponse"]
+__all__ = [
+    "StoryCreate",
+    "StoryDB",
+    "StoryListResponse",
+    "StoryResponse",
+    "StorySummary",
+    "BatchCreate",
+    "BatchItem",
+    "BatchResponse",
+    "JobCreate",
+    "JobDB",
+    "JobResponse",
+    "JobStatus",
+    "StageCheckpoint",
+    "SubtitleMode",
+    "RenderPlan",
+    "RenditionProfile",
+    "StockClip",
+    "LoadedModel",
+    "ModelKind",
+    "ModelRegistryResponse",
+    "ModelSpec",
+]
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel, Field
 
@@ -11,6 +12,9 @@ class StoryCreate(BaseModel):
         "x-ai/grok-4.1-fast",
         description="Model to use for generation",
     )
+    bypass_cache: bool = Field(
+        False, description="Always call the model, even for a cached prompt"
+    )
 
 
 class StoryResponse(BaseModel):
@@ -23,6 +27,24 @@ class StoryResponse(BaseModel):
     created_at: datetime = Field(..., description="Creation timestamp")
 
 
+class StorySummary(BaseModel):
+    """Schema for a story in a listing, without its content."""
+
+    id: str = Field(..., description="Story ID")
+    topic: str = Field(..., description="Topic of the story")
+    model: str = Field(..., description="Model used")
+    created_at: datetime = Field(..., description="Creation timestamp")
+
+
+class StoryListResponse(BaseModel):
+    """Schema for one page of stories, newest first."""
+
+    items: list[StorySummary] = Field(default_factory=list)
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` for the next page; null on the last page"
+    )
+
+
 class StoryDB(BaseModel):
     """Schema for database storage."""
 
@@ -0,0 +1,138 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a pipeline job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class SubtitleMode(str, Enum):
+    """How word-level subtitles are produced."""
+
+    KOKORO = "kokoro"  # token timestamps from synthesis, alignment as fallback
+    ALIGN = "align"  # force-align the known script text, no ASR model
+    WHISPERX = "whisperx"  # full WhisperX transcription and alignment
+
+
+class JobCreate(BaseModel):
+    """Schema for submitting a pipeline job."""
+
+    script_uuid: str = Field(..., description="UUID of the story/script")
+    voice: str = Field("am_liam", description="Voice for TTS")
+    whisper_model: str = Field("tiny", description="Whisper model for subtitles")
+    speed: float = Field(1.0, description="Speech speed")
+    subtitle_mode: SubtitleMode = Field(
+        SubtitleMode.KOKORO, description="How word-level subtitles are produced"
+    )
+    stock_video_path: Optional[str] = Field(
+        None, description="Optional path to specific stock video"
+    )
+    seed: Optional[int] = Field(
+        None, description="Seed for the stock clip and start point choice"
+    )
+    preview: bool = Field(
+        False, description="Render a low-resolution draft and save its plan"
+    )
+
+
+class BatchItem(BaseModel):
+    """One video of a batch: an existing story or a prompt to generate one."""
+
+    script_uuid: Optional[str] = Field(None, description="UUID of an existing story")
+    prompt: Optional[str] = Field(None, description="Topic to generate a story for")
+    voice: Optional[str] = Field(None, description="Voice override for this item")
+    stock_video_path: Optional[str] = Field(
+        None, description="Optional path to specific stock video"
+    )
+    seed: Optional[int] = Field(
+        None, description="Seed for the stock clip and start point choice"
+    )
+    preview: bool = Field(
+        False, description="Render a low-resolution draft and save its plan"
+    )
+
+    @model_validator(mode="after")
+    def check_source(self) -> "BatchItem":
+        if (self.script_uuid is None) == (self.prompt is None):
+            raise ValueError("Set exactly one of script_uuid or prompt")
+        return self
+
+
+class BatchCreate(BaseModel):
+    """Schema for submitting many pipeline jobs that share model work."""
+
+    items: list[BatchItem] = Field(..., min_length=1, description="Videos to make")
+    model: str = Field(
+        "x-ai/grok-4.1-fast", description="Model to generate stories for prompts"
+    )
+    voice: str = Field("am_liam", description="Default voice for TTS")
+    whisper_model: str = Field("tiny", description="Whisper model for subtitles")
+    speed: float = Field(1.0, description="Speech speed")
+    subtitle_mode: SubtitleMode = Field(
+        SubtitleMode.KOKORO, description="How word-level subtitles are produced"
+    )
+
+
+class StageCheckpoint(BaseModel):
+    """Persisted state of one pipeline stage of a job."""
+
+    status: JobStatus = Field(..., description="running | completed | failed")
+    input_hash: str = Field(..., description="Hash of the stage's inputs")
+    outputs: dict[str, str] = Field(
+        default_factory=dict, description="Output file paths by name"
+    )
+    output_sha256: dict[str, str] = Field(
+        default_factory=dict, description="Content hash of each output file"
+    )
+    duration_s: Optional[float] = Field(None, description="Stage wall time")
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class JobDB(BaseModel):
+    """Schema for job storage."""
+
+    script_uuid: str
+    params: dict
+    batch_id: Optional[str] = None
+    checkpoints: dict[str, StageCheckpoint] = Field(default_factory=dict)
+    status: JobStatus = JobStatus.QUEUED
+    stage: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+class JobResponse(BaseModel):
+    """Schema for job status response."""
+
+    id: str = Field(..., description="Job ID")
+    script_uuid: str = Field(..., description="UUID of the story/script")
+    status: JobStatus = Field(..., description="Current job status")
+    stage: Optional[str] = Field(None, description="Stage currently running")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    batch_id: Optional[str] = Field(None, description="Batch the job belongs to")
+    checkpoints: dict[str, StageCheckpoint] = Field(
+        default_factory=dict, description="Per-stage checkpoints"
+    )
+    created_at: datetime = Field(..., description="Creation timestamp")
+    updated_at: datetime = Field(..., description="Last update timestamp")
+
+
+class BatchResponse(BaseModel):
+    """Schema for batch status response."""
+
+    id: str = Field(..., description="Batch ID")
+    status: JobStatus = Field(..., description="Overall batch status")
+    counts: dict[str, int] = Field(..., description="Number of jobs per status")
+    jobs: list[JobResponse] = Field(..., description="Jobs of the batch")
@@ -0,0 +1,49 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ModelKind(str, Enum):
+    """Model families held in the model registry."""
+
+    KOKORO = "kokoro"
+    WHISPERX = "whisperx"
+    WHISPERX_ALIGN = "whisperx_align"
+
+
+class ModelSpec(BaseModel):
+    """Schema identifying a model configuration to preload or unload."""
+
+    kind: ModelKind = Field(..., description="Model family")
+    name: Optional[str] = Field(
+        None, description="Whisper model name (whisperx only, default: tiny)"
+    )
+    lang: Optional[str] = Field(
+        None, description="Kokoro lang_code (default: a) or alignment language"
+    )
+    device: Optional[str] = Field(None, description="Device (default: auto)")
+    compute_type: Optional[str] = Field(
+        None, description="Compute type (whisperx only, default: int8)"
+    )
+
+
+class LoadedModel(BaseModel):
+    """Schema describing a model held in the registry."""
+
+    kind: str
+    name: str
+    lang: Optional[str] = None
+    device: Optional[str] = None
+    compute_type: Optional[str] = None
+    size_mb: float = Field(..., description="Estimated resident size")
+    loaded_at: float = Field(..., description="Load time (unix seconds)")
+    last_used: float = Field(..., description="Last use (unix seconds)")
+
+
+class ModelRegistryResponse(BaseModel):
+    """Schema for the model registry state."""
+
+    budget_mb: float
+    used_mb: float
+    models: list[LoadedModel]
@@ -0,0 +1,36 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class RenditionProfile(BaseModel):
+    """Schema for one export target: size, bitrates and container."""
+
+    name: str = Field(..., description="Profile name, used in the output file name")
+    width: int = Field(..., gt=0, description="Output width in pixels")
+    height: int = Field(..., gt=0, description="Output height in pixels")
+    video_bitrate_kbps: int = Field(..., gt=0, description="Target video bitrate")
+    audio_bitrate_kbps: int = Field(128, gt=0, description="AAC audio bitrate")
+    container: Literal["mp4", "mov", "mkv"] = Field(
+        "mp4", description="Output container"
+    )
+    codec: str = Field("libx264", description="Video encoder")
+    preset: str = Field("medium", description="Encoder preset")
+    fps: Optional[float] = Field(
+        None, description="Output frame rate (default: the source's)"
+    )
+
+
+class RenderPlan(BaseModel):
+    """Schema for the stock slice a preview committed to, reused by the final."""
+
+    script_uuid: str = Field(..., description="UUID of the story/script")
+    seed: int = Field(..., description="Seed the stock clip and start were drawn with")
+    stock_path: str = Field(..., description="Path to the source stock video")
+    stock_sha256: str = Field(..., description="Content hash of the stock video")
+    start: float = Field(..., description="Offset into the stock clip, in seconds")
+    duration: float = Field(..., description="Output length, in seconds")
+    audio_sha256: str = Field(..., description="Narration the plan was made for")
+    srt_sha256: Optional[str] = Field(
+        None, description="Subtitles the plan was made for"
+    )
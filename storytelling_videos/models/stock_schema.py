@@ -0,0 +1,26 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class StockClip(BaseModel):
+    """Probed metadata of one stock video in the library index."""
+
+    path: str = Field(..., description="Path to the source stock video")
+    size_bytes: int = Field(..., description="File size when probed")
+    mtime: float = Field(..., description="File modification time when probed")
+    content_hash: str = Field(..., description="SHA-256 of the file content")
+    duration: float = Field(..., description="Duration in seconds")
+    width: int = Field(..., description="Frame width in pixels")
+    height: int = Field(..., description="Frame height in pixels")
+    codec: str = Field(..., description="Video codec name")
+    fps: float = Field(..., description="Average frame rate")
+    keyframes: list[float] = Field(
+        default_factory=list, description="Keyframe timestamps in seconds"
+    )
+    proxy_path: Optional[str] = Field(
+        None, description="Pre-cropped 1080x1920 short-GOP intermediate"
+    )
+    proxy_keyframes: list[float] = Field(
+        default_factory=list, description="Keyframe timestamps of the proxy"
+    )
@@ -0,0 +1,185 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import uuid4
+
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.mongodb_core import get_jobs_collection
+from storytelling_videos.models.job_schema import (
+    JobDB,
+    JobResponse,
+    JobStatus,
+    StageCheckpoint,
+)
+
+
+def lease_expiry() -> datetime:
+    """When a lease taken or renewed now runs out (UTC, stored as a BSON date)"""
+    return datetime.now(timezone.utc) + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+
+
+class JobRepo:
+    def __init__(self):
+        self.collection = get_jobs_collection()
+
+    async def ensure_indexes(self) -> None:
+        """Create the indexes for batch listings and startup recovery."""
+        await self.collection.create_indexes(
+            [
+                IndexModel(
+                    [("batch_id", ASCENDING), ("created_at", ASCENDING)],
+                    name="batch_id_created_at",
+                    sparse=True,
+                ),
+                IndexModel([("status", ASCENDING)], name="status"),
+            ]
+        )
+
+    @staticmethod
+    def _to_response(doc: dict) -> JobResponse:
+        return JobResponse(
+            id=doc["_id"],
+            script_uuid=doc["script_uuid"],
+            status=doc["status"],
+            stage=doc.get("stage"),
+            error=doc.get("error"),
+            batch_id=doc.get("batch_id"),
+            checkpoints=doc.get("checkpoints") or {},
+            created_at=doc["created_at"],
+            updated_at=doc["updated_at"],
+        )
+
+    async def create_job(self, job_db: JobDB, owner: str) -> JobResponse:
+        """Persist a new job, leased to the worker that will run it."""
+        job_id = str(uuid4())
+        doc = job_db.model_dump(mode="json")
+        doc["_id"] = job_id
+        doc["owner"] = owner
+        doc["lease_expires_at"] = lease_expiry()
+        await self.collection.insert_one(doc)
+        return self._to_response(doc)
+
+    async def get_job_document(self, job_id: str) -> dict:
+        """Fetch the raw job document by id."""
+        doc = await self.collection.find_one({"_id": job_id})
+        if not doc:
+            raise ValueError(f"Job with id {job_id} not found.")
+        return doc
+
+    async def get_job(self, job_id: str) -> JobResponse:
+        """Fetch a job status by id."""
+        return self._to_response(await self.get_job_document(job_id))
+
+    async def get_batch_jobs(self, batch_id: str) -> list[JobResponse]:
+        """Fetch the jobs of a batch in submission order."""
+        cursor = self.collection.find({"batch_id": batch_id}).sort("created_at", 1)
+        return [self._to_response(doc) async for doc in cursor]
+
+    async def update_job(
+        self,
+        job_id: str,
+        status: Optional[JobStatus] = None,
+        stage: Optional[str] = None,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Update the mutable fields of a job."""
+        fields: dict = {"updated_at": datetime.now().isoformat()}
+        if status is not None:
+            fields["status"] = status.value
+        if stage is not None:
+            fields["stage"] = stage
+        if result is not None:
+            fields["result"] = result
+        if error is not None:
+            fields["error"] = error
+        await self.collection.update_one({"_id": job_id}, {"$set": fields})
+
+    async def update_checkpoint(
+        self, job_id: str, stage: str, checkpoint: StageCheckpoint
+    ) -> None:
+        """Record the state of one stage of a job."""
+        await self.collection.update_one(
+            {"_id": job_id},
+            {
+                "$set": {
+                    f"checkpoints.{stage}": checkpoint.model_dump(mode="json"),
+                    "updated_at": datetime.now().isoformat(),
+                }
+            },
+        )
+
+    async def requeue_job(self, job_id: str, owner: str) -> bool:
+        """Move a failed job back to queued under `owner`'s lease.
+
+        Returns False if it was not failed.
+        """
+        result = await self.collection.update_one(
+            {"_id": job_id, "status": JobStatus.FAILED.value},
+            {
+                "$set": {
+                    "status": JobStatus.QUEUED.value,
+                    "owner": owner,
+                    "lease_expires_at": lease_expiry(),
+                    "updated_at": datetime.now().isoformat(),
+                },
+                "$unset": {"error": ""},
+            },
+        )
+        return result.modified_count > 0
+
+    async def renew_leases(self, job_ids: list[str], owner: str) -> int:
+        """Extend `owner`'s lease on its jobs. Returns how many it still holds."""
+        if not job_ids:
+            return 0
+        result = await self.collection.update_many(
+            {"_id": {"$in": job_ids}, "owner": owner},
+            {"$set": {"lease_expires_at": lease_expiry()}},
+        )
+        return result.modified_count
+
+    async def owned_jobs(self, job_ids: list[str], owner: str) -> set[str]:
+        """The jobs among `job_ids` whose lease `owner` still holds."""
+        cursor = self.collection.find(
+            {"_id": {"$in": job_ids}, "owner": owner}, {"_id": 1}
+        )
+        return {doc["_id"] async for doc in cursor}
+
+    async def release_leases(self, job_ids: list[str], owner: str) -> None:
+        """Give up `owner`'s lease so another worker can resume the jobs now."""
+        if not job_ids:
+            return
+        await self.collection.update_many(
+            {"_id": {"$in": job_ids}, "owner": owner},
+            {"$unset": {"owner": "", "lease_expires_at": ""}},
+        )
+
+    async def claim_unfinished_jobs(self, owner: str) -> list[dict]:
+        """
+        Claim queued or running jobs whose lease has run out
+
+        A job is leased to the worker running it, which renews the lease while
+        it works, so only jobs of a dead or stopped worker are claimed. Each
+        claim is a compare-and-set on the expired lease, so when several
+        workers look at once every job is resumed by only one of them.
+        """
+        claimed = []
+        unfinished = [JobStatus.QUEUED.value, JobStatus.RUNNING.value]
+        # Jobs from before leases were recorded have none, and count as expired
+        expired = {
+            "$or": [
+                {"lease_expires_at": None},
+                {"lease_expires_at": {"$lt": datetime.now(timezone.utc)}},
+            ]
+        }
+        query = {"status": {"$in": unfinished}, **expired}
+        async for doc in self.collection.find(query, {"_id": 1}):
+            doc = await self.collection.find_one_and_update(
+                {"_id": doc["_id"], **query},
+                {"$set": {"owner": owner, "lease_expires_at": lease_expiry()}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if doc is not None:
+                claimed.append(doc)
+        return claimed
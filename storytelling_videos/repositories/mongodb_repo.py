@@ -1,16 +1,72 @@
+import base64
+import binascii
+import json
+from typing import Optional
 from uuid import uuid4
 
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
 from storytelling_videos.core.mongodb_core import get_stories_collection
-from storytelling_videos.models.database_schema import StoryDB, StoryResponse
+from storytelling_videos.models.database_schema import (
+    StoryDB,
+    StoryListResponse,
+    StoryResponse,
+    StorySummary,
+)
+
+# Listing order; `_id` breaks ties between stories created at the same instant
+LIST_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+# Everything a listing returns; leaves out `content` and `metrics`
+LIST_PROJECTION = {"topic": 1, "model": 1, "created_at": 1}
+
+
+def encode_cursor(created_at: str, story_id: str) -> str:
+    """Opaque keyset cursor for the story after which the next page starts."""
+    raw = json.dumps([created_at, story_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    """Inverse of `encode_cursor`. Raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, story_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(created_at, str) or not isinstance(story_id, str):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return created_at, story_id
 
 
 class MongoRepo:
     def __init__(self):
         self.collection = get_stories_collection()
 
-    async def post_to_mongodb(self, story_db: StoryDB) -> StoryResponse:
-        """Create a new story in the database."""
-        story_id = str(uuid4())
+    async def ensure_indexes(self) -> None:
+        """
+        Create the indexes the listing queries rely on
+
+        Each filter gets an index with the equality field first and the sort
+        keys after it, so a page is an index range scan of `limit` entries
+        whatever the collection size. Existing indexes are left as they are.
+        """
+        await self.collection.create_indexes(
+            [
+                IndexModel(LIST_SORT, name="created_at_id"),
+                IndexModel(
+                    [("model", ASCENDING), *LIST_SORT], name="model_created_at_id"
+                ),
+                IndexModel(
+                    [("topic", ASCENDING), *LIST_SORT], name="topic_created_at_id"
+                ),
+            ]
+        )
+
+    async def post_to_mongodb(
+        self, story_db: StoryDB, story_id: Optional[str] = None
+    ) -> StoryResponse:
+        """Create a new story in the database, optionally with a pre-assigned id."""
+        story_id = story_id or str(uuid4())
         doc = story_db.model_dump(mode="json")
         doc["_id"] = story_id
         await self.collection.insert_one(doc)
@@ -23,6 +79,72 @@ class MongoRepo:
             created_at=story_db.created_at,
         )
 
+    async def record_metrics(self, story_id: str, job_id: str, stats: dict) -> None:
+        """Store one stage's metrics on the story, keyed by job and stage."""
+        await self.collection.update_one(
+            {"_id": story_id},
+            {"$set": {f"metrics.{job_id}.{stats['stage']}": stats}},
+        )
+
+    async def list_stories(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        model: Optional[str] = None,
+        topic: Optional[str] = None,
+    ) -> StoryListResponse:
+        """
+        List stories newest first, one keyset-paginated page at a time
+
+        Args:
+            limit: Page size
+            cursor: `next_cursor` of the previous page
+            model: Only stories generated by this model
+            topic: Only stories with exactly this topic
+
+        Returns:
+            The page and the cursor of the next one
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query: dict = {}
+        if model is not None:
+            query["model"] = model
+        if topic is not None:
+            query["topic"] = topic
+        if cursor is not None:
+            created_at, story_id = decode_cursor(cursor)
+            # Strictly after the cursor in (created_at, _id) descending order
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": story_id}},
+            ]
+
+        # One extra document tells whether there is a next page
+        docs = await (
+            self.collection.find(query, LIST_PROJECTION)
+            .sort(LIST_SORT)
+            .limit(limit + 1)
+            .to_list(limit + 1)
+        )
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+        return StoryListResponse(
+            items=[
+                StorySummary(
+                    id=doc["_id"],
+                    topic=doc["topic"],
+                    model=doc["model"],
+                    created_at=doc["created_at"],
+                )
+                for doc in docs
+            ],
+            next_cursor=next_cursor,
+        )
+
     async def get_from_mongodb(self, uuid: str) -> StoryResponse:
         """Fetch a story from the database by uuid."""
         doc = await self.collection.find_one({"_id": uuid})
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
 from storytelling_videos.routers.kokoro_tts_router import router as KokoroRouter
+from storytelling_videos.routers.metrics_router import router as MetricsRouter
+from storytelling_videos.routers.models_router import router as ModelsRouter
 from storytelling_videos.routers.mongo_router import router as MongoRouter
 from storytelling_videos.routers.orchestrate_router import router as OrchestrateRouter
 from storytelling_videos.routers.srt_router import router as SRTRouter
@@ -13,5 +15,7 @@ router.include_router(KokoroRouter, prefix="/tts", tags=["TTS"])
 router.include_router(SRTRouter, prefix="/srt", tags=["subtitles"])
 router.include_router(VideoGenRouter, prefix="/videos", tags=["videos"])
 router.include_router(OrchestrateRouter, prefix="/pipeline", tags=["pipeline"])
+router.include_router(ModelsRouter, prefix="/models", tags=["models"])
+router.include_router(MetricsRouter, tags=["metrics"])
 
 __all__ = ["router"]
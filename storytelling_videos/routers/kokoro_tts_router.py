@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 
 from storytelling_videos.core.loggings import get_logger
-from storytelling_videos.models import StoryResponse
+from storytelling_videos.models import StoryResponse, SubtitleMode
 from storytelling_videos.repositories.mongodb_repo import MongoRepo
 from storytelling_videos.services.preprocess_text_service import add_pauses
 from storytelling_videos.services.voice_kokoro_service import KokoroVoice
@@ -13,8 +13,14 @@ mongo_class = MongoRepo()
 
 
 @router.post("/generate_tts", response_model=StoryResponse)
-async def generate_tts(script_uuid: str) -> StoryResponse:
-    """Generate TTS audio from a stored story."""
+async def generate_tts(
+    script_uuid: str, subtitle_mode: SubtitleMode = SubtitleMode.KOKORO
+) -> StoryResponse:
+    """Generate TTS audio from a stored story.
+
+    With `subtitle_mode=kokoro` the word-level SRT is written from the
+    synthesis timestamps in the same pass.
+    """
     try:
         story: StoryResponse = await mongo_class.get_from_mongodb(script_uuid)
         script = story.content
@@ -27,7 +33,8 @@ async def generate_tts(script_uuid: str) -> StoryResponse:
             speed=1,
         )
         generator = kokoro.synthesize()
-        kokoro.save_audio(generator=generator)
+        srt_path = kokoro.srt_path if subtitle_mode == SubtitleMode.KOKORO else None
+        kokoro.save_audio(generator=generator, srt_path=srt_path)
         return story
     except Exception as e:
         logger.error(f"Error generating TTS: {str(e)}")
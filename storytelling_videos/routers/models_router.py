@@ -0,0 +1,58 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.models import ModelRegistryResponse, ModelSpec
+from storytelling_videos.services import model_service
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get("", response_model=ModelRegistryResponse)
+async def list_models() -> ModelRegistryResponse:
+    """List loaded models with their estimated memory use and the budget."""
+    try:
+        state = await run_in_threadpool(model_service.list_models)
+        return ModelRegistryResponse(**state)
+    except Exception as e:
+        logger.error(f"Failed to list models: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/preload", response_model=ModelRegistryResponse)
+async def preload_model(spec: ModelSpec) -> ModelRegistryResponse:
+    """Load a model ahead of the first request that needs it.
+
+    Args:
+        spec: Model kind plus optional name, language, device and compute type
+
+    Returns:
+        Registry state after loading (least recently used models may have been
+        evicted to stay within MODEL_MEMORY_BUDGET_MB)
+    """
+    try:
+        state = await run_in_threadpool(model_service.preload_model, spec)
+        return ModelRegistryResponse(**state)
+    except Exception as e:
+        logger.error(f"Failed to preload {spec.kind.value}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/unload")
+async def unload_model(spec: ModelSpec) -> dict:
+    """Drop a model from memory.
+
+    Args:
+        spec: Model kind plus optional name, language, device and compute type
+
+    Returns:
+        Whether the model was loaded
+    """
+    try:
+        unloaded = await run_in_threadpool(model_service.unload_model, spec)
+        return {"kind": spec.kind.value, "unloaded": unloaded}
+    except Exception as e:
+        logger.error(f"Failed to unload {spec.kind.value}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from uuid import uuid4
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from storytelling_videos.core.loggings import get_logger
-from storytelling_videos.models import StoryCreate, StoryDB, StoryResponse
+from storytelling_videos.models import (
+    StoryCreate,
+    StoryDB,
+    StoryListResponse,
+    StoryResponse,
+)
 from storytelling_videos.repositories.mongodb_repo import MongoRepo
 from storytelling_videos.services.openrouter_service import OpenRouterService
+from storytelling_videos.services.story_stream_service import StoryStream
 
 logger = get_logger(__name__)
 
@@ -18,16 +28,17 @@ async def generate_story(story_create: StoryCreate) -> StoryResponse:
     """
     try:
         # Generate story from OpenRouter API
-        content = await OpenRouterService.generate_story(
+        story = await OpenRouterService.generate_story(
             prompt=story_create.prompt,
             model=story_create.model,
+            bypass_cache=story_create.bypass_cache,
         )
 
-        # Save to database
+        # Save to database, under the model that wrote it
         story_db = StoryDB(
             topic=story_create.prompt,
-            content=content,
-            model=story_create.model,
+            content=story.content,
+            model=story.model,
         )
         response = await mongo_class.post_to_mongodb(story_db=story_db)
         logger.info(f"Story generated and saved: {response.id}")
@@ -37,6 +48,85 @@ async def generate_story(story_create: StoryCreate) -> StoryResponse:
         raise
 
 
+@router.post("/generate_script/stream")
+async def generate_story_stream(
+    story_create: StoryCreate, voice: str = "am_liam", speed: float = 1.0
+) -> StreamingResponse:
+    """Generate a story and stream its narration while it is being written.
+
+    Sentences are sent to Kokoro as soon as the LLM finishes them, so audio
+    starts before the completion is done. The story is saved once the stream
+    completes; its id is returned up front in the `X-Story-Id` header.
+
+    Args:
+        story_create: Prompt and model
+        voice: Kokoro voice
+        speed: Speech speed
+
+    Returns:
+        Streaming WAV (16-bit PCM, 24 kHz mono)
+    """
+    story_id = str(uuid4())
+    stream = StoryStream(
+        prompt=story_create.prompt,
+        model=story_create.model,
+        voice=voice,
+        speed=speed,
+    )
+
+    async def body():
+        try:
+            async for chunk in stream.wav_bytes():
+                yield chunk
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated stream
+            logger.error(f"Error streaming story {story_id}: {str(e)}")
+            raise
+        story_db = StoryDB(
+            topic=story_create.prompt,
+            content=stream.text,
+            model=story_create.model,
+        )
+        await mongo_class.post_to_mongodb(story_db=story_db, story_id=story_id)
+        logger.info(f"Streamed story saved: {story_id}")
+
+    return StreamingResponse(
+        body(), media_type="audio/wav", headers={"X-Story-Id": story_id}
+    )
+
+
+@router.get("", response_model=StoryListResponse)
+async def list_stories(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    model: Optional[str] = None,
+    topic: Optional[str] = None,
+) -> StoryListResponse:
+    """List stories newest first, without their content.
+
+    Pages are keyset-paginated: pass the `next_cursor` of a page as `cursor`
+    to get the next one.
+
+    Args:
+        limit: Page size
+        cursor: Cursor returned by the previous page
+        model: Only stories generated by this model
+        topic: Only stories with exactly this topic
+
+    Returns:
+        Story summaries and the next cursor
+    """
+    try:
+        return await mongo_class.list_stories(
+            limit=limit, cursor=cursor, model=model, topic=topic
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing stories: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/{story_id}", response_model=StoryResponse)
 async def get_story(story_uuid: str) -> StoryResponse:
     """Get a story by ID."""
@@ -1,47 +1,74 @@
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, status
 
 from storytelling_videos.core.loggings import get_logger
-from storytelling_videos.models import StoryResponse
+from storytelling_videos.models import (
+    BatchCreate,
+    BatchResponse,
+    JobCreate,
+    JobResponse,
+    JobStatus,
+    StoryResponse,
+    SubtitleMode,
+)
+from storytelling_videos.repositories.job_repo import JobRepo
 from storytelling_videos.repositories.mongodb_repo import MongoRepo
-from storytelling_videos.services.pipeline_service import VideoPipeline
+from storytelling_videos.services.job_service import get_job_manager
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 mongo_class = MongoRepo()
+job_repo = JobRepo()
 
 
-@router.post("/orchestrate")
+@router.post(
+    "/orchestrate",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def orchestrate_video_generation(
     script_uuid: str,
     voice: str = "am_liam",
     whisper_model: str = "tiny",
     speed: float = 1.0,
     stock_video_path: Optional[str] = None,
-) -> dict:
+    subtitle_mode: SubtitleMode = SubtitleMode.KOKORO,
+    seed: Optional[int] = None,
+    preview: bool = False,
+) -> JobResponse:
     """
-    Orchestrate the complete video generation pipeline.
+    Submit the complete video generation pipeline as a background job.
 
-    This endpoint handles the entire workflow:
+    The job runs the entire workflow off the event loop:
     1. Fetch story from MongoDB
     2. Generate TTS audio from story content
-    3. Generate word-level SRT subtitles using WhisperX
+    3. Generate word-level SRT subtitles (Kokoro timestamps, alignment or WhisperX)
     4. Generate final video with embedded subtitles
 
+    Poll `/pipeline/jobs/{job_id}` for progress and fetch the generated file
+    paths from `/pipeline/jobs/{job_id}/result`.
+
     Args:
         script_uuid: UUID of the story/script
         voice: Voice for TTS (default: am_liam)
         whisper_model: Whisper model for subtitles (default: tiny)
         speed: Speech speed (default: 1.0)
         stock_video_path: Optional path to specific stock video
+        subtitle_mode: `kokoro` builds subtitles from the TTS timestamps and
+            falls back to forced alignment; `align` force-aligns the script
+            text; `whisperx` always transcribes the audio
+        seed: Optional seed for the stock clip and start point choice; makes
+            the render reproducible and cacheable
+        preview: Render a fast 360x640 draft; the next final render reuses
+            its stock slice and start point
 
     Returns:
-        Dictionary with all generated file paths and completion status
+        The queued job
     """
     try:
-        logger.info(f"[Orchestrate] Starting video generation for {script_uuid}")
+        logger.info(f"[Orchestrate] Submitting video generation for {script_uuid}")
 
         # Fetch story from database
         try:
@@ -51,21 +78,17 @@ async def orchestrate_video_generation(
                 status_code=404, detail=f"Story with UUID {script_uuid} not found"
             )
 
-        # Create and run pipeline
-        pipeline = VideoPipeline(script_uuid=script_uuid, script_content=story.content)
-
-        result = pipeline.run_complete_pipeline(
+        job_create = JobCreate(
+            script_uuid=script_uuid,
             voice=voice,
-            model_name=whisper_model,
+            whisper_model=whisper_model,
             speed=speed,
             stock_video_path=stock_video_path,
+            subtitle_mode=subtitle_mode,
+            seed=seed,
+            preview=preview,
         )
-
-        logger.info(
-            f"[Orchestrate] Video generation completed successfully for {script_uuid}"
-        )
-
-        return result
+        return await get_job_manager().submit(job_create, story.content)
 
     except HTTPException:
         raise
@@ -75,3 +98,148 @@ async def orchestrate_video_generation(
             status_code=500,
             detail=f"Error during video generation orchestration: {str(e)}",
         )
+
+
+@router.post(
+    "/batch",
+    response_model=BatchResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def orchestrate_batch(batch_create: BatchCreate) -> BatchResponse:
+    """
+    Submit many videos at once as one batch of pipeline jobs.
+
+    Items reference an existing story (`script_uuid`) or a `prompt` to
+    generate one. The batch runs stage by stage so model work is shared:
+    TTS is grouped by voice, WhisperX transcribes all files in shared batches
+    and renders run in a process pool. Every item also gets its own job,
+    pollable at `/pipeline/jobs/{job_id}`.
+
+    Args:
+        batch_create: Items plus the parameters they share
+
+    Returns:
+        The queued batch
+    """
+    try:
+        contents: dict[str, str] = {}
+        for item in batch_create.items:
+            if item.script_uuid is None or item.script_uuid in contents:
+                continue
+            try:
+                story = await mongo_class.get_from_mongodb(item.script_uuid)
+            except ValueError:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Story with UUID {item.script_uuid} not found",
+                )
+            contents[item.script_uuid] = story.content
+
+        batch_id = await get_job_manager().submit_batch(batch_create, contents)
+        return await get_batch_status(batch_id)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"[Orchestrate] Error submitting batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error submitting batch: {str(e)}")
+
+
+@router.get("/batches/{batch_id}", response_model=BatchResponse)
+async def get_batch_status(batch_id: str) -> BatchResponse:
+    """Get the status of every job in a batch."""
+    jobs = await job_repo.get_batch_jobs(batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+
+    counts = {s.value: 0 for s in JobStatus}
+    for job in jobs:
+        counts[job.status.value] += 1
+
+    if counts[JobStatus.QUEUED.value] == len(jobs):
+        batch_status = JobStatus.QUEUED
+    elif counts[JobStatus.QUEUED.value] or counts[JobStatus.RUNNING.value]:
+        batch_status = JobStatus.RUNNING
+    elif counts[JobStatus.COMPLETED.value]:
+        batch_status = JobStatus.COMPLETED
+    else:
+        batch_status = JobStatus.FAILED
+
+    return BatchResponse(id=batch_id, status=batch_status, counts=counts, jobs=jobs)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: str) -> JobResponse:
+    """Get the status of a pipeline job."""
+    try:
+        return await job_repo.get_job(job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+
+@router.post(
+    "/jobs/{job_id}/resume",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def resume_job(job_id: str) -> JobResponse:
+    """
+    Restart a failed job from its first incomplete stage.
+
+    Stages with a completed checkpoint whose inputs are unchanged and whose
+    output files are intact are reused, not run again.
+    """
+    try:
+        doc = await job_repo.get_job_document(job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if doc["status"] != JobStatus.FAILED.value:
+        raise HTTPException(
+            status_code=409, detail=f"Job {job_id} is {doc['status']}, not failed"
+        )
+
+    try:
+        story: StoryResponse = await mongo_class.get_from_mongodb(doc["script_uuid"])
+        content = story.content
+    except ValueError:
+        if not doc["params"].get("prompt"):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Story with UUID {doc['script_uuid']} not found",
+            )
+        # A batch prompt item that failed before its story was saved
+        content = None
+
+    try:
+        return await get_job_manager().resume(job_id, content)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"[Orchestrate] Error resuming job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error resuming job: {str(e)}")
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str) -> dict:
+    """
+    Get the generated file paths of a completed pipeline job.
+
+    Returns 409 while the job is still queued or running.
+    """
+    try:
+        doc = await job_repo.get_job_document(job_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    if doc["status"] == JobStatus.FAILED.value:
+        raise HTTPException(
+            status_code=500, detail=f"Job {job_id} failed: {doc.get('error')}"
+        )
+    if doc["status"] != JobStatus.COMPLETED.value:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {doc['status']}")
+
+    return {
+        **doc["result"],
+        "job_id": job_id,
+        "message": "Complete pipeline executed successfully",
+    }
@@ -1,30 +1,55 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.models import SubtitleMode
+from storytelling_videos.repositories.mongodb_repo import MongoRepo
+from storytelling_videos.services.preprocess_text_service import add_pauses
 from storytelling_videos.services.whisperx_service import WhisperXSubtitleGenerator
 
 logger = get_logger(__name__)
 
 router = APIRouter()
+mongo_class = MongoRepo()
 
 
 @router.post("/generate_srt")
-async def generate_srt(script_uuid: str, model_name: str = "tiny") -> dict:
+async def generate_srt(
+    script_uuid: str,
+    model_name: str = "tiny",
+    subtitle_mode: SubtitleMode = SubtitleMode.WHISPERX,
+) -> dict:
     """Generate word-level SRT subtitles from audio using WhisperX.
 
     Args:
         script_uuid: UUID of the script/story
         model_name: Whisper model to use (tiny, base, small, medium, large)
+        subtitle_mode: `whisperx` transcribes the audio; `align` and `kokoro`
+            force-align the stored script text without loading a Whisper model
 
     Returns:
         Dictionary with path to generated SRT file
     """
     try:
+        script_text = None
+        if subtitle_mode != SubtitleMode.WHISPERX:
+            try:
+                story = await mongo_class.get_from_mongodb(script_uuid)
+            except ValueError:
+                raise HTTPException(
+                    status_code=404, detail=f"Story with UUID {script_uuid} not found"
+                )
+            # Align the text exactly as it was synthesized
+            script_text = add_pauses(story.content)
+
         # Generate word-level subtitles
         subtitle_generator = WhisperXSubtitleGenerator(
             script_uuid=script_uuid, model_name=model_name
         )
-        srt_path = subtitle_generator.generate_word_level_srt()
+        # Alignment and transcription block for seconds; keep the loop free
+        srt_path = await run_in_threadpool(
+            subtitle_generator.generate_word_level_srt, script_text=script_text
+        )
 
         return {
             "status": "success",
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 
 from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.models import RenditionProfile, StockClip
+from storytelling_videos.services.ffmpeg_render_service import EXPORT_PROFILES
+from storytelling_videos.services.stock_library_service import StockLibrary
 from storytelling_videos.services.video_gen_service import VideoGeneration
 
 logger = get_logger(__name__)
@@ -9,20 +15,36 @@ router = APIRouter()
 
 
 @router.post("/generate_video")
-async def generate_video(script_uuid: str, stock_video_path: str = None) -> dict:
+async def generate_video(
+    script_uuid: str,
+    stock_video_path: str = None,
+    engine: Optional[str] = None,
+    seed: Optional[int] = None,
+    preview: bool = False,
+) -> dict:
     """Generate final video with embedded subtitles.
 
     Args:
         script_uuid: UUID of the script/story
         stock_video_path: Optional path to specific stock video. If None, random one is selected.
+        engine: Render engine, `ffmpeg` or `moviepy` (default: settings.RENDER_ENGINE)
+        seed: Optional seed for the stock clip and start point choice
+        preview: Render a fast low-resolution draft; the next final render
+            reuses its stock slice, framing and timing
 
     Returns:
         Dictionary with path to generated video
     """
     try:
-        # Generate video
+        # Render off the event loop; an encode takes as long as the video
         video_gen = VideoGeneration(script_uuid=script_uuid)
-        video_gen.generate(stock_video_path=stock_video_path)
+        await run_in_threadpool(
+            video_gen.generate,
+            stock_video_path=stock_video_path,
+            engine=engine,
+            seed=seed,
+            preview=preview,
+        )
 
         logger.info(f"Video generated successfully at: {video_gen.output_path}")
 
@@ -35,6 +57,83 @@ async def generate_video(script_uuid: str, stock_video_path: str = None) -> dict
 
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error generating video: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating video: {str(e)}")
+
+
+@router.post("/renditions")
+async def generate_renditions(
+    script_uuid: str,
+    profiles: list[str] = Query(["tiktok", "shorts", "reels", "preview"]),
+    stock_video_path: Optional[str] = None,
+    seed: Optional[int] = None,
+) -> dict:
+    """Export the video for several targets from one decode and caption pass.
+
+    Args:
+        script_uuid: UUID of the script/story
+        profiles: Export profile names, see GET /videos/export_profiles
+        stock_video_path: Optional path to specific stock video. If None, random one is selected.
+        seed: Optional seed for the stock clip and start point choice
+
+    Returns:
+        Dictionary with the video path per profile
+    """
+    try:
+        video_gen = VideoGeneration(script_uuid=script_uuid)
+        outputs = await run_in_threadpool(
+            video_gen.generate_renditions,
+            profiles,
+            stock_video_path=stock_video_path,
+            seed=seed,
+        )
+        logger.info(f"Renditions generated for {script_uuid}: {', '.join(outputs)}")
+        return {
+            "status": "success",
+            "script_uuid": script_uuid,
+            "renditions": {name: str(path) for name, path in outputs.items()},
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error generating renditions: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error generating renditions: {str(e)}"
+        )
+
+
+@router.get("/export_profiles", response_model=list[RenditionProfile])
+async def list_export_profiles() -> list[RenditionProfile]:
+    """List the built-in export profiles."""
+    return list(EXPORT_PROFILES.values())
+
+
+@router.get("/stock_library", response_model=list[StockClip])
+async def list_stock_library() -> list[StockClip]:
+    """List the indexed stock videos with their probed metadata."""
+    return list(StockLibrary().clips.values())
+
+
+@router.post("/stock_library/refresh", response_model=list[StockClip])
+async def refresh_stock_library(build_proxies: bool = False) -> list[StockClip]:
+    """Re-index changed stock videos and optionally build 9:16 proxies.
+
+    Args:
+        build_proxies: Pre-transcode every clip without a proxy to a
+            1080x1920 short-GOP intermediate
+
+    Returns:
+        All indexed clips
+    """
+    try:
+        return await run_in_threadpool(
+            StockLibrary().refresh, build_proxies=build_proxies
+        )
+    except Exception as e:
+        logger.error(f"Error refreshing stock library: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error refreshing stock library: {str(e)}"
+        )
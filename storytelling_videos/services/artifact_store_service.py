@@ -0,0 +1,113 @@
+"""
+Content-addressed store for generated artifacts (audio, subtitles, video)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+
+logger = get_logger(__name__)
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file's content in 1 MiB chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """Store artifacts under a hash of the inputs that produced them
+
+    Each artifact is a directory `<root>/<kind>/<key[:2]>/<key>/` holding the
+    output files and a `manifest.json` with the parameters behind the key. An
+    artifact is built in a temp directory and renamed into place, so readers
+    never see a half-written artifact. Per-script paths such as
+    `saved_audio_kokoro/<uuid>/...` are materialized from the store as hard
+    links, so identical inputs under different UUIDs share one copy.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or Path.cwd() / settings.ARTIFACTS_DIR)
+
+    @staticmethod
+    def compute_key(kind: str, params: dict) -> str:
+        """Hash the artifact kind and its input parameters"""
+        payload = json.dumps({"kind": kind, **params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def artifact_dir(self, kind: str, key: str) -> Path:
+        return self.root / kind / key[:2] / key
+
+    def lookup(self, kind: str, key: str) -> Optional[dict]:
+        """Return the manifest of a complete artifact, or None on a miss"""
+        manifest_path = self.artifact_dir(kind, key) / self.MANIFEST
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def file_path(self, kind: str, key: str, filename: str) -> Optional[Path]:
+        """Path of one file of a stored artifact, if it exists"""
+        path = self.artifact_dir(kind, key) / filename
+        return path if path.exists() else None
+
+    @contextmanager
+    def writer(self, kind: str, key: str, params: dict) -> Iterator[Path]:
+        """
+        Build an artifact atomically
+
+        Yields a temp directory to write the artifact files into. On success
+        the manifest is written and the directory is renamed into place; on
+        error the temp directory is discarded.
+        """
+        final_dir = self.artifact_dir(kind, key)
+        final_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{key[:8]}-", dir=final_dir.parent))
+        try:
+            yield tmp_dir
+            manifest = {
+                "kind": kind,
+                "key": key,
+                "params": params,
+                "files": sorted(p.name for p in tmp_dir.iterdir()),
+                "created_at": datetime.now().isoformat(),
+            }
+            with open(tmp_dir / self.MANIFEST, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, default=str)
+            try:
+                os.rename(tmp_dir, final_dir)
+                logger.info(f"[Artifacts] Stored {kind}/{key[:12]}")
+            except OSError:
+                # Another worker stored the same artifact first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    @staticmethod
+    def materialize(src: Path, dst: Path) -> Path:
+        """Atomically place a stored file at a per-script path (hard link or copy)"""
+        dst = Path(dst)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f".{dst.name}.tmp")
+        tmp.unlink(missing_ok=True)
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+        return dst
@@ -0,0 +1,62 @@
+"""
+In-memory audio passed between pipeline stages
+"""
+
+from dataclasses import dataclass
+from math import gcd
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass(frozen=True)
+class AudioBuffer:
+    """Mono float32 samples and their sample rate
+
+    TTS produces the buffer, subtitles resample it for WhisperX and the
+    renderer pipes it into ffmpeg, so the WAV on disk is written once for
+    persistence and never decoded again within the same pipeline run.
+    """
+
+    samples: "np.ndarray"
+    sample_rate: int
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds"""
+        return len(self.samples) / self.sample_rate
+
+    @classmethod
+    def from_file(cls, path: Path) -> "AudioBuffer":
+        """Read an audio file into memory, downmixed to mono float32"""
+        import soundfile as sf
+
+        samples, sample_rate = sf.read(str(path), dtype="float32", always_2d=True)
+        return cls(samples.mean(axis=1), sample_rate)
+
+    def resample(self, sample_rate: int) -> "AudioBuffer":
+        """
+        Resample with a polyphase filter (24 kHz -> 16 kHz is up 2, down 3)
+
+        Args:
+            sample_rate: Target sample rate
+
+        Returns:
+            A new buffer, or this one if the rate already matches
+        """
+        if sample_rate == self.sample_rate:
+            return self
+        import numpy as np
+        from scipy.signal import resample_poly
+
+        divisor = gcd(sample_rate, self.sample_rate)
+        samples = resample_poly(
+            self.samples, sample_rate // divisor, self.sample_rate // divisor
+        )
+        return AudioBuffer(samples.astype(np.float32, copy=False), sample_rate)
+
+    def pcm_f32le(self) -> bytes:
+        """Raw little-endian float32 samples, for ffmpeg `-f f32le` input"""
+        return self.samples.astype("<f4", copy=False).tobytes()
@@ -0,0 +1,182 @@
+"""
+Captions rasterized once per state, for compositing with ffmpeg's overlay filter
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.services.caption_service import CaptionLine, CaptionTrack
+
+if TYPE_CHECKING:
+    from PIL import Image, ImageFont
+
+logger = get_logger(__name__)
+
+# Tried in order when CAPTION_FONT_PATH is unset; Pillow also searches the
+# system font directories for bare file names
+FALLBACK_FONTS = ("DejaVuSans-Bold.ttf", "DejaVuSans.ttf", "LiberationSans-Bold.ttf")
+
+
+def load_font(font: str, bold: bool, size: int) -> "ImageFont.FreeTypeFont":
+    """Load the caption font, falling back to common system fonts"""
+    from PIL import ImageFont
+
+    candidates = [settings.CAPTION_FONT_PATH] if settings.CAPTION_FONT_PATH else []
+    if bold:
+        candidates += [f"{font} Bold.ttf", f"{font.lower()}bd.ttf"]
+    candidates += [f"{font}.ttf", f"{font.lower()}.ttf", *FALLBACK_FONTS]
+    for candidate in candidates:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    logger.warning(f"[Captions] No TrueType font found for {font}, using default")
+    return ImageFont.load_default(size)
+
+
+class CaptionRasterizer:
+    """Draw each distinct caption state of a track once, as a transparent PNG
+
+    A state is one phrase with its first `k` words highlighted, so a line of
+    four words has four states and the frames between word onsets reuse the
+    same image. All images are one horizontal band of the frame, sized for the
+    tallest phrase, so ffmpeg sees a constant overlay size. The timeline is
+    written as a concat demuxer script whose entries hold each image for the
+    duration of its state.
+    """
+
+    def __init__(self, track: CaptionTrack, width: int, height: int):
+        self.track = track
+        self.width = width
+        self.height = height
+        style = track.style
+        # The style is defined on a 1080x1920 frame; previews scale it down
+        scale = height / style.height
+        font_size = max(1, round(style.font_size * scale))
+        self.font = load_font(style.font, style.bold, font_size)
+        self.outline = max(0, round(style.outline * scale))
+        self.max_width = width - 2 * round(style.margin_h * width / style.width)
+        self.space = self.font.getlength(" ")
+        ascent, descent = self.font.getmetrics()
+        self.row_height = ascent + descent + 2 * self.outline
+        self.layouts = [self._layout(line) for line in track.lines]
+        rows = max((len(layout) for layout in self.layouts), default=1)
+        self.band_height = rows * self.row_height
+
+    def _layout(self, line: CaptionLine) -> list[list[tuple[int, float]]]:
+        """Wrap a phrase into rows of (word index, x), each row centered"""
+        rows: list[list[tuple[int, float]]] = []
+        row: list[tuple[int, float]] = []
+        x = 0.0
+        for index, word in enumerate(line.words):
+            length = self.font.getlength(word.text)
+            if row and x + length > self.max_width:
+                rows.append(self._center(row, x - self.space))
+                row, x = [], 0.0
+            row.append((index, x))
+            x += length + self.space
+        if row:
+            rows.append(self._center(row, x - self.space))
+        return rows
+
+    def _center(
+        self, row: list[tuple[int, float]], row_width: float
+    ) -> list[tuple[int, float]]:
+        left = (self.width - row_width) / 2
+        return [(index, left + x) for index, x in row]
+
+    def draw(self, line_index: int, highlighted: int) -> "Image.Image":
+        """The band for one phrase with its first `highlighted` words spoken"""
+        from PIL import Image, ImageDraw
+
+        style = self.track.style
+        line = self.track.lines[line_index]
+        layout = self.layouts[line_index]
+        image = Image.new("RGBA", (self.width, self.band_height), (0, 0, 0, 0))
+        canvas = ImageDraw.Draw(image)
+        # Rows are centered in the band, like ASS middle-center alignment
+        top = (self.band_height - len(layout) * self.row_height) / 2 + self.outline
+        for row_number, row in enumerate(layout):
+            y = top + row_number * self.row_height
+            for index, x in row:
+                colour = style.highlight if index < highlighted else style.text
+                canvas.text(
+                    (x, y),
+                    line.words[index].text,
+                    font=self.font,
+                    fill=(*colour, 255),
+                    stroke_width=self.outline,
+                    stroke_fill=(*style.outline_colour, 255),
+                )
+        return image
+
+    def states(self) -> list[tuple[float, float, Optional[tuple[int, int]]]]:
+        """
+        Caption states in time order, gaps included
+
+        Returns:
+            (start, end, (line index, highlighted words) or None when blank)
+        """
+        states: list[tuple[float, float, Optional[tuple[int, int]]]] = []
+        cursor = 0.0
+        for line_index, line in enumerate(self.track.lines):
+            if line.start > cursor:
+                states.append((cursor, line.start, None))
+            # Word onsets, kept in order and after the previous phrase
+            onsets = [max(cursor, line.start)]
+            for word in line.words[1:]:
+                onsets.append(max(onsets[-1], word.start))
+            ends = onsets[1:] + [max(onsets[-1], line.end)]
+            for count, (start, end) in enumerate(zip(onsets, ends), start=1):
+                if end > start:
+                    states.append((start, end, (line_index, count)))
+            cursor = max(cursor, ends[-1])
+        return states
+
+    def write(self, output_dir: Path) -> Path:
+        """
+        Write the state images and their concat demuxer script
+
+        Args:
+            output_dir: Directory for the PNGs and the script
+
+        Returns:
+            Path to the concat script, to be read with `-f concat -safe 0`
+        """
+        from PIL import Image
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        blank_path = output_dir / "blank.png"
+        Image.new("RGBA", (self.width, self.band_height), (0, 0, 0, 0)).save(blank_path)
+
+        # (phrase text, highlighted words) -> image; repeated phrases share one
+        files: dict[tuple[str, int], Path] = {}
+        entries = ["ffconcat version 1.0"]
+        for start, end, state in self.states():
+            if state is None:
+                path = blank_path
+            else:
+                line_index, highlighted = state
+                key = (self.track.lines[line_index].text, highlighted)
+                path = files.get(key)
+                if path is None:
+                    path = output_dir / f"caption_{len(files):05d}.png"
+                    # Fast zlib level: the images are read once, locally
+                    self.draw(line_index, highlighted).save(path, compress_level=1)
+                    files[key] = path
+            entries += [f"file '{path.name}'", f"duration {end - start:.6f}"]
+        # Blank after the last phrase; the final entry is listed twice so the
+        # demuxer honours the duration of the one before it
+        entries += [f"file '{blank_path.name}'", "duration 1.0"]
+        entries += [f"file '{blank_path.name}'"]
+
+        script_path = output_dir / "captions.ffconcat"
+        script_path.write_text("\n".join(entries) + "\n", encoding="utf-8")
+        logger.info(
+            f"[Captions] Rasterized {len(files)} caption states "
+            f"({self.width}x{self.band_height})"
+        )
+        return script_path
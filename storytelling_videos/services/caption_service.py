@@ -0,0 +1,285 @@
+"""
+Phrase-grouped karaoke captions, built from word timings and written as ASS
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+
+logger = get_logger(__name__)
+
+# A phrase ends after a word with closing punctuation
+PHRASE_END = re.compile(r"[.!?;:,…]['\")\]]*$")
+
+SRT_TIME = re.compile(r"(\d+):(\d{2}):(\d{2})[,.](\d{3})")
+
+
+@dataclass(frozen=True)
+class CaptionStyle:
+    """Look of the captions, in the coordinates of a 1080x1920 frame
+
+    Colours are RGB; `highlight` is the colour of words already spoken.
+    """
+
+    font: str = "Arial"
+    font_size: int = 90
+    bold: bool = True
+    text: tuple[int, int, int] = (255, 255, 255)
+    highlight: tuple[int, int, int] = (255, 221, 0)
+    outline_colour: tuple[int, int, int] = (0, 0, 0)
+    outline: float = 4.0
+    margin_h: int = 60
+    width: int = 1080
+    height: int = 1920
+
+
+@dataclass
+class CaptionWord:
+    text: str
+    start: float
+    end: float
+
+
+@dataclass
+class CaptionLine:
+    """One phrase on screen from `start` to `end`"""
+
+    words: list[CaptionWord]
+    start: float
+    end: float
+
+    @property
+    def text(self) -> str:
+        return " ".join(word.text for word in self.words)
+
+
+@dataclass
+class CaptionTrack:
+    """Caption phrases in display order, plus the style they are drawn in"""
+
+    lines: list[CaptionLine]
+    style: CaptionStyle = field(default_factory=CaptionStyle)
+
+    @classmethod
+    def from_words(
+        cls,
+        words: Iterable[dict],
+        max_words: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        max_gap: Optional[float] = None,
+        style: Optional[CaptionStyle] = None,
+    ) -> "CaptionTrack":
+        """
+        Group timed words into phrase lines
+
+        A line ends at closing punctuation, before a pause longer than
+        `max_gap`, or when one more word would exceed `max_words` or
+        `max_chars`. Each line stays up until the next one starts if the pause
+        between them is short, so captions do not blink between phrases.
+
+        Args:
+            words: Word timings as {"word", "start", "end"} dicts
+            max_words: Most words per line (default: CAPTION_MAX_WORDS)
+            max_chars: Most characters per line (default: CAPTION_MAX_CHARS)
+            max_gap: Longest pause inside a line, in seconds
+                (default: CAPTION_MAX_GAP_SECONDS)
+            style: Caption look (default: `CaptionStyle()`)
+
+        Returns:
+            The caption track
+        """
+        max_words = max_words or settings.CAPTION_MAX_WORDS
+        max_chars = max_chars or settings.CAPTION_MAX_CHARS
+        max_gap = settings.CAPTION_MAX_GAP_SECONDS if max_gap is None else max_gap
+
+        groups: list[list[CaptionWord]] = []
+        current: list[CaptionWord] = []
+        for word_info in words:
+            text = str(word_info.get("word", "")).strip()
+            if not text:
+                continue
+            start = float(word_info.get("start", 0))
+            word = CaptionWord(text, start, max(start, float(word_info.get("end", 0))))
+            if current:
+                chars = sum(len(w.text) + 1 for w in current) + len(text)
+                if (
+                    len(current) >= max_words
+                    or chars > max_chars
+                    or word.start - current[-1].end > max_gap
+                ):
+                    groups.append(current)
+                    current = []
+            current.append(word)
+            if PHRASE_END.search(text):
+                groups.append(current)
+                current = []
+        if current:
+            groups.append(current)
+
+        lines = [CaptionLine(group, group[0].start, group[-1].end) for group in groups]
+        for line, following in zip(lines, lines[1:]):
+            # Also clips a line that overlaps the next, so they never stack
+            if following.start - line.end <= max_gap:
+                line.end = max(line.start, following.start)
+        return cls(lines, style or CaptionStyle())
+
+    @classmethod
+    def from_srt(cls, srt_path: Path, **kwargs) -> "CaptionTrack":
+        """Build the track from a word-level SRT (one cue per word)"""
+        return cls.from_words(read_srt_words(srt_path), **kwargs)
+
+    def to_ass(self) -> str:
+        """
+        Render the track as one ASS script
+
+        The style is declared once, and each phrase is one event whose words
+        carry `\\k` karaoke timings: a word switches to the highlight colour
+        when it is spoken.
+        """
+        style = self.style
+        header = [
+            "[Script Info]",
+            "ScriptType: v4.00+",
+            f"PlayResX: {style.width}",
+            f"PlayResY: {style.height}",
+            "WrapStyle: 0",
+            "ScaledBorderAndShadow: yes",
+            "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, "
+            "OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, "
+            "ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+            "Alignment, MarginL, MarginR, MarginV, Encoding",
+            # Karaoke fills words from SecondaryColour to PrimaryColour
+            f"Style: Caption,{style.font},{style.font_size},"
+            f"{ass_colour(style.highlight)},{ass_colour(style.text)},"
+            f"{ass_colour(style.outline_colour)},&H00000000,"
+            f"{-1 if style.bold else 0},0,0,0,100,100,0,0,1,"
+            f"{style.outline:g},0,5,{style.margin_h},{style.margin_h},0,1",
+            "",
+            "[Events]",
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, "
+            "Effect, Text",
+        ]
+        events = [
+            f"Dialogue: 0,{ass_timestamp(line.start)},{ass_timestamp(line.end)},"
+            f"Caption,,0,0,0,,{karaoke_text(line)}"
+            for line in self.lines
+        ]
+        return "\n".join(header + events) + "\n"
+
+
+def ass_colour(rgb: tuple[int, int, int]) -> str:
+    """ASS colour literal (&HAABBGGRR, opaque)"""
+    red, green, blue = rgb
+    return f"&H00{blue:02X}{green:02X}{red:02X}"
+
+
+def ass_timestamp(seconds: float) -> str:
+    """Format timestamp in ASS format (H:MM:SS.cc)"""
+    centis = max(0, round(seconds * 100))
+    hours, centis = divmod(centis, 360000)
+    minutes, centis = divmod(centis, 6000)
+    secs, centis = divmod(centis, 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+
+def escape_ass_text(text: str) -> str:
+    """Keep words from being read as override blocks or escapes"""
+    return text.replace("\\", "/").replace("{", "(").replace("}", ")")
+
+
+def karaoke_text(line: CaptionLine) -> str:
+    """Words of a line with `\\k` durations, in whole centiseconds
+
+    Each word's duration runs to the next word's start (the last to the end
+    of the line). Durations are differences of rounded offsets from the line
+    start, so rounding never drifts along the line.
+    """
+    offsets = [round((word.start - line.start) * 100) for word in line.words]
+    offsets.append(max(offsets[-1], round((line.end - line.start) * 100)))
+    return " ".join(
+        f"{{\\k{max(0, offsets[i + 1] - offsets[i])}}}{escape_ass_text(word.text)}"
+        for i, word in enumerate(line.words)
+    )
+
+
+def read_srt_words(srt_path: Path) -> list[dict]:
+    """Read the cues of a word-level SRT back into word timings"""
+    words = []
+    content = Path(srt_path).read_text(encoding="utf-8")
+    for block in re.split(r"\n\s*\n", content.strip()):
+        lines = block.strip().splitlines()
+        if len(lines) < 3 or "-->" not in lines[1]:
+            continue
+        times = SRT_TIME.findall(lines[1])
+        if len(times) != 2:
+            continue
+        start, end = (
+            int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000
+            for h, m, s, ms in times
+        )
+        words.append({"word": " ".join(lines[2:]), "start": start, "end": end})
+    return words
+
+
+def ass_path_for(srt_path: Path) -> Path:
+    """Where the ASS captions built from a word-level SRT are kept"""
+    return Path(srt_path).with_suffix(".ass")
+
+
+def write_ass(track: CaptionTrack, output_path: Path) -> Path:
+    """Write an ASS file and return its path"""
+    return _write_atomic(Path(output_path), track.to_ass())
+
+
+def _write_atomic(output_path: Path, content: str) -> Path:
+    """Write via a temp file and rename; a killed process leaves no partial file"""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def write_captions(srt_path: Path) -> Path:
+    """
+    (Re)build the ASS captions next to a word-level SRT
+
+    Called whenever subtitles are produced, so the ASS always follows the
+    current word timings and caption settings.
+
+    Returns:
+        Path to the ASS file
+    """
+    track = CaptionTrack.from_srt(srt_path)
+    ass_path = write_ass(track, ass_path_for(srt_path))
+    logger.info(f"ASS captions saved ({len(track.lines)} phrases): {ass_path}")
+    return ass_path
+
+
+def ensure_captions(srt_path: Path) -> Path:
+    """
+    ASS captions matching an SRT and the current caption settings
+
+    Building them is cheap, so they are always rebuilt and compared with the
+    file on disk, which is only rewritten when it differs (e.g. after a
+    CAPTION_MAX_* change).
+
+    Returns:
+        Path to the ASS file
+    """
+    ass_path = ass_path_for(srt_path)
+    track = CaptionTrack.from_srt(srt_path)
+    content = track.to_ass()
+    if ass_path.exists() and ass_path.read_text(encoding="utf-8") == content:
+        return ass_path
+    _write_atomic(ass_path, content)
+    logger.info(f"ASS captions saved ({len(track.lines)} phrases): {ass_path}")
+    return ass_path
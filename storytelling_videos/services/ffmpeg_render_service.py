@@ -0,0 +1,814 @@
+"""
+Service for rendering the final video with ffmpeg
+"""
+
+import bisect
+import json
+import math
+import os
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.core.metrics import ENCODE_FPS
+from storytelling_videos.models import RenditionProfile
+from storytelling_videos.services.audio_buffer import AudioBuffer
+from storytelling_videos.services.caption_raster_service import CaptionRasterizer
+from storytelling_videos.services.caption_service import CaptionTrack
+
+logger = get_logger(__name__)
+
+
+SUBTITLE_STYLE = (
+    "FontName=Arial,FontSize=14,PrimaryColour=&H00FFFFFF&,"
+    "OutlineColour=&H00000000&,OutlineWidth=0.5,Alignment=10,"
+    "MarginL=0,MarginR=0,MarginV=0"
+)
+
+# Built-in export targets for `FFmpegRenderer.render_renditions`
+EXPORT_PROFILES = {
+    profile.name: profile
+    for profile in (
+        RenditionProfile(
+            name="tiktok", width=1080, height=1920, video_bitrate_kbps=8000
+        ),
+        RenditionProfile(
+            name="shorts", width=1080, height=1920, video_bitrate_kbps=10000
+        ),
+        RenditionProfile(
+            name="reels",
+            width=1080,
+            height=1920,
+            video_bitrate_kbps=5000,
+            fps=30,
+        ),
+        RenditionProfile(
+            name="preview",
+            width=360,
+            height=640,
+            video_bitrate_kbps=600,
+            audio_bitrate_kbps=64,
+            preset="veryfast",
+        ),
+    )
+}
+
+
+def resolve_profiles(names: list[str]) -> list[RenditionProfile]:
+    """
+    Look up export profiles by name
+
+    Raises:
+        ValueError: On an unknown or repeated name
+    """
+    unknown = [name for name in names if name not in EXPORT_PROFILES]
+    if unknown:
+        raise ValueError(
+            f"Unknown export profiles {unknown}, "
+            f"expected one of {sorted(EXPORT_PROFILES)}"
+        )
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate export profiles in {names}")
+    if not names:
+        raise ValueError("At least one export profile is required")
+    return [EXPORT_PROFILES[name] for name in names]
+
+
+def run_ffmpeg(args: list[str], input: Optional[bytes] = None) -> None:
+    """Run ffmpeg, optionally feeding `input` on stdin, and raise if it fails"""
+    cmd = [settings.FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", *args]
+    logger.debug(f"Running: {' '.join(cmd)}")
+    proc = subprocess.run(cmd, input=input, capture_output=True)
+    if proc.returncode != 0:
+        stderr = proc.stderr.decode("utf-8", errors="replace")
+        raise RuntimeError(f"ffmpeg failed ({proc.returncode}): {stderr[-2000:]}")
+
+
+def probe_duration(media_path: str) -> float:
+    """Read the container duration of a media file with ffprobe"""
+    proc = subprocess.run(
+        [
+            settings.FFPROBE_BINARY,
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "json",
+            str(media_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {media_path}: {proc.stderr}")
+    return float(json.loads(proc.stdout)["format"]["duration"])
+
+
+def probe_video(media_path: str) -> dict:
+    """
+    Read stream metadata of the first video stream with ffprobe
+
+    Returns:
+        Dictionary with duration, width, height, codec and fps
+    """
+    proc = subprocess.run(
+        [
+            settings.FFPROBE_BINARY,
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=codec_name,width,height,avg_frame_rate:format=duration",
+            "-of",
+            "json",
+            str(media_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {media_path}: {proc.stderr}")
+    data = json.loads(proc.stdout)
+    stream = data["streams"][0]
+    num, _, den = stream.get("avg_frame_rate", "0/1").partition("/")
+    fps = float(num) / float(den) if den and float(den) else 0.0
+    return {
+        "duration": float(data["format"]["duration"]),
+        "width": int(stream["width"]),
+        "height": int(stream["height"]),
+        "codec": stream["codec_name"],
+        "fps": fps,
+    }
+
+
+def probe_keyframes(media_path: str) -> list[float]:
+    """List keyframe timestamps from packet flags (demux only, no decode)"""
+    proc = subprocess.run(
+        [
+            settings.FFPROBE_BINARY,
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=p=0",
+            str(media_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {media_path}: {proc.stderr}")
+    keyframes = []
+    for line in proc.stdout.splitlines():
+        pts_time, _, flags = line.partition(",")
+        if "K" in flags and pts_time not in ("", "N/A"):
+            keyframes.append(float(pts_time))
+    return sorted(keyframes)
+
+
+def crop_filter(width: int, height: int) -> str:
+    """Center-crop to the width:height aspect ratio (crop centers by default)"""
+    return f"crop=w='min(iw,ih*{width}/{height})':h='min(ih,iw*{height}/{width})'"
+
+
+def escape_filter_path(path: Path) -> str:
+    """Escape a file path for use inside a quoted filtergraph option"""
+    return str(path).replace("\\", "\\\\").replace("'", "\\'")
+
+
+def caption_filter(caption_path: Path) -> str:
+    """Burn-in filter for a caption file
+
+    ASS files carry their own styles and are drawn as they are; word-level
+    SRT cues get `SUBTITLE_STYLE` forced onto every cue.
+    """
+    if Path(caption_path).suffix.lower() == ".ass":
+        return f"ass='{escape_filter_path(caption_path)}'"
+    return (
+        f"subtitles='{escape_filter_path(caption_path)}':force_style='{SUBTITLE_STYLE}'"
+    )
+
+
+def escape_concat_path(path: Path) -> str:
+    """Escape a file path for a single-quoted concat demuxer `file` line"""
+    return str(path).replace("'", "'\\''")
+
+
+def plan_segments(
+    start: float,
+    duration: float,
+    fps: float,
+    keyframes: list[float],
+    segments: int,
+    min_seconds: float,
+) -> list[tuple[float, int]]:
+    """
+    Split the output timeline into chunks that start on source keyframes
+
+    Boundaries are snapped to the source keyframe nearest to an even split, so
+    every chunk's input seek lands on a keyframe and decodes nothing extra,
+    and are expressed in whole frames so the chunks join without gaps. A
+    keyframe that would leave a chunk shorter than `min_seconds` on either
+    side is not used; with no usable keyframe the split is dropped.
+
+    Args:
+        start: Offset of the output's first frame in the source
+        duration: Output length in seconds
+        fps: Source (and output) frame rate
+        keyframes: Source keyframe timestamps; empty splits evenly
+        segments: Maximum number of chunks
+        min_seconds: Shortest chunk worth a separate encoder
+
+    Returns:
+        (output offset in seconds, frame count) per chunk
+    """
+    total_frames = math.ceil(duration * fps)
+    count = max(1, min(segments, int(duration // min_seconds)))
+    min_frames = max(1, min_seconds * fps)
+    boundaries = [0]
+    for index in range(1, count):
+        target = start + duration * index / count
+        candidates = [target]
+        if keyframes:
+            # Keyframes around the even split point, nearest first
+            position = bisect.bisect_left(keyframes, target)
+            nearby = keyframes[max(0, position - 1) : position + 1]
+            candidates = sorted(nearby, key=lambda k: abs(k - target))
+        for candidate in candidates:
+            frame = round((candidate - start) * fps)
+            if (
+                frame - boundaries[-1] >= min_frames
+                and total_frames - frame >= min_frames
+            ):
+                boundaries.append(frame)
+                break
+    boundaries.append(total_frames)
+    return [
+        (first / fps, last - first) for first, last in zip(boundaries, boundaries[1:])
+    ]
+
+
+class FFmpegRenderer:
+    """Crop, scale, burn subtitles and mux audio in one ffmpeg process
+
+    The stock clip is seeked at the input (`-ss`), so only the needed slice is
+    decoded, and no raw frames ever pass through Python. With `segments`, the
+    video is instead encoded as keyframe-aligned chunks by parallel ffmpeg
+    processes and joined with stream copy. `render_renditions` splits one
+    decoded, captioned stream into several encodes. Captions are either burned
+    by libass or, given a `CaptionTrack`, rasterized once per caption state and
+    composited with `overlay`.
+    """
+
+    def __init__(
+        self,
+        width: int = 1080,
+        height: int = 1920,
+        codec: str = "libx264",
+        audio_codec: str = "aac",
+        preset: str = "medium",
+    ):
+        self.width = width
+        self.height = height
+        self.codec = codec
+        self.audio_codec = audio_codec
+        self.preset = preset
+        # Encode throughput of the last render, for stage metrics
+        self.stats: dict = {}
+
+    def build_filtergraph(
+        self,
+        srt_path: Optional[Path] = None,
+        crop: bool = True,
+        offset: float = 0.0,
+        overlay_input: Optional[int] = None,
+    ) -> str:
+        """
+        Build the video filter chain
+
+        Center-crops to the target aspect ratio, scales to the exact output
+        size, then burns the subtitles. Pre-cropped proxies skip the crop.
+        With `overlay_input`, the caption images of that input are composited
+        instead of burning `srt_path`. A segment starting `offset` seconds into
+        the output shifts its frame timestamps while the captions are drawn,
+        so they keep their timing, and back to zero afterwards.
+        """
+        return f"{self._video_graph(srt_path, crop, offset, overlay_input)}[v]"
+
+    def build_renditions_filtergraph(
+        self,
+        profiles: list[RenditionProfile],
+        srt_path: Optional[Path] = None,
+        crop: bool = True,
+        overlay_input: Optional[int] = None,
+    ) -> str:
+        """
+        Build a filtergraph with one video output per profile, `[v0]`, `[v1]`...
+
+        The crop, scale and subtitle burn run once at the renderer's size;
+        `split` then hands the same frames to every branch, which only scales
+        when its profile has a different size.
+        """
+        chain = self._video_graph(srt_path, crop, overlay_input=overlay_input)
+        labels = "".join(f"[s{i}]" for i in range(len(profiles)))
+        graph = [f"{chain},split={len(profiles)}{labels}"]
+        for index, profile in enumerate(profiles):
+            if (profile.width, profile.height) == (self.width, self.height):
+                graph.append(f"[s{index}]null[v{index}]")
+            else:
+                graph.append(
+                    f"[s{index}]scale={profile.width}:{profile.height}"
+                    f":flags=lanczos,setsar=1[v{index}]"
+                )
+        return ";".join(graph)
+
+    def _video_graph(
+        self,
+        srt_path: Optional[Path],
+        crop: bool,
+        offset: float = 0.0,
+        overlay_input: Optional[int] = None,
+    ) -> str:
+        """The video filters up to the captions, with the last output unlabeled"""
+        filters = [f"scale={self.width}:{self.height}", "setsar=1"]
+        if crop:
+            filters.insert(0, crop_filter(self.width, self.height))
+        if overlay_input is not None:
+            if offset:
+                filters.append(f"setpts=PTS+{offset:.6f}/TB")
+            # The caption band is centered, like the ASS middle alignment
+            graph = (
+                f"[0:v]{','.join(filters)}[base];"
+                f"[{overlay_input}:v]format=rgba[captions];"
+                "[base][captions]overlay=x=(W-w)/2:y=(H-h)/2:eof_action=pass"
+            )
+            if offset:
+                graph += ",setpts=PTS-STARTPTS"
+            return graph
+        if srt_path is not None:
+            if offset:
+                filters.append(f"setpts=PTS+{offset:.6f}/TB")
+            filters.append(caption_filter(srt_path))
+            if offset:
+                filters.append("setpts=PTS-STARTPTS")
+        return f"[0:v]{','.join(filters)}"
+
+    @staticmethod
+    def _audio_input(audio_path: Path, audio: Optional[AudioBuffer]) -> list[str]:
+        if audio is None:
+            return ["-i", str(audio_path)]
+        # Raw samples piped on stdin instead of reading the WAV back
+        return [
+            "-f",
+            "f32le",
+            "-ar",
+            str(audio.sample_rate),
+            "-ac",
+            "1",
+            "-i",
+            "pipe:0",
+        ]
+
+    @staticmethod
+    def _overlay_input(overlay: Optional[Path]) -> list[str]:
+        if overlay is None:
+            return []
+        # Concat script of caption images, each held for its state's duration
+        return ["-f", "concat", "-safe", "0", "-i", str(overlay)]
+
+    @contextmanager
+    def caption_overlay(
+        self, captions: Optional[CaptionTrack], work_dir: Path
+    ) -> Iterator[Optional[Path]]:
+        """Rasterize `captions` at the output size for the length of a render"""
+        if captions is None:
+            yield None
+            return
+        with tempfile.TemporaryDirectory(prefix="captions-", dir=work_dir) as tmp:
+            yield CaptionRasterizer(captions, self.width, self.height).write(Path(tmp))
+
+    def build_command(
+        self,
+        stock_video_path: str,
+        audio_path: Path,
+        output_path: Path,
+        start: float,
+        duration: float,
+        srt_path: Optional[Path] = None,
+        crop: bool = True,
+        audio: Optional[AudioBuffer] = None,
+        overlay: Optional[Path] = None,
+    ) -> list[str]:
+        """Build the ffmpeg arguments for one render"""
+        return [
+            "-y",
+            # Loop the stock clip if it is shorter than the audio
+            "-stream_loop",
+            "-1",
+            "-ss",
+            f"{start:.3f}",
+            "-i",
+            str(stock_video_path),
+            *self._audio_input(audio_path, audio),
+            *self._overlay_input(overlay),
+            "-filter_complex",
+            self.build_filtergraph(
+                srt_path, crop=crop, overlay_input=2 if overlay else None
+            ),
+            "-map",
+            "[v]",
+            "-map",
+            "1:a:0",
+            "-c:v",
+            self.codec,
+            "-preset",
+            self.preset,
+            "-pix_fmt",
+            "yuv420p",
+            "-c:a",
+            self.audio_codec,
+            "-t",
+            f"{duration:.3f}",
+            "-movflags",
+            "+faststart",
+            str(output_path),
+        ]
+
+    def build_segment_command(
+        self,
+        stock_video_path: str,
+        chunk_path: Path,
+        source_start: float,
+        offset: float,
+        frames: int,
+        threads: int,
+        srt_path: Optional[Path] = None,
+        crop: bool = True,
+        overlay: Optional[Path] = None,
+    ) -> list[str]:
+        """Build the ffmpeg arguments for one video-only segment"""
+        return [
+            "-y",
+            "-ss",
+            f"{source_start + offset:.6f}",
+            "-i",
+            str(stock_video_path),
+            *self._overlay_input(overlay),
+            "-filter_complex",
+            self.build_filtergraph(
+                srt_path,
+                crop=crop,
+                offset=offset,
+                overlay_input=1 if overlay else None,
+            ),
+            "-map",
+            "[v]",
+            "-an",
+            "-c:v",
+            self.codec,
+            "-preset",
+            self.preset,
+            "-pix_fmt",
+            "yuv420p",
+            "-threads",
+            str(threads),
+            "-frames:v",
+            str(frames),
+            str(chunk_path),
+        ]
+
+    def build_concat_command(
+        self,
+        list_path: Path,
+        audio_path: Path,
+        output_path: Path,
+        duration: float,
+        audio: Optional[AudioBuffer] = None,
+    ) -> list[str]:
+        """Join segments without re-encoding and mux the audio once"""
+        return [
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(list_path),
+            *self._audio_input(audio_path, audio),
+            "-map",
+            "0:v",
+            "-map",
+            "1:a:0",
+            "-c:v",
+            "copy",
+            "-c:a",
+            self.audio_codec,
+            "-t",
+            f"{duration:.3f}",
+            "-movflags",
+            "+faststart",
+            str(output_path),
+        ]
+
+    def build_renditions_command(
+        self,
+        stock_video_path: str,
+        audio_path: Path,
+        outputs: list[tuple[RenditionProfile, Path]],
+        start: float,
+        duration: float,
+        srt_path: Optional[Path] = None,
+        crop: bool = True,
+        audio: Optional[AudioBuffer] = None,
+        overlay: Optional[Path] = None,
+    ) -> list[str]:
+        """Build the ffmpeg arguments for one process writing every rendition"""
+        profiles = [profile for profile, _ in outputs]
+        args = [
+            "-y",
+            "-stream_loop",
+            "-1",
+            "-ss",
+            f"{start:.3f}",
+            "-i",
+            str(stock_video_path),
+            *self._audio_input(audio_path, audio),
+            *self._overlay_input(overlay),
+            "-filter_complex",
+            self.build_renditions_filtergraph(
+                profiles, srt_path, crop=crop, overlay_input=2 if overlay else None
+            ),
+        ]
+        for index, (profile, output_path) in enumerate(outputs):
+            # Output options apply to the next output file only; the audio
+            # input is decoded once and encoded per rendition
+            args += [
+                "-map",
+                f"[v{index}]",
+                "-map",
+                "1:a:0",
+                "-c:v",
+                profile.codec,
+                "-preset",
+                profile.preset,
+                "-b:v",
+                f"{profile.video_bitrate_kbps}k",
+                "-maxrate",
+                f"{profile.video_bitrate_kbps}k",
+                "-bufsize",
+                f"{profile.video_bitrate_kbps * 2}k",
+                "-pix_fmt",
+                "yuv420p",
+            ]
+            if profile.fps:
+                args += ["-r", f"{profile.fps:g}"]
+            args += [
+                "-c:a",
+                self.audio_codec,
+                "-b:a",
+                f"{profile.audio_bitrate_kbps}k",
+                "-t",
+                f"{duration:.3f}",
+            ]
+            if profile.container in ("mp4", "mov"):
+                args += ["-movflags", "+faststart"]
+            args.append(str(output_path))
+        return args
+
+    def render(
+        self,
+        stock_video_path: str,
+        audio_path: Path,
+        output_path: Path,
+        start: float,
+        duration: float,
+        srt_path: Optional[Path] = None,
+        crop: bool = True,
+        audio: Optional[AudioBuffer] = None,
+        segments: int = 1,
+        keyframes: Optional[list[float]] = None,
+        captions: Optional[CaptionTrack] = None,
+    ) -> Path:
+        """
+        Render the final video
+
+        Args:
+            stock_video_path: Source stock clip
+            audio_path: Narration audio to mux
+            output_path: Destination file
+            start: Offset into the stock clip, in seconds
+            duration: Length of the output, in seconds
+            srt_path: Optional subtitles to burn in
+            crop: Center-crop to 9:16; disable for pre-cropped proxies
+            audio: The narration already in memory; piped to ffmpeg instead of
+                reading `audio_path`
+            segments: Encode up to this many chunks in parallel ffmpeg
+                processes; 1 renders in a single process
+            keyframes: Keyframe timestamps of the source, to align chunk
+                boundaries; probed if not given
+            captions: Caption track to rasterize and overlay; replaces
+                `srt_path`
+
+        Returns:
+            Path to the rendered video
+        """
+        if captions is not None:
+            logger.info(f"Overlaying {len(captions.lines)} rasterized captions")
+        elif srt_path is not None:
+            logger.info(f"Burning subtitles from: {srt_path}")
+        started = time.perf_counter()
+        chunks = 0
+        with self.caption_overlay(captions, output_path.parent) as overlay:
+            if segments > 1:
+                chunks = self._render_segmented(
+                    stock_video_path,
+                    audio_path,
+                    output_path,
+                    start,
+                    duration,
+                    srt_path,
+                    crop,
+                    audio,
+                    segments,
+                    keyframes,
+                    overlay,
+                )
+            if not chunks:
+                chunks = 1
+                run_ffmpeg(
+                    self.build_command(
+                        stock_video_path,
+                        audio_path,
+                        output_path,
+                        start,
+                        duration,
+                        srt_path,
+                        crop=crop,
+                        audio=audio,
+                        overlay=overlay,
+                    ),
+                    input=audio.pcm_f32le() if audio is not None else None,
+                )
+        self._record_fps(output_path, time.perf_counter() - started)
+        self.stats["segments"] = chunks
+        return output_path
+
+    def render_renditions(
+        self,
+        stock_video_path: str,
+        audio_path: Path,
+        outputs: list[tuple[RenditionProfile, Path]],
+        start: float,
+        duration: float,
+        srt_path: Optional[Path] = None,
+        crop: bool = True,
+        audio: Optional[AudioBuffer] = None,
+        captions: Optional[CaptionTrack] = None,
+    ) -> list[Path]:
+        """
+        Render several renditions from a single decode and caption pass
+
+        Args:
+            stock_video_path: Source stock clip
+            audio_path: Narration audio to mux
+            outputs: (profile, destination file) per rendition
+            start: Offset into the stock clip, in seconds
+            duration: Length of the outputs, in seconds
+            srt_path: Optional subtitles to burn in
+            crop: Center-crop to 9:16; disable for pre-cropped proxies
+            audio: The narration already in memory; piped to ffmpeg instead of
+                reading `audio_path`
+            captions: Caption track to rasterize (once, at the renderer's
+                size) and overlay; replaces `srt_path`
+
+        Returns:
+            Paths to the rendered videos, in the order of `outputs`
+        """
+        if captions is not None:
+            logger.info(f"Overlaying {len(captions.lines)} rasterized captions")
+        elif srt_path is not None:
+            logger.info(f"Burning subtitles from: {srt_path}")
+        logger.info(
+            f"Rendering {len(outputs)} renditions: "
+            f"{', '.join(profile.name for profile, _ in outputs)}"
+        )
+        started = time.perf_counter()
+        with self.caption_overlay(captions, outputs[0][1].parent) as overlay:
+            run_ffmpeg(
+                self.build_renditions_command(
+                    stock_video_path,
+                    audio_path,
+                    outputs,
+                    start,
+                    duration,
+                    srt_path,
+                    crop=crop,
+                    audio=audio,
+                    overlay=overlay,
+                ),
+                input=audio.pcm_f32le() if audio is not None else None,
+            )
+        # Throughput of the shared decode; every rendition has the same frames
+        self._record_fps(outputs[0][1], time.perf_counter() - started)
+        self.stats["renditions"] = len(outputs)
+        return [output_path for _, output_path in outputs]
+
+    def _render_segmented(
+        self,
+        stock_video_path: str,
+        audio_path: Path,
+        output_path: Path,
+        start: float,
+        duration: float,
+        srt_path: Optional[Path],
+        crop: bool,
+        audio: Optional[AudioBuffer],
+        segments: int,
+        keyframes: Optional[list[float]],
+        overlay: Optional[Path] = None,
+    ) -> int:
+        """
+        Encode keyframe-aligned chunks in parallel, then concatenate them
+
+        Each chunk is its own ffmpeg process with a share of the CPU threads.
+        The chunks are joined with stream copy and the audio is encoded once
+        over the whole timeline, so there are no audio seams.
+
+        Returns:
+            Number of chunks rendered, or 0 without rendering when the output
+            would loop the stock clip or is too short to split
+        """
+        source = probe_video(str(stock_video_path))
+        plan = plan_segments(
+            start,
+            duration,
+            source["fps"],
+            keyframes if keyframes is not None else probe_keyframes(stock_video_path),
+            segments,
+            settings.RENDER_MIN_SEGMENT_SECONDS,
+        )
+        if len(plan) == 1 or start + duration > source["duration"]:
+            return 0
+
+        threads = max(1, (os.cpu_count() or 1) // len(plan))
+        logger.info(
+            f"Rendering {len(plan)} segments in parallel ({threads} threads each)"
+        )
+        with tempfile.TemporaryDirectory(
+            prefix="segments-", dir=output_path.parent
+        ) as tmp:
+            tmp_dir = Path(tmp)
+            chunk_paths = [tmp_dir / f"chunk_{i:03d}.mp4" for i in range(len(plan))]
+            commands = [
+                self.build_segment_command(
+                    stock_video_path,
+                    chunk_path,
+                    start,
+                    offset,
+                    frames,
+                    threads,
+                    srt_path,
+                    crop=crop,
+                    overlay=overlay,
+                )
+                for chunk_path, (offset, frames) in zip(chunk_paths, plan)
+            ]
+            # Threads only wait on the ffmpeg processes, which do the work
+            with ThreadPoolExecutor(max_workers=len(commands)) as pool:
+                list(pool.map(run_ffmpeg, commands))
+
+            list_path = tmp_dir / "segments.txt"
+            list_path.write_text(
+                "".join(f"file '{escape_concat_path(path)}'\n" for path in chunk_paths),
+                encoding="utf-8",
+            )
+            run_ffmpeg(
+                self.build_concat_command(
+                    list_path, audio_path, output_path, duration, audio=audio
+                ),
+                input=audio.pcm_f32le() if audio is not None else None,
+            )
+        return len(plan)
+
+    def _record_fps(self, output_path: Path, wall: float) -> None:
+        info = probe_video(str(output_path))
+        frames = info["duration"] * info["fps"]
+        self.stats = {
+            "encode_s": round(wall, 3),
+            "frames": int(frames),
+            "video_s": round(info["duration"], 3),
+        }
+        if wall:
+            self.stats["encode_fps"] = round(frames / wall, 1)
+            ENCODE_FPS.observe(frames / wall, engine="ffmpeg")
@@ -0,0 +1,81 @@
+"""
+Client for the shared model server (see inference_server.py)
+"""
+
+from functools import lru_cache
+from multiprocessing.connection import Client
+from pathlib import Path
+
+from storytelling_videos.core.config_core import settings
+
+
+def inference_server_enabled() -> bool:
+    """Whether model calls go to the shared model server"""
+    return bool(settings.INFERENCE_SOCKET)
+
+
+def authkey_path() -> Path:
+    """Where the server keeps its generated key when INFERENCE_AUTHKEY is unset"""
+    return Path(f"{settings.INFERENCE_SOCKET}.key")
+
+
+def inference_authkey() -> bytes:
+    """
+    The model server's shared secret
+
+    Messages are unpickled on both ends, so the key is what stands between
+    the socket and code execution: an explicit INFERENCE_AUTHKEY, or else the
+    random key the server generated for this deployment, readable only by
+    the user running it.
+
+    Raises:
+        RuntimeError: If no key is set and the server has not generated one
+    """
+    if settings.INFERENCE_AUTHKEY:
+        return settings.INFERENCE_AUTHKEY.encode("utf-8")
+    try:
+        return authkey_path().read_bytes().strip()
+    except FileNotFoundError:
+        raise RuntimeError(
+            f"No inference server key at {authkey_path()}; start the server "
+            "first or set INFERENCE_AUTHKEY"
+        ) from None
+
+
+class InferenceClient:
+    """Send model requests to the model server over a Unix socket
+
+    Arguments and results are pickled by `multiprocessing.connection`, so numpy
+    audio buffers travel without any extra encoding.
+    """
+
+    def __init__(self, address: str, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+
+    def call(self, op: str, **kwargs):
+        """
+        Run one model operation on the server
+
+        Args:
+            op: Operation name (tts_paragraph, align, transcribe, ping)
+            **kwargs: Operation arguments
+
+        Returns:
+            The operation result
+        """
+        with Client(self.address, family="AF_UNIX", authkey=self.authkey) as conn:
+            conn.send({"op": op, "kwargs": kwargs})
+            reply = conn.recv()
+        if "error" in reply:
+            raise RuntimeError(f"Inference server error in {op}: {reply['error']}")
+        return reply["result"]
+
+
+@lru_cache(maxsize=1)
+def get_inference_client() -> InferenceClient:
+    """Get or create the model server client."""
+    return InferenceClient(
+        address=settings.INFERENCE_SOCKET,
+        authkey=inference_authkey(),
+    )
@@ -0,0 +1,227 @@
+"""
+Shared model server holding Kokoro and WhisperX for every API worker
+
+Run one per host:
+
+    python -m storytelling_videos.services.inference_server
+
+and point the API at it with INFERENCE_SOCKET=/path/to/socket. Every uvicorn
+worker then sends TTS and alignment requests over the Unix socket instead of
+loading its own copy of each model, and the models survive API restarts.
+
+Requests are pickled, so the socket is only reachable by the user running the
+server and every connection must present the shared key: INFERENCE_AUTHKEY if
+set, otherwise a random key generated once and kept in <socket>.key (0600),
+which the API workers of the same user read.
+"""
+
+import os
+import queue
+import secrets
+import stat
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Listener
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.services.inference_client import authkey_path
+
+logger = get_logger(__name__)
+
+
+class InferenceServer:
+    """Serve model requests from all API workers on one model thread
+
+    Connection threads only enqueue requests. A single model thread drains the
+    queue in batches (up to INFERENCE_BATCH_MAX requests collected within
+    INFERENCE_BATCH_WINDOW_MS) and runs each batch grouped by operation and
+    model configuration, so requests for the same voice or model run back to
+    back and the models are never used from two threads at once.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        authkey: bytes,
+        batch_window_ms: int = 20,
+        batch_max: int = 16,
+    ):
+        self.address = address
+        self.authkey = authkey
+        self.batch_window = batch_window_ms / 1000
+        self.batch_max = batch_max
+        self._queue: queue.Queue = queue.Queue()
+
+    def serve_forever(self) -> None:
+        """Listen on the Unix socket until the process is stopped."""
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+        threading.Thread(target=self._model_loop, daemon=True).start()
+
+        # The socket is created owner-only, not chmod-ed after the bind
+        previous_umask = os.umask(0o077)
+        try:
+            listener = Listener(self.address, family="AF_UNIX", authkey=self.authkey)
+        finally:
+            os.umask(previous_umask)
+
+        with listener:
+            logger.info(f"[Inference] Model server listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    logger.warning(f"[Inference] Rejected connection: {str(e)}")
+                    continue
+                threading.Thread(
+                    target=self._handle_connection, args=(conn,), daemon=True
+                ).start()
+
+    def _handle_connection(self, conn) -> None:
+        try:
+            while True:
+                request = conn.recv()
+                future: Future = Future()
+                self._queue.put((request, future))
+                try:
+                    reply = {"result": future.result()}
+                except Exception as e:
+                    reply = {"error": f"{type(e).__name__}: {str(e)}"}
+                try:
+                    conn.send(reply)
+                except OSError:
+                    raise
+                except Exception as e:
+                    # The result could not be pickled; the connection is fine
+                    conn.send({"error": f"{type(e).__name__}: {str(e)}"})
+        except EOFError:
+            pass
+        except OSError as e:
+            # Client went away mid-request; nothing left to reply to
+            logger.debug(f"[Inference] Connection dropped: {str(e)}")
+        finally:
+            conn.close()
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_max:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _group_key(item) -> tuple:
+        request, _ = item
+        kwargs = request.get("kwargs", {})
+        return (
+            request.get("op", ""),
+            str(kwargs.get("voice", kwargs.get("model_name", ""))),
+            str(kwargs.get("lang_code", "")),
+        )
+
+    def _model_loop(self) -> None:
+        while True:
+            batch = sorted(self._next_batch(), key=self._group_key)
+            if len(batch) > 1:
+                logger.debug(f"[Inference] Running batch of {len(batch)} requests")
+            for request, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(self._dispatch(request))
+                except Exception as e:
+                    logger.error(f"[Inference] {request.get('op')} failed: {str(e)}")
+                    future.set_exception(e)
+
+    @staticmethod
+    def _dispatch(request: dict):
+        op = request.get("op")
+        kwargs = request.get("kwargs", {})
+
+        if op == "ping":
+            return "pong"
+        if op == "tts_paragraph":
+            from storytelling_videos.services.voice_kokoro_service import KokoroVoice
+
+            return KokoroVoice.synthesize_paragraph(**kwargs)
+        if op == "align":
+            from storytelling_videos.services.whisperx_service import (
+                WhisperXSubtitleGenerator,
+            )
+
+            return WhisperXSubtitleGenerator.run_alignment(**kwargs)
+        if op == "transcribe":
+            from storytelling_videos.services.whisperx_service import (
+                WhisperXSubtitleGenerator,
+            )
+
+            return WhisperXSubtitleGenerator.run_transcription(**kwargs)
+        if op == "transcribe_batch":
+            from storytelling_videos.services.whisperx_service import (
+                WhisperXSubtitleGenerator,
+            )
+
+            return WhisperXSubtitleGenerator.run_batch_transcription(**kwargs)
+        if op in ("preload_model", "unload_model", "list_models"):
+            from storytelling_videos.models.model_schema import ModelSpec
+            from storytelling_videos.services import model_service
+
+            if op == "list_models":
+                return model_service.registry_state()
+            spec = ModelSpec(**kwargs["spec"])
+            if op == "preload_model":
+                return model_service.load_local(spec)
+            return model_service.unload_local(spec)
+        raise ValueError(f"Unknown inference operation: {op}")
+
+
+def deployment_authkey() -> bytes:
+    """
+    INFERENCE_AUTHKEY, or the random key kept next to the socket
+
+    The key file is created once, owner-only, and reused across restarts so
+    running API workers keep working. A key file others can read is replaced.
+    """
+    if settings.INFERENCE_AUTHKEY:
+        return settings.INFERENCE_AUTHKEY.encode("utf-8")
+
+    path = authkey_path()
+    try:
+        info = path.stat()
+        if info.st_uid == os.getuid() and not stat.S_IMODE(info.st_mode) & 0o077:
+            return path.read_bytes().strip()
+        logger.warning(f"[Inference] Replacing key file readable by others: {path}")
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+    authkey = secrets.token_hex(32).encode("ascii")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(authkey)
+    logger.info(f"[Inference] Generated model server key: {path}")
+    return authkey
+
+
+def main() -> None:
+    if not settings.INFERENCE_SOCKET:
+        raise SystemExit("Set INFERENCE_SOCKET to the Unix socket path to serve on")
+    InferenceServer(
+        address=settings.INFERENCE_SOCKET,
+        authkey=deployment_authkey(),
+        batch_window_ms=settings.INFERENCE_BATCH_WINDOW_MS,
+        batch_max=settings.INFERENCE_BATCH_MAX,
+    ).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
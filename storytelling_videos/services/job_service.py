@@ -0,0 +1,767 @@
+"""
+Background job execution for the video generation pipeline
+"""
+
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Iterable, Optional
+from uuid import uuid4
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import (
+    get_logger,
+    init_worker_logging,
+    job_id_var,
+    with_job_id,
+    worker_log_queue,
+)
+from storytelling_videos.core.metrics import observe_worker_stage
+from storytelling_videos.models.database_schema import StoryDB
+from storytelling_videos.models.job_schema import (
+    BatchCreate,
+    JobCreate,
+    JobDB,
+    JobResponse,
+    JobStatus,
+    StageCheckpoint,
+)
+from storytelling_videos.repositories.job_repo import JobRepo
+from storytelling_videos.repositories.mongodb_repo import MongoRepo
+from storytelling_videos.services.artifact_store_service import (
+    ArtifactStore,
+    file_sha256,
+)
+from storytelling_videos.services.openrouter_service import OpenRouterService
+from storytelling_videos.services.pipeline_service import VideoPipeline
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _BatchEntry:
+    """One job of a running batch"""
+
+    job_id: str
+    job_create: JobCreate
+    prompt: Optional[str] = None
+    content: Optional[str] = None
+    result: dict = field(default_factory=dict)
+
+
+class JobManager:
+    """Runs pipeline jobs off the event loop on per-stage worker pools"""
+
+    STAGES = ("tts", "srt", "video")
+
+    def __init__(self):
+        self.job_repo = JobRepo()
+        self.story_repo = MongoRepo()
+        self._pools: dict[str, ThreadPoolExecutor] = {}
+        self._render_pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: set[asyncio.Task] = set()
+        # Identifies this process's leases; several workers share the jobs
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        # Job id -> the task running it (a batch task runs all its jobs)
+        self._leased: dict[str, asyncio.Task] = {}
+        # Jobs whose lease another worker took over while they ran here
+        self._lost: set[str] = set()
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Create the worker pools for every pipeline stage."""
+        sizes = {
+            "tts": settings.TTS_WORKERS,
+            "srt": settings.SRT_WORKERS,
+            "video": settings.VIDEO_WORKERS,
+        }
+        for stage in self.STAGES:
+            if stage not in self._pools:
+                self._pools[stage] = ThreadPoolExecutor(
+                    max_workers=sizes[stage], thread_name_prefix=f"{stage}-worker"
+                )
+        if self._render_pool is None:
+            # Processes start on first use; spawn keeps model threads and
+            # CUDA state of this process out of the render workers. Workers
+            # send their log records back to this process's log sink.
+            self._render_pool = ProcessPoolExecutor(
+                max_workers=settings.RENDER_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker_logging,
+                initargs=(worker_log_queue(),),
+            )
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._keep_leases())
+        logger.info(f"[Jobs] Worker pools started: {sizes}")
+
+    async def _keep_leases(self) -> None:
+        """Renew the leases of running jobs, and take over expired ones
+
+        Runs every third of the lease, so a lease only runs out when its
+        worker has stopped. Expired jobs are those of a worker that died while
+        the others kept running; they are resumed here like on startup.
+        """
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            try:
+                held = list(self._leased)
+                renewed = await self.job_repo.renew_leases(held, self.owner)
+                if renewed < len(held):
+                    owned = await self.job_repo.owned_jobs(held, self.owner)
+                    self._stop_lost([job_id for job_id in held if job_id not in owned])
+                await self.recover()
+            except Exception as e:
+                logger.warning(f"[Jobs] Could not renew job leases: {e}")
+
+    def _stop_lost(self, job_ids: list[str]) -> None:
+        """
+        Cancel jobs whose lease another worker has taken over
+
+        That worker already runs them from their checkpoints; carrying on here
+        would write the same files twice. The cancelled jobs leave the job
+        documents alone. A batch runs as one task, so losing any of its jobs
+        stops the batch and requeues the jobs it still holds.
+        """
+        for job_id in job_ids:
+            task = self._leased.pop(job_id, None)
+            if task is None:
+                # Finished (or released) since the renewal
+                continue
+            logger.warning(f"[Jobs] Lost the lease on job {job_id}, stopping it")
+            self._lost.add(job_id)
+            task.cancel()
+
+    def _release(self, job_id: str) -> None:
+        """Forget a job this process no longer runs"""
+        self._leased.pop(job_id, None)
+        self._lost.discard(job_id)
+
+    async def recover(self) -> None:
+        """Resume jobs interrupted by a previous shutdown or crash.
+
+        Only jobs whose lease has expired are taken over. Each job restarts
+        from its first incomplete stage; completed stages are reused from
+        their checkpoints.
+        """
+        docs = await self.job_repo.claim_unfinished_jobs(self.owner)
+        for doc in docs:
+            if doc["_id"] in self._leased:
+                # Our own lease ran out, but the job is still running here
+                continue
+            try:
+                story = await self.story_repo.get_from_mongodb(doc["script_uuid"])
+                content = story.content
+            except ValueError:
+                if not doc["params"].get("prompt"):
+                    await self.job_repo.update_job(
+                        doc["_id"],
+                        status=JobStatus.FAILED,
+                        error="Story not found when resuming interrupted job",
+                    )
+                    continue
+                # A batch prompt item stopped before its story was saved; the
+                # job generates it first
+                content = None
+            self._schedule(doc, content)
+        if docs:
+            logger.warning(f"[Jobs] Resuming {len(docs)} interrupted job(s)")
+
+    async def resume(self, job_id: str, script_content: Optional[str]) -> JobResponse:
+        """
+        Restart a failed job from its first incomplete stage
+
+        Args:
+            job_id: Job to resume
+            script_content: Text content of the script, or None for a batch
+                prompt item whose story is generated first
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If the job does not exist or is not failed
+        """
+        if not self._pools:
+            self.start()
+        if not await self.job_repo.requeue_job(job_id, self.owner):
+            doc = await self.job_repo.get_job_document(job_id)
+            raise ValueError(f"Job {job_id} is {doc['status']}, not failed")
+        doc = await self.job_repo.get_job_document(job_id)
+        self._schedule(doc, script_content)
+        logger.info(f"[Jobs] Resuming job {job_id}")
+        return await self.job_repo.get_job(job_id)
+
+    def _schedule(self, doc: dict, script_content: Optional[str]) -> None:
+        """Run a persisted job in the background from its checkpoints"""
+        checkpoints = {
+            stage: StageCheckpoint(**checkpoint)
+            for stage, checkpoint in (doc.get("checkpoints") or {}).items()
+        }
+        params = doc["params"]
+        task = asyncio.create_task(
+            self._run(
+                doc["_id"],
+                JobCreate(**params),
+                script_content,
+                checkpoints,
+                prompt=params.get("prompt"),
+                # Batches from before the model was stored used the default
+                model=params.get("model") or BatchCreate.model_fields["model"].default,
+            )
+        )
+        self._leased[doc["_id"]] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def shutdown(self) -> None:
+        """Cancel running jobs and stop the worker pools."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools.clear()
+        if self._render_pool is not None:
+            self._render_pool.shutdown(wait=False, cancel_futures=True)
+            self._render_pool = None
+
+    async def submit(self, job_create: JobCreate, script_content: str) -> JobResponse:
+        """
+        Persist a job and schedule it in the background
+
+        Args:
+            job_create: Pipeline parameters
+            script_content: Text content of the script
+
+        Returns:
+            The queued job
+        """
+        if not self._pools:
+            self.start()
+
+        job = await self.job_repo.create_job(
+            JobDB(
+                script_uuid=job_create.script_uuid,
+                params=job_create.model_dump(mode="json"),
+            ),
+            owner=self.owner,
+        )
+        task = asyncio.create_task(self._run(job.id, job_create, script_content))
+        self._leased[job.id] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info(f"[Jobs] Queued job {job.id} for {job_create.script_uuid}")
+        return job
+
+    async def submit_batch(
+        self, batch_create: BatchCreate, contents: dict[str, str]
+    ) -> str:
+        """
+        Persist one job per batch item and schedule them to run together
+
+        Args:
+            batch_create: Batch items and shared parameters
+            contents: Script content of the items that reference a story
+
+        Returns:
+            The batch id
+        """
+        if not self._pools:
+            self.start()
+
+        batch_id = str(uuid4())
+        entries = []
+        for item in batch_create.items:
+            job_create = JobCreate(
+                # Prompt items get their story id up front
+                script_uuid=item.script_uuid or str(uuid4()),
+                voice=item.voice or batch_create.voice,
+                whisper_model=batch_create.whisper_model,
+                speed=batch_create.speed,
+                subtitle_mode=batch_create.subtitle_mode,
+                stock_video_path=item.stock_video_path,
+                seed=item.seed,
+                preview=item.preview,
+            )
+            job = await self.job_repo.create_job(
+                JobDB(
+                    script_uuid=job_create.script_uuid,
+                    params={
+                        **job_create.model_dump(mode="json"),
+                        "prompt": item.prompt,
+                        "model": batch_create.model,
+                    },
+                    batch_id=batch_id,
+                ),
+                owner=self.owner,
+            )
+            entries.append(
+                _BatchEntry(
+                    job_id=job.id,
+                    job_create=job_create,
+                    prompt=item.prompt,
+                    content=contents.get(job_create.script_uuid),
+                )
+            )
+
+        task = asyncio.create_task(self._run_batch(batch_id, batch_create, entries))
+        for entry in entries:
+            self._leased[entry.job_id] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info(f"[Jobs] Queued batch {batch_id} with {len(entries)} job(s)")
+        return batch_id
+
+    async def _run_stage(self, stage: str, func, *args, **kwargs) -> dict:
+        loop = asyncio.get_running_loop()
+        # run_in_executor does not carry context variables (the job id) over
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._pools[stage], context.run, partial(func, *args, **kwargs)
+        )
+
+    async def _run(
+        self,
+        job_id: str,
+        job_create: JobCreate,
+        script_content: Optional[str],
+        checkpoints: Optional[dict[str, StageCheckpoint]] = None,
+        prompt: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> Optional[dict]:
+        # Each job runs in its own task, so this only tags this job's records
+        job_id_var.set(job_id)
+        result: dict = {"script_uuid": job_create.script_uuid}
+        checkpoints = checkpoints or {}
+        try:
+            if script_content is None:
+                await self.job_repo.update_job(
+                    job_id, status=JobStatus.RUNNING, stage="story"
+                )
+                script_content = await self._story_for_prompt(
+                    job_create.script_uuid, prompt, model
+                )
+
+            pipeline = VideoPipeline(
+                script_uuid=job_create.script_uuid, script_content=script_content
+            )
+            stages = (
+                ("tts", pipeline.generate_tts),
+                ("srt", pipeline.generate_srt),
+                ("video", pipeline.generate_video),
+            )
+            for stage, func in stages:
+                kwargs = self._stage_kwargs(stage, job_create)
+                input_hash = await asyncio.to_thread(
+                    self._input_hash, stage, kwargs, script_content, result
+                )
+                done = checkpoints.get(stage)
+                if done is not None and await asyncio.to_thread(
+                    self._is_reusable, done, input_hash
+                ):
+                    logger.info(f"[Jobs] Job {job_id}: {stage} already done, reusing")
+                    result.update(done.outputs)
+                    continue
+
+                await self.job_repo.update_job(
+                    job_id, status=JobStatus.RUNNING, stage=stage
+                )
+                outputs = await self._run_checkpointed(
+                    job_id, job_create.script_uuid, stage, input_hash, func, kwargs
+                )
+                result.update(outputs)
+
+            result["status"] = "success"
+            await self.job_repo.update_job(
+                job_id, status=JobStatus.COMPLETED, result=result
+            )
+            logger.info(f"[Jobs] Job {job_id} completed")
+            return result
+
+        except asyncio.CancelledError:
+            # Interrupted by shutdown: leave it queued and unleased so the
+            # next process resumes it from its checkpoints right away. A job
+            # whose lease was lost belongs to another worker now.
+            if job_id not in self._lost:
+                await asyncio.shield(self._requeue([job_id]))
+            raise
+        except Exception as e:
+            logger.error(f"[Jobs] Job {job_id} failed: {str(e)}")
+            await self.job_repo.update_job(
+                job_id, status=JobStatus.FAILED, error=str(e)
+            )
+            return None
+        finally:
+            self._release(job_id)
+
+    async def _requeue(self, job_ids: list[str]) -> None:
+        """Put interrupted jobs back in the queue and give up their leases"""
+        for job_id in job_ids:
+            await self.job_repo.update_job(job_id, status=JobStatus.QUEUED)
+        await self.job_repo.release_leases(job_ids, self.owner)
+
+    async def _run_checkpointed(
+        self,
+        job_id: str,
+        script_uuid: str,
+        stage: str,
+        input_hash: str,
+        func,
+        kwargs: dict,
+    ) -> dict:
+        """Run one stage, recording its checkpoint before and after"""
+        checkpoint = StageCheckpoint(
+            status=JobStatus.RUNNING,
+            input_hash=input_hash,
+            started_at=datetime.now(),
+        )
+        await self.job_repo.update_checkpoint(job_id, stage, checkpoint)
+        started = time.perf_counter()
+        try:
+            stage_result = await self._run_stage(stage, func, **kwargs)
+        except Exception as e:
+            checkpoint.status = JobStatus.FAILED
+            checkpoint.error = str(e)
+            checkpoint.duration_s = round(time.perf_counter() - started, 3)
+            checkpoint.finished_at = datetime.now()
+            await self.job_repo.update_checkpoint(job_id, stage, checkpoint)
+            raise
+
+        await self._record_metrics(job_id, script_uuid, stage_result)
+        outputs = {k: v for k, v in stage_result.items() if k.endswith("_path")}
+        checkpoint.status = JobStatus.COMPLETED
+        checkpoint.outputs = outputs
+        checkpoint.output_sha256 = await asyncio.to_thread(
+            lambda: {name: file_sha256(Path(path)) for name, path in outputs.items()}
+        )
+        checkpoint.duration_s = round(time.perf_counter() - started, 3)
+        checkpoint.finished_at = datetime.now()
+        await self.job_repo.update_checkpoint(job_id, stage, checkpoint)
+        logger.info(
+            f"[Jobs] Job {job_id}: {stage} done in {checkpoint.duration_s:.1f}s"
+        )
+        return outputs
+
+    @staticmethod
+    def _stage_kwargs(stage: str, job_create: JobCreate) -> dict:
+        """Parameters of one stage; part of its checkpoint's input hash"""
+        if stage == "tts":
+            return {
+                "voice": job_create.voice,
+                "speed": job_create.speed,
+                "subtitle_mode": job_create.subtitle_mode,
+            }
+        if stage == "srt":
+            return {
+                "model_name": job_create.whisper_model,
+                "subtitle_mode": job_create.subtitle_mode,
+            }
+        return {
+            "stock_video_path": job_create.stock_video_path,
+            "seed": job_create.seed,
+            "preview": job_create.preview,
+        }
+
+    @staticmethod
+    def _input_hash(
+        stage: str, kwargs: dict, script_content: str, upstream: dict
+    ) -> str:
+        """
+        Hash everything a stage's output depends on
+
+        The stage parameters, the script text and the content of the files
+        produced by earlier stages. A stage is only skipped on resume if this
+        hash still matches its checkpoint.
+        """
+        return ArtifactStore.compute_key(
+            f"stage_{stage}",
+            {
+                "params": {k: getattr(v, "value", v) for k, v in kwargs.items()},
+                "script": script_content,
+                "upstream": {
+                    name: file_sha256(Path(path))
+                    for name, path in sorted(upstream.items())
+                    if name.endswith("_path") and Path(path).exists()
+                },
+            },
+        )
+
+    @staticmethod
+    def _is_reusable(checkpoint: StageCheckpoint, input_hash: str) -> bool:
+        """A completed checkpoint whose inputs are unchanged and outputs intact"""
+        if checkpoint.status != JobStatus.COMPLETED:
+            return False
+        if checkpoint.input_hash != input_hash:
+            return False
+        for name, path in checkpoint.outputs.items():
+            path = Path(path)
+            # A missing or modified output (e.g. written by a killed process)
+            # invalidates the checkpoint
+            if not path.exists():
+                return False
+            if file_sha256(path) != checkpoint.output_sha256.get(name):
+                return False
+        return True
+
+    async def _run_batch(
+        self, batch_id: str, batch_create: BatchCreate, entries: list[_BatchEntry]
+    ) -> None:
+        """
+        Run every job of a batch stage by stage, sharing model work
+
+        Stories are generated concurrently, TTS runs grouped by voice, WhisperX
+        transcribes all files in shared batches and renders go to the process
+        pool. A job that fails drops out of the remaining stages; the others
+        carry on.
+        """
+        # Shared stages are logged under the batch id, per-job work below
+        # under each job's id
+        job_id_var.set(batch_id)
+        active = list(entries)
+        try:
+            prompted = [entry for entry in active if entry.content is None]
+            if prompted:
+                await self._mark_stage(prompted, "story")
+                outcomes = await asyncio.gather(
+                    *(
+                        self._generate_story(entry, batch_create.model)
+                        for entry in prompted
+                    ),
+                    return_exceptions=True,
+                )
+                await self._settle(zip(prompted, outcomes))
+                # Content is only set for stories that were generated
+                active = [entry for entry in active if entry.content is not None]
+
+            groups: dict[tuple, list[_BatchEntry]] = {}
+            for entry in active:
+                key = (entry.job_create.voice, entry.job_create.speed)
+                groups.setdefault(key, []).append(entry)
+            started_at = await self._mark_stage(active, "tts")
+            group_results = await asyncio.gather(
+                *(
+                    self._run_stage(
+                        "tts",
+                        VideoPipeline.generate_tts_group,
+                        [(e.job_create.script_uuid, e.content) for e in group],
+                        voice=voice,
+                        speed=speed,
+                        subtitle_mode=batch_create.subtitle_mode,
+                    )
+                    for (voice, speed), group in groups.items()
+                )
+            )
+            active = await self._settle(
+                (
+                    (entry, outcome)
+                    for group, outcomes in zip(groups.values(), group_results)
+                    for entry, outcome in zip(group, outcomes)
+                ),
+                stage="tts",
+                started_at=started_at,
+            )
+
+            if active:
+                started_at = await self._mark_stage(active, "srt")
+                outcomes = await self._run_stage(
+                    "srt",
+                    VideoPipeline.generate_srt_batch,
+                    [(e.job_create.script_uuid, e.content) for e in active],
+                    model_name=batch_create.whisper_model,
+                    subtitle_mode=batch_create.subtitle_mode,
+                )
+                active = await self._settle(
+                    zip(active, outcomes), stage="srt", started_at=started_at
+                )
+
+            if active:
+                started_at = await self._mark_stage(active, "video")
+                loop = asyncio.get_running_loop()
+                outcomes = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(
+                            self._render_pool,
+                            partial(
+                                with_job_id,
+                                entry.job_id,
+                                VideoPipeline.render_video,
+                                entry.job_create.script_uuid,
+                                entry.job_create.stock_video_path,
+                                entry.job_create.seed,
+                                entry.job_create.preview,
+                            ),
+                        )
+                        for entry in active
+                    ),
+                    return_exceptions=True,
+                )
+                for outcome in outcomes:
+                    if isinstance(outcome, dict) and "metrics" in outcome:
+                        observe_worker_stage(outcome["metrics"])
+                active = await self._settle(
+                    zip(active, outcomes), stage="video", started_at=started_at
+                )
+
+            for entry in active:
+                await self.job_repo.update_job(
+                    entry.job_id,
+                    status=JobStatus.COMPLETED,
+                    result={**entry.result, "status": "success"},
+                )
+            logger.info(
+                f"[Jobs] Batch {batch_id} finished: "
+                f"{len(active)}/{len(entries)} job(s) completed"
+            )
+
+        except asyncio.CancelledError:
+            # Left queued; the next process resumes each job on its own
+            await asyncio.shield(
+                self._requeue(
+                    [entry.job_id for entry in active if entry.job_id not in self._lost]
+                )
+            )
+            raise
+        except Exception as e:
+            logger.error(f"[Jobs] Batch {batch_id} failed: {str(e)}")
+            for entry in active:
+                await self.job_repo.update_job(
+                    entry.job_id, status=JobStatus.FAILED, error=str(e)
+                )
+        finally:
+            for entry in entries:
+                self._release(entry.job_id)
+
+    async def _generate_story(self, entry: _BatchEntry, model: str) -> dict:
+        # Runs as its own task under gather()
+        job_id_var.set(entry.job_id)
+        entry.content = await self._story_for_prompt(
+            entry.job_create.script_uuid, entry.prompt, model
+        )
+        return {}
+
+    async def _story_for_prompt(self, script_uuid: str, prompt: str, model: str) -> str:
+        """Generate a prompt item's story and save it under its story id"""
+        story = await OpenRouterService.generate_story(prompt=prompt, model=model)
+        await self.story_repo.post_to_mongodb(
+            StoryDB(topic=prompt, content=story.content, model=story.model),
+            story_id=script_uuid,
+        )
+        return story.content
+
+    async def _mark_stage(self, entries: list[_BatchEntry], stage: str) -> datetime:
+        """Mark the entries as running `stage`; returns when the stage started"""
+        for entry in entries:
+            await self.job_repo.update_job(
+                entry.job_id, status=JobStatus.RUNNING, stage=stage
+            )
+        return datetime.now()
+
+    async def _settle(
+        self,
+        outcomes: Iterable[tuple],
+        stage: Optional[str] = None,
+        started_at: Optional[datetime] = None,
+    ) -> list[_BatchEntry]:
+        """
+        Record stage outcomes; fail errored jobs and return the rest
+
+        For pipeline stages every job also gets the checkpoint `_run` would
+        have written, so a resumed job skips the stages its batch finished.
+
+        Args:
+            outcomes: (entry, stage result or exception) pairs
+            stage: Pipeline stage the outcomes are from, if it is checkpointed
+            started_at: When the stage started for the whole group
+        """
+        remaining = []
+        for entry, outcome in outcomes:
+            if stage is not None:
+                await self._checkpoint_entry(entry, stage, outcome, started_at)
+            if isinstance(outcome, BaseException):
+                logger.error(f"[Jobs] Job {entry.job_id} failed: {str(outcome)}")
+                await self.job_repo.update_job(
+                    entry.job_id, status=JobStatus.FAILED, error=str(outcome)
+                )
+                self._release(entry.job_id)
+                continue
+            await self._record_metrics(
+                entry.job_id, entry.job_create.script_uuid, outcome
+            )
+            entry.result.update(
+                {k: v for k, v in outcome.items() if k.endswith("_path")}
+            )
+            entry.result["script_uuid"] = entry.job_create.script_uuid
+            remaining.append(entry)
+        return remaining
+
+    async def _checkpoint_entry(
+        self,
+        entry: _BatchEntry,
+        stage: str,
+        outcome,
+        started_at: Optional[datetime],
+    ) -> None:
+        """Write a batch entry's checkpoint for one stage, as `_run` does"""
+        # entry.result holds the earlier stages' outputs, the same upstream
+        # `_run` hashes before running the stage
+        input_hash = await asyncio.to_thread(
+            self._input_hash,
+            stage,
+            self._stage_kwargs(stage, entry.job_create),
+            entry.content,
+            entry.result,
+        )
+        finished_at = datetime.now()
+        checkpoint = StageCheckpoint(
+            status=JobStatus.COMPLETED,
+            input_hash=input_hash,
+            started_at=started_at,
+            finished_at=finished_at,
+        )
+        if started_at is not None:
+            # Shared by the group: the batch runs the stage for all at once
+            checkpoint.duration_s = round((finished_at - started_at).total_seconds(), 3)
+        if isinstance(outcome, BaseException):
+            checkpoint.status = JobStatus.FAILED
+            checkpoint.error = str(outcome)
+        else:
+            checkpoint.outputs = {
+                k: v for k, v in outcome.items() if k.endswith("_path")
+            }
+            checkpoint.output_sha256 = await asyncio.to_thread(
+                lambda: {
+                    name: file_sha256(Path(path))
+                    for name, path in checkpoint.outputs.items()
+                }
+            )
+        await self.job_repo.update_checkpoint(entry.job_id, stage, checkpoint)
+
+    async def _record_metrics(
+        self, job_id: str, script_uuid: str, stage_result: dict
+    ) -> None:
+        """Persist a stage's metrics on its story; never fails the job"""
+        stats = stage_result.get("metrics")
+        if not stats:
+            return
+        try:
+            await self.story_repo.record_metrics(script_uuid, job_id, stats)
+        except Exception as e:
+            logger.warning(f"[Jobs] Could not store metrics for {job_id}: {e}")
+
+
+@lru_cache(maxsize=1)
+def get_job_manager() -> JobManager:
+    """Get or create the process-wide job manager."""
+    return JobManager()
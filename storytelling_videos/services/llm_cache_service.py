@@ -0,0 +1,190 @@
+"""
+Cache of LLM generations keyed by prompt, model and system prompt
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Awaitable, Callable, Optional
+
+from pymongo import IndexModel
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.core.metrics import LLM_CACHE_REQUESTS
+from storytelling_videos.core.mongodb_core import get_llm_cache_collection
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class Generation:
+    """A completion and the model that actually produced it"""
+
+    content: str
+    model: str
+
+
+def generation_key(prompt: str, model: str, system_prompt: str) -> str:
+    """Hash everything that determines a completion"""
+    payload = json.dumps(
+        {"prompt": prompt, "model": model, "system_prompt": system_prompt},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """Two-level cache of generated stories with request coalescing
+
+    Lookups go to an in-process LRU first, then to a Mongo collection whose
+    documents expire through a TTL index, so every API process shares the
+    generations. Concurrent requests for the same key share one in-flight
+    call. Mongo errors are logged and treated as misses; they never fail a
+    generation. A completion from another model than the one requested (a
+    hedge the fallback won) is returned but not cached under the request.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.collection = get_llm_cache_collection()
+        # key -> (generation, monotonic expiry)
+        self._entries: "OrderedDict[str, tuple[Generation, float]]" = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    async def ensure_indexes(self) -> None:
+        """Expire documents at their own `expires_at` (TTL of 0 seconds)."""
+        await self.collection.create_indexes(
+            [IndexModel("expires_at", name="expires_at_ttl", expireAfterSeconds=0)]
+        )
+
+    async def get_or_generate(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[Generation]],
+        model: str,
+        bypass: bool = False,
+    ) -> Generation:
+        """
+        Return the cached generation for `key`, generating it on a miss
+
+        Args:
+            key: Result of `generation_key`
+            generate: Makes the API call on a miss
+            model: Model the key was computed for; only its completions are
+                cached under the key
+            bypass: Skip the lookup and always call the API; the fresh
+                result replaces the cached one
+
+        Returns:
+            The generation
+        """
+        if bypass:
+            LLM_CACHE_REQUESTS.inc(result="bypass")
+            generation = await generate()
+            await self._store(key, generation, model)
+            return generation
+
+        generation = self._get_local(key)
+        if generation is not None:
+            LLM_CACHE_REQUESTS.inc(result="memory")
+            return generation
+
+        task = self._inflight.get(key)
+        if task is not None:
+            LLM_CACHE_REQUESTS.inc(result="coalesced")
+        else:
+            task = asyncio.ensure_future(self._load(key, generate, model))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._settle(key, done))
+        # A cancelled caller must not cancel the call the others wait on
+        return await asyncio.shield(task)
+
+    def _get_local(self, key: str) -> Optional[Generation]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        generation, expires = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return generation
+
+    def _put_local(self, key: str, generation: Generation) -> None:
+        self._entries[key] = (generation, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _settle(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        # Retrieve the exception so it is not reported as never retrieved
+        # when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _load(
+        self, key: str, generate: Callable[[], Awaitable[Generation]], model: str
+    ) -> Generation:
+        try:
+            doc = await self.collection.find_one({"_id": key})
+        except Exception as e:
+            logger.warning(f"[LLMCache] Lookup failed, generating: {str(e)}")
+            doc = None
+        if doc is not None and not self._expired(doc):
+            LLM_CACHE_REQUESTS.inc(result="mongo")
+            generation = Generation(doc["content"], doc.get("model") or model)
+            self._put_local(key, generation)
+            return generation
+
+        LLM_CACHE_REQUESTS.inc(result="miss")
+        generation = await generate()
+        await self._store(key, generation, model)
+        return generation
+
+    @staticmethod
+    def _expired(doc: dict) -> bool:
+        # The TTL monitor only runs once a minute; don't serve stale documents
+        expires_at = doc.get("expires_at")
+        if expires_at is None:
+            return True
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return expires_at <= datetime.now(timezone.utc)
+
+    async def _store(self, key: str, generation: Generation, model: str) -> None:
+        if generation.model != model:
+            logger.info(f"[LLMCache] Not caching {generation.model} output for {model}")
+            return
+        self._put_local(key, generation)
+        now = datetime.now(timezone.utc)
+        try:
+            await self.collection.replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "model": generation.model,
+                    "content": generation.content,
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"[LLMCache] Could not persist generation: {str(e)}")
+
+
+@lru_cache(maxsize=1)
+def get_generation_cache() -> GenerationCache:
+    """Get or create the process-wide generation cache."""
+    return GenerationCache(
+        max_entries=settings.LLM_CACHE_SIZE,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    )
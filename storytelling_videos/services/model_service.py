@@ -0,0 +1,113 @@
+"""
+Service for preloading, unloading and listing models in the model registry
+"""
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.core.model_registry import ModelKey, get_model_registry
+from storytelling_videos.models.model_schema import ModelKind, ModelSpec
+from storytelling_videos.services.inference_client import (
+    get_inference_client,
+    inference_server_enabled,
+)
+
+logger = get_logger(__name__)
+
+
+def _model_key(spec: ModelSpec) -> ModelKey:
+    """Build the registry key the services use for this spec."""
+    if spec.kind == ModelKind.KOKORO:
+        from storytelling_videos.services.voice_kokoro_service import KokoroVoice
+
+        return KokoroVoice.model_key(spec.lang or "a")
+
+    from storytelling_videos.services.whisperx_service import (
+        WhisperXSubtitleGenerator,
+    )
+
+    device = spec.device or "cpu"
+    if spec.kind == ModelKind.WHISPERX:
+        return WhisperXSubtitleGenerator.asr_model_key(
+            spec.name or "tiny", device, spec.compute_type or "int8"
+        )
+    return WhisperXSubtitleGenerator.align_model_key(device, spec.lang or "en")
+
+
+def load_local(spec: ModelSpec) -> dict:
+    """Load a model into this process's registry and return its state."""
+    logger.info(f"[Models] Preloading {spec.kind.value}")
+    if spec.kind == ModelKind.KOKORO:
+        from storytelling_videos.services.voice_kokoro_service import KokoroVoice
+
+        KokoroVoice.get_pipeline(spec.lang or "a")
+        return registry_state()
+
+    from storytelling_videos.services.whisperx_service import (
+        WhisperXSubtitleGenerator,
+    )
+
+    device = spec.device or "cpu"
+    if spec.kind == ModelKind.WHISPERX:
+        WhisperXSubtitleGenerator.get_asr_model(
+            spec.name or "tiny", device, spec.compute_type or "int8"
+        )
+    else:
+        WhisperXSubtitleGenerator.get_align_model(device, spec.lang or "en")
+    return registry_state()
+
+
+def unload_local(spec: ModelSpec) -> bool:
+    """Drop a model from this process's registry."""
+    return get_model_registry().unload(_model_key(spec))
+
+
+def registry_state() -> dict:
+    """Memory budget, estimated usage and loaded models of this process."""
+    registry = get_model_registry()
+    return {
+        "budget_mb": settings.MODEL_MEMORY_BUDGET_MB,
+        "used_mb": round(registry.used_mb(), 1),
+        "models": registry.loaded(),
+    }
+
+
+def list_models() -> dict:
+    """
+    Describe the models currently held in memory
+
+    Returns:
+        Dictionary with the memory budget, estimated usage and loaded models
+    """
+    if inference_server_enabled():
+        return get_inference_client().call("list_models")
+    return registry_state()
+
+
+def preload_model(spec: ModelSpec) -> dict:
+    """
+    Load a model ahead of the first request that needs it
+
+    Args:
+        spec: Model configuration to load
+
+    Returns:
+        Registry state after loading
+    """
+    if inference_server_enabled():
+        return get_inference_client().call("preload_model", spec=spec.model_dump())
+    return load_local(spec)
+
+
+def unload_model(spec: ModelSpec) -> bool:
+    """
+    Drop a model from memory
+
+    Args:
+        spec: Model configuration to unload
+
+    Returns:
+        True if the model was loaded
+    """
+    if inference_server_enabled():
+        return get_inference_client().call("unload_model", spec=spec.model_dump())
+    return unload_local(spec)
@@ -1,77 +1,184 @@
-from storytelling_videos.core.loggings import get_logger
-from storytelling_videos.core.openrouter_core import get_openrouter_client
-
-logger = get_logger(__name__)
-
-
-SYSTEM_PROMPT = """
-You are a masterful explainer and storyteller for short-form video scripts (TikTok/YouTube Shorts, 60–90 seconds).
-
-CRITICAL RULES:
-- ONLY output spoken words/voiceover
-- NO stage directions, formatting, or visual descriptions
-- NO character names
-- ONLY the narration as plain text
-- Begin with a powerful hook in the first sentence
-- Every line must drive the narrative forward with zero filler
-- Use pauses only to emphasize emotional beats or major idea shifts
-- Allow at most one analogy unless more are explicitly requested
-- Maintain a confident, curious narrator voice with a subtle sense of urgency
-- Compress complex ideas into intuitive, bite-sized steps
-- Do not use contractions (e.g., “they are,” “do not”)
-
-EXPLAIN COMPLEX TOPICS:
-- Make any topic understandable for all levels
-- Start simple, then build up naturally
-- Complete the whole explanation with details.
-- Use clear analogies, relatable examples, and simple language
-- Introduce jargon only after explaining it
-- Keep the flow smooth, expressive, and precise
-- Use varied punctuation and rhythm for realism
-
-STYLE:
-- Conversational and engaging
-- Use specific details when useful
-- Reference everyday situations subtly
-- Inject personality and wit without breaking the narrator role
-- End with a single-sentence takeaway that feels like a revelation or a challenge
-
-OUTPUT:
-- Only the script words. Nothing else.
-"""
-
-
-class OpenRouterService:
-    @staticmethod
-    async def generate_story(prompt: str, model: str) -> str:
-        """
-        Generate a story using OpenRouter API.
-
-        Args:
-            prompt: The prompt/topic to generate a story about
-            model: The model to use
-
-        Returns:
-            Generated story text
-        """
-        client = get_openrouter_client()
-
-        try:
-            response = await client.post(
-                "/chat/completions",
-                json={
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": SYSTEM_PROMPT},
-                        {"role": "user", "content": prompt},
-                    ],
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            story = data["choices"][0]["message"]["content"]
-            logger.info(f"Story generated successfully with model {model}")
-            return story
-        except Exception as e:
-            logger.error(f"Error generating story: {str(e)}")
-            raise
+import asyncio
+import json
+from typing import AsyncIterator
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.core.metrics import OPENROUTER_RETRIES
+from storytelling_videos.core.openrouter_core import (
+    RETRY_STATUS,
+    get_openrouter_client,
+    hedged,
+    model_semaphore,
+    post_completion,
+    retry_delay,
+)
+from storytelling_videos.services.llm_cache_service import (
+    Generation,
+    generation_key,
+    get_generation_cache,
+)
+
+logger = get_logger(__name__)
+
+
+SYSTEM_PROMPT = """
+You are a masterful explainer and storyteller for short-form video scripts (TikTok/YouTube Shorts, 60–90 seconds).
+
+CRITICAL RULES:
+- ONLY output spoken words/voiceover
+- NO stage directions, formatting, or visual descriptions
+- NO character names
+- ONLY the narration as plain text
+- Begin with a powerful hook in the first sentence
+- Every line must drive the narrative forward with zero filler
+- Use pauses only to emphasize emotional beats or major idea shifts
+- Allow at most one analogy unless more are explicitly requested
+- Maintain a confident, curious narrator voice with a subtle sense of urgency
+- Compress complex ideas into intuitive, bite-sized steps
+- Do not use contractions (e.g., “they are,” “do not”)
+
+EXPLAIN COMPLEX TOPICS:
+- Make any topic understandable for all levels
+- Start simple, then build up naturally
+- Complete the whole explanation with details.
+- Use clear analogies, relatable examples, and simple language
+- Introduce jargon only after explaining it
+- Keep the flow smooth, expressive, and precise
+- Use varied punctuation and rhythm for realism
+
+STYLE:
+- Conversational and engaging
+- Use specific details when useful
+- Reference everyday situations subtly
+- Inject personality and wit without breaking the narrator role
+- End with a single-sentence takeaway that feels like a revelation or a challenge
+
+OUTPUT:
+- Only the script words. Nothing else.
+"""
+
+
+class OpenRouterService:
+    @staticmethod
+    def _payload(prompt: str, model: str) -> dict:
+        return {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+        }
+
+    @staticmethod
+    async def generate_story(
+        prompt: str, model: str, bypass_cache: bool = False
+    ) -> Generation:
+        """
+        Generate a story using OpenRouter API.
+
+        With `LLM_CACHE_ENABLED`, identical (prompt, model, system prompt)
+        requests are served from the generation cache and concurrent ones
+        share a single API call.
+
+        Args:
+            prompt: The prompt/topic to generate a story about
+            model: The model to use
+            bypass_cache: Call the API even if the prompt is cached
+
+        Returns:
+            The story text and the model that wrote it, which is the fallback
+            model when it won a hedge
+        """
+        if not settings.LLM_CACHE_ENABLED:
+            return await OpenRouterService._request_story(prompt, model)
+        return await get_generation_cache().get_or_generate(
+            generation_key(prompt, model, SYSTEM_PROMPT),
+            lambda: OpenRouterService._request_story(prompt, model),
+            model=model,
+            bypass=bypass_cache,
+        )
+
+    @staticmethod
+    async def _request_story(prompt: str, model: str) -> Generation:
+        """Generate with retries, hedged to the fallback model if configured"""
+        fallback = settings.OPENROUTER_FALLBACK_MODEL
+        if not fallback or fallback == model:
+            return await OpenRouterService._complete(prompt, model)
+        return await hedged(
+            lambda: OpenRouterService._complete(prompt, model),
+            lambda: OpenRouterService._complete(prompt, fallback),
+            delay=settings.OPENROUTER_HEDGE_AFTER_SECONDS,
+        )
+
+    @staticmethod
+    async def _complete(prompt: str, model: str) -> Generation:
+        try:
+            data = await post_completion(OpenRouterService._payload(prompt, model))
+            story = data["choices"][0]["message"]["content"]
+            logger.info(f"Story generated successfully with model {model}")
+            return Generation(story, model)
+        except Exception as e:
+            logger.error(f"Error generating story: {str(e)}")
+            raise
+
+    @staticmethod
+    async def stream_story(prompt: str, model: str) -> AsyncIterator[str]:
+        """
+        Stream a story from the OpenRouter API as it is generated.
+
+        Reads the server-sent events of a `stream: true` completion. Rate
+        limits and 5xx answers are retried before the first event arrives;
+        once text has been yielded, errors are raised.
+
+        Args:
+            prompt: The prompt/topic to generate a story about
+            model: The model to use
+
+        Yields:
+            Text deltas in generation order
+        """
+        client = get_openrouter_client()
+        payload = {**OpenRouterService._payload(prompt, model), "stream": True}
+        retries = settings.OPENROUTER_MAX_RETRIES
+
+        try:
+            async with model_semaphore(model):
+                for attempt in range(retries + 1):
+                    async with client.stream(
+                        "POST", "/chat/completions", json=payload
+                    ) as response:
+                        if response.status_code in RETRY_STATUS and attempt < retries:
+                            delay = retry_delay(attempt, response)
+                            OPENROUTER_RETRIES.inc(reason=str(response.status_code))
+                            logger.warning(
+                                f"OpenRouter {model} stream failed "
+                                f"({response.status_code}), retry in {delay:.1f}s"
+                            )
+                        else:
+                            response.raise_for_status()
+                            async for delta in OpenRouterService._deltas(response):
+                                yield delta
+                            break
+                    await asyncio.sleep(delay)
+            logger.info(f"Story streamed successfully with model {model}")
+        except Exception as e:
+            logger.error(f"Error streaming story: {str(e)}")
+            raise
+
+    @staticmethod
+    async def _deltas(response) -> AsyncIterator[str]:
+        async for line in response.aiter_lines():
+            # Skip blank separators and ": OPENROUTER PROCESSING" comments
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if "error" in chunk:
+                raise RuntimeError(f"OpenRouter stream error: {chunk['error']}")
+            choices = chunk.get("choices") or [{}]
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
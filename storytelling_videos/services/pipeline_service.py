@@ -6,6 +6,9 @@ from pathlib import Path
 from typing import Optional
 
 from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.core.metrics import stage_timer
+from storytelling_videos.models.job_schema import SubtitleMode
+from storytelling_videos.services.audio_buffer import AudioBuffer
 from storytelling_videos.services.preprocess_text_service import add_pauses
 from storytelling_videos.services.video_gen_service import VideoGeneration
 from storytelling_videos.services.voice_kokoro_service import KokoroVoice
@@ -28,63 +31,169 @@ class VideoPipeline:
         self.script_uuid = script_uuid
         self.script_content = script_content
         self.parent_dir = Path.cwd()
+        # Audio handed from TTS to the subtitle and video stages in memory
+        self.audio: Optional[AudioBuffer] = None
 
-    def generate_tts_and_srt(
-        self, voice: str = "am_liam", model_name: str = "tiny", speed: float = 1
+    @property
+    def spoken_text(self) -> str:
+        """The script as synthesized; subtitles are aligned against the same text"""
+        return add_pauses(self.script_content)
+
+    def generate_tts(
+        self,
+        voice: str = "am_liam",
+        speed: float = 1,
+        subtitle_mode: SubtitleMode = SubtitleMode.KOKORO,
     ) -> dict:
         """
-        Generate TTS audio and word-level subtitles
+        Generate TTS audio for the script
 
         Args:
             voice: Voice to use for TTS (default: am_liam)
-            model_name: Whisper model for subtitles (default: tiny)
             speed: Speech speed (default: 1.0)
+            subtitle_mode: With `kokoro`, subtitles are built from the synthesis
+                timestamps in the same pass
 
         Returns:
-            Dictionary with paths to audio and SRT files
+            Dictionary with path to the audio file (and SRT file, if built)
         """
         try:
             logger.info(f"[Pipeline] Step 1/3: Generating TTS for {self.script_uuid}")
 
-            # Process and generate TTS
-            script_processed = add_pauses(self.script_content)
-            kokoro = KokoroVoice(
-                script_uuid=self.script_uuid,
-                text=script_processed,
-                voice=voice,
-                lang_code="a",
-                speed=speed,
-            )
-            generator = kokoro.synthesize()
-            audio_path = kokoro.save_audio(generator=generator)
+            with stage_timer("tts") as metrics:
+                kokoro = KokoroVoice(
+                    script_uuid=self.script_uuid,
+                    text=self.spoken_text,
+                    voice=voice,
+                    lang_code="a",
+                    speed=speed,
+                )
+                generator = kokoro.synthesize()
+                srt_path = (
+                    kokoro.srt_path if subtitle_mode == SubtitleMode.KOKORO else None
+                )
+                audio_path = kokoro.save_audio(generator=generator, srt_path=srt_path)
+                self.audio = kokoro.audio_buffer()
+                metrics.update(kokoro.stats)
+
+            result = {
+                "audio_path": str(audio_path),
+                "status": "success",
+                "metrics": metrics,
+            }
+            if srt_path is not None and srt_path.exists():
+                result["srt_path"] = str(srt_path)
+            return result
+
+        except Exception as e:
+            logger.error(f"[Pipeline] Error in TTS generation: {str(e)}")
+            raise
+
+    def generate_srt(
+        self,
+        model_name: str = "tiny",
+        subtitle_mode: SubtitleMode = SubtitleMode.KOKORO,
+    ) -> dict:
+        """
+        Generate word-level subtitles for the synthesized audio
+
+        Args:
+            model_name: Whisper model for subtitles (default: tiny)
+            subtitle_mode: With `kokoro`, reuse the SRT written during TTS and
+                only fall back to forced alignment when it is missing; `align`
+                aligns the script text without transcribing; `whisperx` runs
+                full transcription
 
-            # Generate subtitles
+        Returns:
+            Dictionary with path to the SRT file
+        """
+        try:
             logger.info("[Pipeline] Step 2/3: Generating SRT subtitles")
 
-            subtitle_generator = WhisperXSubtitleGenerator(
-                script_uuid=self.script_uuid, model_name=model_name
+            srt_path = (
+                self.parent_dir
+                / "saved_audio_kokoro"
+                / self.script_uuid
+                / "full_sub_words.srt"
             )
-            srt_path = subtitle_generator.generate_word_level_srt()
-
-            logger.info(f"[Pipeline] SRT subtitles saved: {srt_path}")
+            with stage_timer("srt") as metrics:
+                if subtitle_mode == SubtitleMode.KOKORO and srt_path.exists():
+                    logger.info(f"[Pipeline] Using Kokoro-timed subtitles: {srt_path}")
+                    metrics["mode"] = "kokoro"
+                else:
+                    subtitle_generator = WhisperXSubtitleGenerator(
+                        script_uuid=self.script_uuid,
+                        model_name=model_name,
+                        audio=self.audio,
+                    )
+                    script_text = (
+                        None
+                        if subtitle_mode == SubtitleMode.WHISPERX
+                        else self.spoken_text
+                    )
+                    srt_path = subtitle_generator.generate_word_level_srt(
+                        script_text=script_text
+                    )
+                    metrics.update(subtitle_generator.stats)
+                    logger.info(f"[Pipeline] SRT subtitles saved: {srt_path}")
 
             return {
-                "script_uuid": self.script_uuid,
-                "audio_path": str(audio_path),
                 "srt_path": str(srt_path),
                 "status": "success",
+                "metrics": metrics,
             }
 
         except Exception as e:
-            logger.error(f"[Pipeline] Error in TTS/SRT generation: {str(e)}")
+            logger.error(f"[Pipeline] Error in SRT generation: {str(e)}")
             raise
 
-    def generate_video(self, stock_video_path: Optional[str]) -> dict:
+    def generate_tts_and_srt(
+        self,
+        voice: str = "am_liam",
+        model_name: str = "tiny",
+        speed: float = 1,
+        subtitle_mode: SubtitleMode = SubtitleMode.KOKORO,
+    ) -> dict:
+        """
+        Generate TTS audio and word-level subtitles
+
+        Args:
+            voice: Voice to use for TTS (default: am_liam)
+            model_name: Whisper model for subtitles (default: tiny)
+            speed: Speech speed (default: 1.0)
+            subtitle_mode: How word-level subtitles are produced
+
+        Returns:
+            Dictionary with paths to audio and SRT files
+        """
+        tts_result = self.generate_tts(
+            voice=voice, speed=speed, subtitle_mode=subtitle_mode
+        )
+        srt_result = self.generate_srt(
+            model_name=model_name, subtitle_mode=subtitle_mode
+        )
+
+        return {
+            "script_uuid": self.script_uuid,
+            "audio_path": tts_result["audio_path"],
+            "srt_path": srt_result["srt_path"],
+            "status": "success",
+        }
+
+    def generate_video(
+        self,
+        stock_video_path: Optional[str],
+        seed: Optional[int] = None,
+        preview: bool = False,
+    ) -> dict:
         """
         Generate final video with embedded subtitles
 
         Args:
             stock_video_path: Optional path to specific stock video
+            seed: Optional seed for the stock clip and start point choice
+            preview: Render a fast low-resolution draft and save its render
+                plan for the final render
 
         Returns:
             Dictionary with path to generated video
@@ -92,14 +201,21 @@ class VideoPipeline:
         try:
             logger.info("[Pipeline] Step 3/3: Generating video")
 
-            video_gen = VideoGeneration(script_uuid=self.script_uuid)
-            video_gen.generate(stock_video_path=stock_video_path)
+            with stage_timer("video") as metrics:
+                video_gen = VideoGeneration(
+                    script_uuid=self.script_uuid, audio=self.audio
+                )
+                video_gen.generate(
+                    stock_video_path=stock_video_path, seed=seed, preview=preview
+                )
+                metrics.update(video_gen.stats)
 
             logger.info(f"[Pipeline] Video generated: {video_gen.output_path}")
 
             return {
                 "video_path": str(video_gen.output_path),
                 "status": "success",
+                "metrics": metrics,
             }
 
         except Exception as e:
@@ -112,6 +228,9 @@ class VideoPipeline:
         model_name: str = "tiny",
         speed: float = 1,
         stock_video_path: Optional[str] = None,
+        subtitle_mode: SubtitleMode = SubtitleMode.KOKORO,
+        seed: Optional[int] = None,
+        preview: bool = False,
     ) -> dict:
         """
         Run the complete pipeline from TTS to final video
@@ -121,6 +240,9 @@ class VideoPipeline:
             model_name: Whisper model for subtitles
             speed: Speech speed
             stock_video_path: Optional specific stock video
+            subtitle_mode: How word-level subtitles are produced
+            seed: Optional seed for the stock clip and start point choice
+            preview: Render a draft preview instead of the final video
 
         Returns:
             Dictionary with all generated file paths and status
@@ -130,11 +252,16 @@ class VideoPipeline:
 
             # Step 1 & 2: Generate TTS and SRT
             tts_srt_result = self.generate_tts_and_srt(
-                voice=voice, model_name=model_name, speed=speed
+                voice=voice,
+                model_name=model_name,
+                speed=speed,
+                subtitle_mode=subtitle_mode,
             )
 
             # Step 3: Generate video
-            video_result = self.generate_video(stock_video_path=stock_video_path)
+            video_result = self.generate_video(
+                stock_video_path=stock_video_path, seed=seed, preview=preview
+            )
 
             logger.info(
                 f"[Pipeline] Complete pipeline finished successfully for {self.script_uuid}"
@@ -152,3 +279,104 @@ class VideoPipeline:
         except Exception as e:
             logger.error(f"[Pipeline] Complete pipeline failed: {str(e)}")
             raise
+
+    @staticmethod
+    def generate_tts_group(
+        scripts: list[tuple[str, str]],
+        voice: str = "am_liam",
+        speed: float = 1,
+        subtitle_mode: SubtitleMode = SubtitleMode.KOKORO,
+    ) -> list:
+        """
+        Generate TTS for several scripts that share a voice, back to back
+
+        Running a voice's scripts together keeps its Kokoro pipeline and
+        voice pack hot instead of alternating voices per job.
+
+        Args:
+            scripts: (script_uuid, script_content) pairs
+            voice: Voice shared by the group
+            speed: Speech speed shared by the group
+            subtitle_mode: How word-level subtitles are produced
+
+        Returns:
+            The `generate_tts` result or the raised exception, per script
+        """
+        results: list = []
+        for script_uuid, script_content in scripts:
+            try:
+                results.append(
+                    VideoPipeline(script_uuid, script_content).generate_tts(
+                        voice=voice, speed=speed, subtitle_mode=subtitle_mode
+                    )
+                )
+            except Exception as e:
+                results.append(e)
+        return results
+
+    @staticmethod
+    def generate_srt_batch(
+        scripts: list[tuple[str, str]],
+        model_name: str = "tiny",
+        subtitle_mode: SubtitleMode = SubtitleMode.KOKORO,
+    ) -> list:
+        """
+        Generate subtitles for several scripts, transcribing in shared batches
+
+        With `whisperx`, all audio files go through WhisperX together so the
+        ASR batch is filled across scripts. Other modes need no ASR model and
+        run per script.
+
+        Args:
+            scripts: (script_uuid, script_content) pairs
+            model_name: Whisper model for subtitles
+            subtitle_mode: How word-level subtitles are produced
+
+        Returns:
+            The `generate_srt` result or the raised exception, per script
+        """
+        if subtitle_mode != SubtitleMode.WHISPERX:
+            results: list = []
+            for script_uuid, script_content in scripts:
+                try:
+                    results.append(
+                        VideoPipeline(script_uuid, script_content).generate_srt(
+                            model_name=model_name, subtitle_mode=subtitle_mode
+                        )
+                    )
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        logger.info(f"[Pipeline] Batch SRT for {len(scripts)} scripts")
+        generators = [
+            WhisperXSubtitleGenerator(script_uuid=uuid, model_name=model_name)
+            for uuid, _ in scripts
+        ]
+        try:
+            with stage_timer("srt") as metrics:
+                srt_paths = WhisperXSubtitleGenerator.generate_batch(generators)
+        except Exception as e:
+            logger.error(f"[Pipeline] Error in batch SRT generation: {str(e)}")
+            return [e] * len(scripts)
+        # Wall and CPU time cover the whole batch, shared by every script
+        return [
+            {
+                "srt_path": str(path),
+                "status": "success",
+                "metrics": {**metrics, **generator.stats},
+            }
+            for path, generator in zip(srt_paths, generators)
+        ]
+
+    @staticmethod
+    def render_video(
+        script_uuid: str,
+        stock_video_path: Optional[str] = None,
+        seed: Optional[int] = None,
+        preview: bool = False,
+    ) -> dict:
+        """Render one video; a plain function so it can run in a process pool"""
+        return VideoPipeline(script_uuid, script_content="").generate_video(
+            stock_video_path=stock_video_path, seed=seed, preview=preview
+        )
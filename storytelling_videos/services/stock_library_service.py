@@ -0,0 +1,240 @@
+"""
+Persistent index of the stock video library
+"""
+
+import bisect
+import json
+import os
+import random
+import threading
+from pathlib import Path
+from typing import Optional
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.models.stock_schema import StockClip
+from storytelling_videos.services.artifact_store_service import file_sha256
+from storytelling_videos.services.ffmpeg_render_service import (
+    crop_filter,
+    probe_keyframes,
+    probe_video,
+    run_ffmpeg,
+)
+
+logger = get_logger(__name__)
+
+
+class StockLibrary:
+    """Index of stock clips with probed metadata and optional 9:16 proxies
+
+    The index lives next to the clips as JSON and is refreshed incrementally:
+    a file is only probed and hashed again when its size or mtime changed.
+    Renders read duration, keyframes and proxy paths from the index instead of
+    opening the clips at request time.
+    """
+
+    INDEX_FILENAME = "stock_index.json"
+    PROXY_DIRNAME = "proxies"
+    PROXY_WIDTH = 1080
+    PROXY_HEIGHT = 1920
+
+    _lock = threading.Lock()
+
+    def __init__(self, stock_videos_dir: Optional[Path] = None):
+        self.stock_videos_dir = stock_videos_dir or Path.cwd() / "stock_videos"
+        self.index_path = self.stock_videos_dir / self.INDEX_FILENAME
+        self.proxy_dir = self.stock_videos_dir / self.PROXY_DIRNAME
+        self.clips: dict[str, StockClip] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Load the index from disk, if it exists."""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.clips = {path: StockClip(**clip) for path, clip in data.items()}
+
+    def save(self) -> None:
+        """Write the index atomically (temp file + rename)."""
+        self.stock_videos_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {path: clip.model_dump() for path, clip in self.clips.items()},
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self.index_path)
+
+    def _source_files(self) -> list[Path]:
+        if not self.stock_videos_dir.exists():
+            return []
+        return sorted(
+            p
+            for p in self.stock_videos_dir.glob("*.*")
+            if p.is_file()
+            and p.name != self.INDEX_FILENAME
+            and not p.name.startswith(".")
+            and not p.name.endswith(".tmp")
+        )
+
+    def _probe(self, path: Path) -> StockClip:
+        stat = path.stat()
+        info = probe_video(str(path))
+        return StockClip(
+            path=str(path),
+            size_bytes=stat.st_size,
+            mtime=stat.st_mtime,
+            content_hash=file_sha256(path),
+            keyframes=probe_keyframes(str(path)),
+            **info,
+        )
+
+    def _is_current(self, path: Path) -> bool:
+        clip = self.clips.get(str(path))
+        if clip is None:
+            return False
+        stat = path.stat()
+        return clip.size_bytes == stat.st_size and clip.mtime == stat.st_mtime
+
+    def refresh(self, build_proxies: bool = False) -> list[StockClip]:
+        """
+        Bring the index up to date with the stock videos directory
+
+        Args:
+            build_proxies: Also pre-transcode clips without a proxy
+
+        Returns:
+            All indexed clips
+        """
+        with StockLibrary._lock:
+            files = self._source_files()
+            current = {str(p) for p in files}
+            changed = False
+
+            for path in list(self.clips):
+                if path not in current:
+                    logger.info(f"[Stock] Removing deleted clip from index: {path}")
+                    self._drop_proxy(self.clips.pop(path))
+                    changed = True
+
+            for path in files:
+                if self._is_current(path):
+                    continue
+                changed = True
+                logger.info(f"[Stock] Indexing {path.name}")
+                old = self.clips.get(str(path))
+                clip = self._probe(path)
+                if old is not None and old.content_hash == clip.content_hash:
+                    clip.proxy_path = old.proxy_path
+                    clip.proxy_keyframes = old.proxy_keyframes
+                elif old is not None:
+                    self._drop_proxy(old)
+                self.clips[str(path)] = clip
+
+            if build_proxies:
+                for clip in self.clips.values():
+                    if clip.proxy_path is None or not Path(clip.proxy_path).exists():
+                        self._build_proxy(clip)
+                        changed = True
+
+            if changed or not self.index_path.exists():
+                self.save()
+            return list(self.clips.values())
+
+    def _drop_proxy(self, clip: StockClip) -> None:
+        if clip.proxy_path is None:
+            return
+        shared = any(
+            c.proxy_path == clip.proxy_path
+            for c in self.clips.values()
+            if c.path != clip.path
+        )
+        if not shared:
+            Path(clip.proxy_path).unlink(missing_ok=True)
+
+    def _build_proxy(self, clip: StockClip) -> None:
+        """Transcode a clip to a pre-cropped 1080x1920 intermediate with short GOPs"""
+        self.proxy_dir.mkdir(parents=True, exist_ok=True)
+        proxy_path = self.proxy_dir / f"{clip.content_hash}.mp4"
+        if not proxy_path.exists():
+            logger.info(f"[Stock] Building proxy for {Path(clip.path).name}")
+            tmp_path = proxy_path.with_suffix(".tmp.mp4")
+            gop = settings.PROXY_GOP_SECONDS
+            run_ffmpeg(
+                [
+                    "-y",
+                    "-i",
+                    clip.path,
+                    "-an",
+                    "-vf",
+                    f"{crop_filter(self.PROXY_WIDTH, self.PROXY_HEIGHT)},"
+                    f"scale={self.PROXY_WIDTH}:{self.PROXY_HEIGHT},setsar=1",
+                    "-c:v",
+                    "libx264",
+                    "-preset",
+                    "medium",
+                    "-crf",
+                    "18",
+                    "-pix_fmt",
+                    "yuv420p",
+                    "-force_key_frames",
+                    f"expr:gte(t,n_forced*{gop})",
+                    "-sc_threshold",
+                    "0",
+                    "-movflags",
+                    "+faststart",
+                    str(tmp_path),
+                ]
+            )
+            os.replace(tmp_path, proxy_path)
+        clip.proxy_path = str(proxy_path)
+        clip.proxy_keyframes = probe_keyframes(str(proxy_path))
+
+    def get(self, stock_video_path: str) -> StockClip:
+        """
+        Get the index entry of a clip, indexing it first if it is new
+
+        Args:
+            stock_video_path: Path to the source stock video
+
+        Returns:
+            The clip metadata
+        """
+        path = Path(stock_video_path).resolve()
+        if not path.exists():
+            raise FileNotFoundError(f"Stock video not found: {stock_video_path}")
+        if self._is_current(path):
+            return self.clips[str(path)]
+
+        with StockLibrary._lock:
+            clip = self._probe(path)
+            old = self.clips.get(str(path))
+            if old is not None and old.content_hash == clip.content_hash:
+                clip.proxy_path = old.proxy_path
+                clip.proxy_keyframes = old.proxy_keyframes
+            self.clips[str(path)] = clip
+            self.save()
+        return clip
+
+    def random_clip(self, rng: Optional[random.Random] = None) -> StockClip:
+        """
+        Pick a random clip from the current directory contents
+
+        The index is refreshed first, so added clips can be picked and
+        deleted ones cannot; unchanged files only cost a stat.
+        """
+        self.refresh()
+        if not self.clips:
+            raise FileNotFoundError(f"No stock videos found in {self.stock_videos_dir}")
+        rng = rng or random
+        return self.clips[rng.choice(sorted(self.clips))]
+
+    @staticmethod
+    def seek_point(keyframes: list[float], start: float) -> float:
+        """Snap a start point back to the nearest keyframe at or before it"""
+        if not keyframes:
+            return start
+        index = bisect.bisect_right(keyframes, start)
+        return keyframes[index - 1] if index else keyframes[0]
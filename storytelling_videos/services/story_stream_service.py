@@ -0,0 +1,182 @@
+"""
+Service for streaming a story from the LLM straight into Kokoro synthesis
+"""
+
+import asyncio
+import re
+import struct
+import time
+from typing import TYPE_CHECKING, AsyncIterator
+
+from storytelling_videos.core.config_core import settings
+from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.services.openrouter_service import OpenRouterService
+from storytelling_videos.services.preprocess_text_service import add_pauses
+from storytelling_videos.services.voice_kokoro_service import KokoroVoice
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = get_logger(__name__)
+
+# Sentence terminator followed by whitespace, or a blank line
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+|\n\s*\n")
+
+
+class SentenceSplitter:
+    """Split streamed text into sentences as soon as each one is complete
+
+    A sentence is only cut once the whitespace after its terminator has
+    arrived, so "3." at the end of a delta is not mistaken for an ending.
+    Short sentences are merged up to `min_chars` so Kokoro gets enough context
+    for natural prosody; line breaks always cut.
+    """
+
+    def __init__(self, min_chars: int = 40):
+        self.min_chars = min_chars
+        self._buffer = ""
+        self._pending = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Add a text delta and return the sentences it completed"""
+        self._buffer += text
+        ready = []
+        while (match := SENTENCE_END.search(self._buffer)) is not None:
+            self._pending += self._buffer[: match.end()]
+            self._buffer = self._buffer[match.end() :]
+            line_break = "\n" in match.group()
+            if line_break or len(self._pending.strip()) >= self.min_chars:
+                if self._pending.strip():
+                    ready.append(self._pending.strip())
+                self._pending = ""
+        return ready
+
+    def flush(self) -> list[str]:
+        """Return whatever text is left once the stream has ended"""
+        rest = (self._pending + self._buffer).strip()
+        self._pending = self._buffer = ""
+        return [rest] if rest else []
+
+
+def wav_stream_header(sample_rate: int, channels: int = 1) -> bytes:
+    """
+    WAV header for 16-bit PCM of unknown length
+
+    The RIFF and data sizes are set to 0xFFFFFFFF, which browsers and ffmpeg
+    treat as "read until the end of the stream".
+    """
+    block_align = channels * 2
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        0xFFFFFFFF,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        16,
+        b"data",
+        0xFFFFFFFF,
+    )
+
+
+def pcm16_bytes(audio: "np.ndarray") -> bytes:
+    """Convert float32 audio in [-1, 1] to little-endian 16-bit PCM"""
+    import numpy as np
+
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+class StoryStream:
+    """Generate a story and narrate it while the LLM is still writing
+
+    The LLM stream is read by a background task that pushes finished
+    sentences onto a queue; sentences are synthesized one by one in a worker
+    thread. Time to first audio is roughly the time to the first sentence
+    plus the TTS time of that sentence, instead of the whole completion plus
+    the whole synthesis.
+    """
+
+    def __init__(
+        self,
+        prompt: str,
+        model: str,
+        voice: str = "am_liam",
+        speed: float = 1.0,
+        lang_code: str = "a",
+    ):
+        self.prompt = prompt
+        self.model = model
+        self.voice = voice
+        self.speed = speed
+        self.lang_code = lang_code
+        self.sample_rate = KokoroVoice.SAMPLE_RATE
+        self._parts: list[str] = []
+        self.completed = False
+
+    @property
+    def text(self) -> str:
+        """Story text received so far (the full story once completed)"""
+        return "".join(self._parts)
+
+    async def sentences(self) -> AsyncIterator[str]:
+        """Yield complete sentences of the story as they are generated"""
+        splitter = SentenceSplitter(min_chars=settings.STREAM_MIN_SENTENCE_CHARS)
+        async for delta in OpenRouterService.stream_story(self.prompt, self.model):
+            self._parts.append(delta)
+            for sentence in splitter.feed(delta):
+                yield sentence
+        for sentence in splitter.flush():
+            yield sentence
+
+    async def audio(self) -> AsyncIterator["np.ndarray"]:
+        """Yield float32 audio per sentence while generation continues"""
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def produce():
+            try:
+                async for sentence in self.sentences():
+                    await queue.put(sentence)
+            finally:
+                await queue.put(None)
+
+        started = time.perf_counter()
+        producer = asyncio.create_task(produce())
+        sentences = 0
+        try:
+            while (sentence := await queue.get()) is not None:
+                # Same pauses as the full pipeline (VideoPipeline.spoken_text)
+                audio, _ = await asyncio.to_thread(
+                    KokoroVoice.synthesize_text,
+                    add_pauses(sentence),
+                    self.voice,
+                    self.speed,
+                    self.lang_code,
+                )
+                if sentences == 0:
+                    logger.info(
+                        f"[Stream] First audio after "
+                        f"{time.perf_counter() - started:.2f}s"
+                    )
+                sentences += 1
+                yield audio
+            # Surface LLM errors that ended the stream early
+            await producer
+            self.completed = True
+            logger.info(
+                f"[Stream] Narrated {sentences} sentences in "
+                f"{time.perf_counter() - started:.2f}s"
+            )
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+    async def wav_bytes(self) -> AsyncIterator[bytes]:
+        """Yield a streamable WAV file: header first, then PCM per sentence"""
+        yield wav_stream_header(self.sample_rate)
+        async for audio in self.audio():
+            yield pcm16_bytes(audio)
@@ -0,0 +1,167 @@
+"""
+Helpers for building word-level subtitle files
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format timestamp in SRT format (HH:MM:SS,mmm)"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    millis = int((seconds % 1) * 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def words_to_srt(words: Iterable[dict]) -> str:
+    """
+    Build SRT content with one cue per word
+
+    Args:
+        words: Word timings as {"word", "start", "end"} dicts (WhisperX format)
+
+    Returns:
+        SRT file content
+    """
+    srt_content = []
+    subtitle_index = 1
+
+    for word_info in words:
+        word: str = word_info.get("word", "").strip()
+        if not word:  # Skip empty words
+            continue
+        start_time = format_timestamp(float(word_info.get("start", 0)))
+        end_time = format_timestamp(float(word_info.get("end", 0)))
+        srt_content.append(f"{subtitle_index}\n{start_time} --> {end_time}\n{word}\n")
+        subtitle_index += 1
+
+    return "\n".join(srt_content)
+
+
+def write_word_srt(words: Iterable[dict], output_path: Path) -> Path:
+    """Write a word-level SRT file and return its path"""
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(words_to_srt(words))
+    return output_path
+
+
+def words_from_kokoro_tokens(tokens, offset: float = 0.0) -> Optional[list[dict]]:
+    """
+    Group Kokoro tokens into timed words
+
+    Kokoro (misaki) tokens carry `start_ts`/`end_ts` relative to the chunk they
+    were synthesized in, and punctuation arrives as separate tokens without
+    whitespace. Tokens are merged until one carries trailing whitespace.
+
+    Args:
+        tokens: `MToken` list from a `KPipeline.Result`
+        offset: Start of the chunk within the full audio, in seconds
+
+    Returns:
+        Word timings, or None if the chunk carries no timestamps
+    """
+    words: list[dict] = []
+    text = ""
+    start = end = None
+    has_timestamps = False
+
+    for token in tokens or []:
+        text += token.text
+        if token.start_ts is not None and token.end_ts is not None:
+            has_timestamps = True
+            if start is None:
+                start = token.start_ts
+            end = token.end_ts
+
+        if token.whitespace:
+            if text.strip():
+                if start is None and words:
+                    # Untimed fragment: attach to the previous word
+                    words[-1]["word"] += text
+                elif start is not None:
+                    words.append(
+                        {"word": text, "start": offset + start, "end": offset + end}
+                    )
+            text = ""
+            start = end = None
+
+    if text.strip():
+        if start is None and words:
+            words[-1]["word"] += text
+        elif start is not None:
+            words.append({"word": text, "start": offset + start, "end": offset + end})
+
+    if not has_timestamps:
+        return None
+    for word in words:
+        word["word"] = word["word"].strip()
+    return words
+
+
+def fill_missing_word_timings(words: list[dict]) -> list[dict]:
+    """
+    Give every word a start and end time
+
+    The alignment model cannot place tokens outside its dictionary (digits,
+    symbols), so WhisperX leaves them without timings. Such words are placed
+    between the neighbouring aligned words.
+    """
+    for i, word in enumerate(words):
+        if "start" in word and "end" in word:
+            continue
+        prev_end = next((w["end"] for w in reversed(words[:i]) if "end" in w), None)
+        next_start = next((w["start"] for w in words[i + 1 :] if "start" in w), None)
+        start = prev_end if prev_end is not None else (next_start or 0.0)
+        end = next_start if next_start is not None else start
+        word["start"], word["end"] = start, max(start, end)
+    return words
+
+
+def write_segment_spans(spans: dict[int, list[float]], output_path: Path) -> Path:
+    """Persist per-paragraph [start, end] spans of the synthesized audio"""
+    output_path = Path(output_path)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({str(k): v for k, v in spans.items()}, f)
+    return output_path
+
+
+def script_segments(
+    script_text: str, duration: float, spans_path: Optional[Path] = None
+) -> list[dict]:
+    """
+    Split the known script into timed segments for forced alignment
+
+    Paragraphs are split on newlines exactly like Kokoro splits them, so the
+    spans recorded during synthesis line up with the paragraph index. Without
+    usable spans the whole script becomes a single segment over the full audio.
+
+    Args:
+        script_text: Original script text
+        duration: Audio duration in seconds
+        spans_path: Optional JSON file of paragraph spans written by Kokoro
+
+    Returns:
+        WhisperX-style segments ({"text", "start", "end"})
+    """
+    paragraphs = re.split(r"\n+", script_text)
+
+    spans: dict = {}
+    if spans_path is not None and Path(spans_path).exists():
+        with open(spans_path, encoding="utf-8") as f:
+            spans = json.load(f)
+
+    timed = [(i, p.strip()) for i, p in enumerate(paragraphs) if p.strip()]
+    if timed and all(str(i) in spans for i, _ in timed):
+        return [
+            {"text": text, "start": spans[str(i)][0], "end": spans[str(i)][1]}
+            for i, text in timed
+        ]
+
+    text = " ".join(text for _, text in timed)
+    return [{"text": text, "start": 0.0, "end": duration}]
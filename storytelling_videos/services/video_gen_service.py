@@ -1,16 +1,44 @@
+import os
 import random
 from pathlib import Path
+from typing import Optional
 
-from moviepy.editor import AudioFileClip, VideoFileClip
-
+from storytelling_videos.core.config_core import settings
 from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.models import RenderPlan
+from storytelling_videos.services.artifact_store_service import (
+    ArtifactStore,
+    file_sha256,
+)
+from storytelling_videos.services.audio_buffer import AudioBuffer
+from storytelling_videos.services.caption_service import (
+    CaptionTrack,
+    ensure_captions,
+)
+from storytelling_videos.services.ffmpeg_render_service import (
+    SUBTITLE_STYLE,
+    FFmpegRenderer,
+    escape_filter_path,
+    resolve_profiles,
+)
+from storytelling_videos.services.stock_library_service import StockLibrary
 
 logger = get_logger(__name__)
 
 
 class VideoGeneration:
-    def __init__(self, script_uuid: str):
+    ARTIFACT_KIND = "video"
+    RENDITIONS_KIND = "renditions"
+    VIDEO_FILE = "video.mp4"
+
+    def __init__(self, script_uuid: str, audio: Optional[AudioBuffer] = None):
         self.script_uuid = script_uuid
+        # Narration already in memory from the TTS stage, if any
+        self.audio = audio
+        self.store = ArtifactStore()
+        # Encode throughput of the last render, for stage metrics
+        self.stats: dict = {}
+        self.rng = random.Random()
 
         parent_dir = Path.cwd()
         self.audio_path = (
@@ -20,18 +48,64 @@ class VideoGeneration:
             / "full_script_audio.wav"
         )
         self.output_path = parent_dir / "output" / f"{self.script_uuid}.mp4"
+        self.preview_path = parent_dir / "output" / f"{self.script_uuid}_preview.mp4"
         self.stock_videos_dir = parent_dir / "stock_videos"
         self.srt_path = (
             parent_dir / "saved_audio_kokoro" / self.script_uuid / "full_sub_words.srt"
         )
+        self.plan_path = (
+            parent_dir / "saved_audio_kokoro" / self.script_uuid / "render_plan.json"
+        )
         # ensure the output directory exists (create parent directory of the file)
         self.output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    def get_audio_length(self):  # works
-        audio = AudioFileClip(str(self.audio_path))
-        duration = audio.duration
-        audio.close()
-        return duration
+    def get_audio_length(self) -> float:
+        """Audio duration from the in-memory buffer or the WAV header"""
+        if self.audio is not None:
+            return self.audio.duration
+        import soundfile as sf
+
+        return sf.info(str(self.audio_path)).duration
+
+    def pick_start_point(self, video_duration: float, audio_length: float) -> float:
+        """Pick a random start point that leaves enough video for the audio"""
+        if video_duration <= audio_length:
+            # Video is shorter than audio, start from beginning
+            return 0.0
+        # Video is longer, pick random start point with enough content
+        max_start = video_duration - audio_length
+        return self.rng.uniform(0, max_start)
+
+    def select_stock_video(self) -> str:
+        """Pick a random stock video from the stock library directory"""
+        stock_videos = list(self.stock_videos_dir.glob("*.*"))
+        if not stock_videos:
+            raise FileNotFoundError(f"No stock videos found in {self.stock_videos_dir}")
+        stock_video_path = str(self.rng.choice(sorted(stock_videos)))
+        logger.info(f"Using stock video: {stock_video_path}")
+        return stock_video_path
+
+    def has_subtitles(self) -> bool:
+        return self.srt_path is not None and Path(self.srt_path).exists()
+
+    def caption_path(self) -> Optional[Path]:
+        """Captions to burn in, or None without subtitles
+
+        The phrase-grouped ASS built from the word-level SRT, or the SRT
+        itself with CAPTION_FORMAT=srt. With CAPTION_FORMAT=overlay the ASS
+        is not drawn but still identifies the captions in the cache key.
+        """
+        if not self.has_subtitles():
+            return None
+        if settings.CAPTION_FORMAT in ("ass", "overlay"):
+            return ensure_captions(self.srt_path)
+        return self.srt_path
+
+    def caption_track(self) -> Optional[CaptionTrack]:
+        """Captions to rasterize and overlay (CAPTION_FORMAT=overlay only)"""
+        if settings.CAPTION_FORMAT != "overlay" or not self.has_subtitles():
+            return None
+        return CaptionTrack.from_srt(self.srt_path)
 
     def get_stock_video_and_cut_to_length(
         self, stock_video_path: str, audio_length: float
@@ -42,17 +116,12 @@ class VideoGeneration:
             stock_video_path: Path to specific stock video.
             audio_length: Duration to cut.
         """
+        from moviepy.editor import VideoFileClip
+
         video = VideoFileClip(stock_video_path)
-        video_duration = video.duration
 
         # Find a random start point that has enough duration for the audio
-        if video_duration <= audio_length:
-            # Video is shorter than audio, start from beginning
-            start_point = 0.0
-        else:
-            # Video is longer, pick random start point with enough content
-            max_start = video_duration - audio_length
-            start_point = random.uniform(0, max_start)
+        start_point = self.pick_start_point(video.duration, audio_length)
 
         # Cut the video from random start point
         end_point = start_point + audio_length
@@ -93,47 +162,332 @@ class VideoGeneration:
         ffmpeg_params = ["-vf", "scale=1080:1920"]
 
         # Add subtitle burning if SRT file is available
-        if self.srt_path and (
-            isinstance(self.srt_path, Path)
-            and self.srt_path.exists()
-            or isinstance(self.srt_path, str)
-        ):
-            # Escape the SRT path for ffmpeg (handle special characters)
-            srt_escaped = str(self.srt_path).replace("\\", "\\\\").replace("'", "\\'")
+        if self.has_subtitles():
+            srt_escaped = escape_filter_path(self.srt_path)
             # Add subtitle filter to the video filter chain
-            # Alignment=5 centers vertically, FontSize=32 for bigger text
             ffmpeg_params = [
                 "-vf",
-                f"scale=1080:1920,subtitles='{srt_escaped}':force_style="
-                "'FontName=Arial,FontSize=14,PrimaryColour=&H00FFFFFF&,OutlineColour=&H00000000&,OutlineWidth=0.5,Alignment=10,MarginL=0,MarginR=0,MarginV=0'",
+                f"scale=1080:1920,subtitles='{srt_escaped}'"
+                f":force_style='{SUBTITLE_STYLE}'",
             ]
             logger.info(f"Burning subtitles from: {self.srt_path}")
 
+        # Write next to the output and rename, so a killed render never leaves
+        # a truncated video at the output path
+        tmp_path = self.output_path.with_name(f".{self.output_path.stem}.tmp.mp4")
         # Use ffmpeg parameters to scale to exact dimensions and add subtitles
         video_clip.write_videofile(
-            str(self.output_path),
+            str(tmp_path),
             codec=codec,
             audio_codec=audio_codec,
             verbose=False,
             logger=None,
             ffmpeg_params=ffmpeg_params,
         )
+        os.replace(tmp_path, self.output_path)
+
+    def generate(
+        self,
+        stock_video_path: "str | None" = None,
+        engine: Optional[str] = None,
+        seed: Optional[int] = None,
+        preview: bool = False,
+    ):
+        """Main orchestrator - ties everything together
+
+        Args:
+            stock_video_path: Path to specific stock video. If None, random one
+                is selected.
+            engine: `ffmpeg` (single streaming filtergraph) or `moviepy`.
+                Defaults to settings.RENDER_ENGINE.
+            seed: Seed for the stock clip and start point choice. With a seed
+                the render is reproducible and can be served from the cache.
+            preview: Render a low-resolution draft to `preview_path` instead
+                and save its render plan. The next ffmpeg render of this
+                script reuses the plan, so it shows the same stock slice with
+                the same framing and caption timing.
+        """
+        engine = engine or settings.RENDER_ENGINE
+
+        if preview:
+            if engine == "moviepy":
+                raise ValueError("Preview renders require the ffmpeg engine")
+            if seed is None:
+                seed = random.SystemRandom().randrange(2**31)
+            self.rng = random.Random(seed)
+            self.output_path = self.preview_path
+            source = self._generate_ffmpeg(stock_video_path, preview=True)
+            self.save_plan(source, seed)
+            return
+
+        self.rng = random.Random(seed)
+        if engine == "moviepy":
+            # Select random stock video if not provided
+            if stock_video_path is None:
+                stock_video_path = self.select_stock_video()
+            self._generate_moviepy(stock_video_path)
+        else:
+            self._generate_ffmpeg(
+                stock_video_path, plan=self.load_plan(stock_video_path, seed)
+            )
+
+    def save_plan(self, source: dict, seed: int) -> RenderPlan:
+        """Record the stock slice of a preview for the final render"""
+        srt_path = self.srt_path if self.has_subtitles() else None
+        plan = RenderPlan(
+            script_uuid=self.script_uuid,
+            seed=seed,
+            stock_path=source["clip"].path,
+            stock_sha256=source["clip"].content_hash,
+            start=source["start"],
+            duration=source["duration"],
+            audio_sha256=file_sha256(self.audio_path),
+            srt_sha256=file_sha256(srt_path) if srt_path else None,
+        )
+        self.plan_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.plan_path.with_name(f".{self.plan_path.name}.tmp")
+        tmp_path.write_text(plan.model_dump_json(indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.plan_path)
+        logger.info(f"Saved render plan: {self.plan_path}")
+        return plan
+
+    def load_plan(
+        self, stock_video_path: Optional[str] = None, seed: Optional[int] = None
+    ) -> Optional[RenderPlan]:
+        """
+        The saved preview plan, if it still applies to this render
+
+        A plan is ignored when the caller asks for another stock clip or seed,
+        or when the narration or subtitles changed since the preview.
+        """
+        if not self.plan_path.exists():
+            return None
+        plan = RenderPlan.model_validate_json(
+            self.plan_path.read_text(encoding="utf-8")
+        )
+        if (
+            stock_video_path is not None
+            and str(Path(stock_video_path).resolve()) != plan.stock_path
+        ):
+            return None
+        if seed is not None and seed != plan.seed:
+            return None
+        srt_sha256 = file_sha256(self.srt_path) if self.has_subtitles() else None
+        if (
+            plan.audio_sha256 != file_sha256(self.audio_path)
+            or plan.srt_sha256 != srt_sha256
+        ):
+            logger.warning("Render plan is stale (audio or subtitles changed)")
+            return None
+        return plan
+
+    def _prepare_source(
+        self, stock_video_path: Optional[str], plan: Optional[RenderPlan] = None
+    ) -> dict:
+        """Pick the clip, the file to read and the start point for a render
+
+        Clip metadata comes from the stock library index. When the clip has a
+        pre-cropped proxy, the render reads the proxy and skips the crop, and
+        the start point is snapped to a proxy keyframe so seeking is cheap.
+        With a render plan, its clip and start point are used as they are;
+        the proxy is the same center crop, so the framing does not change.
+        """
+        library = StockLibrary(self.stock_videos_dir)
+        if plan is not None:
+            clip = library.get(plan.stock_path)
+            if clip.content_hash != plan.stock_sha256:
+                logger.warning(f"Stock video changed since the preview: {clip.path}")
+                plan = None
+            else:
+                logger.info(f"Using the preview's render plan: {clip.path}")
+        if plan is None:
+            if stock_video_path is None:
+                clip = library.random_clip(self.rng)
+                logger.info(f"Using stock video: {clip.path}")
+            else:
+                clip = library.get(stock_video_path)
+
+        if clip.proxy_path is not None and Path(clip.proxy_path).exists():
+            source_path, crop = clip.proxy_path, False
+            keyframes = clip.proxy_keyframes
+        else:
+            source_path, crop = clip.path, True
+            keyframes = clip.keyframes
+
+        if plan is not None:
+            audio_length, start_point = plan.duration, plan.start
+        else:
+            audio_length = self.get_audio_length()
+            start_point = StockLibrary.seek_point(
+                keyframes, self.pick_start_point(clip.duration, audio_length)
+            )
+        return {
+            "clip": clip,
+            "source_path": source_path,
+            "crop": crop,
+            "keyframes": keyframes,
+            "start": start_point,
+            "duration": audio_length,
+            "srt_path": self.caption_path(),
+            "captions": self.caption_track(),
+        }
+
+    def _source_params(self, source: dict) -> dict:
+        """Cache key inputs shared by every render of a prepared source"""
+        srt_path = source["srt_path"]
+        params = {
+            "audio_sha256": file_sha256(self.audio_path),
+            "srt_sha256": file_sha256(srt_path) if srt_path else None,
+            "stock_sha256": source["clip"].content_hash,
+            "proxy": not source["crop"],
+            "start": round(source["start"], 3),
+            "duration": round(source["duration"], 3),
+        }
+        if source["captions"] is not None:
+            # Pillow and libass draw the same captions slightly differently
+            params["caption_overlay"] = True
+        return params
+
+    def _generate_ffmpeg(
+        self,
+        stock_video_path: Optional[str],
+        plan: Optional[RenderPlan] = None,
+        preview: bool = False,
+    ) -> dict:
+        """Render with one ffmpeg process: seek, crop, scale, subtitles, mux
+
+        Returns:
+            The prepared source (clip, start point, duration)
+        """
+        source = self._prepare_source(stock_video_path, plan)
+        if preview:
+            renderer = FFmpegRenderer(
+                width=settings.PREVIEW_WIDTH,
+                height=settings.PREVIEW_HEIGHT,
+                preset=settings.PREVIEW_PRESET,
+            )
+            segments = 1
+        else:
+            renderer = FFmpegRenderer()
+            segments = settings.RENDER_SEGMENTS
+        params = {
+            **self._source_params(source),
+            "width": renderer.width,
+            "height": renderer.height,
+            "codec": renderer.codec,
+            "audio_codec": renderer.audio_codec,
+            "preset": renderer.preset,
+        }
+        if segments > 1:
+            # Chunk boundaries change the GOP layout of the output
+            params["segments"] = segments
+        key = ArtifactStore.compute_key(self.ARTIFACT_KIND, params)
+
+        if self.store.lookup(self.ARTIFACT_KIND, key) is not None:
+            logger.info(f"Video cache hit: {key[:12]}")
+            self.stats = {"cache_hit": True}
+        else:
+            with self.store.writer(self.ARTIFACT_KIND, key, params) as tmp_dir:
+                renderer.render(
+                    stock_video_path=source["source_path"],
+                    audio_path=self.audio_path,
+                    output_path=tmp_dir / self.VIDEO_FILE,
+                    start=source["start"],
+                    duration=source["duration"],
+                    srt_path=source["srt_path"],
+                    crop=source["crop"],
+                    audio=self.audio,
+                    segments=segments,
+                    keyframes=source["keyframes"],
+                    captions=source["captions"],
+                )
+            self.stats = {"cache_hit": False, **renderer.stats}
+
+        self.store.materialize(
+            self.store.file_path(self.ARTIFACT_KIND, key, self.VIDEO_FILE),
+            self.output_path,
+        )
+        return source
+
+    def generate_renditions(
+        self,
+        profiles: list[str],
+        stock_video_path: Optional[str] = None,
+        seed: Optional[int] = None,
+    ) -> dict[str, Path]:
+        """Render one video per export profile from a single ffmpeg pass
+
+        Args:
+            profiles: Export profile names (see `EXPORT_PROFILES`)
+            stock_video_path: Path to specific stock video. If None, random one
+                is selected.
+            seed: Seed for the stock clip and start point choice. A saved
+                preview plan is reused unless it contradicts the arguments.
+
+        Returns:
+            Output path per profile name, `output/{script_uuid}_{profile}.{ext}`
+
+        Raises:
+            ValueError: On an unknown or repeated profile name
+        """
+        resolved = resolve_profiles(profiles)
+        self.rng = random.Random(seed)
+        source = self._prepare_source(
+            stock_video_path, plan=self.load_plan(stock_video_path, seed)
+        )
+        renderer = FFmpegRenderer()
+        params = {
+            **self._source_params(source),
+            "width": renderer.width,
+            "height": renderer.height,
+            "audio_codec": renderer.audio_codec,
+            "profiles": [profile.model_dump() for profile in resolved],
+        }
+        key = ArtifactStore.compute_key(self.RENDITIONS_KIND, params)
+        file_names = {
+            profile.name: f"{profile.name}.{profile.container}" for profile in resolved
+        }
+
+        if self.store.lookup(self.RENDITIONS_KIND, key) is not None:
+            logger.info(f"Renditions cache hit: {key[:12]}")
+            self.stats = {"cache_hit": True}
+        else:
+            with self.store.writer(self.RENDITIONS_KIND, key, params) as tmp_dir:
+                renderer.render_renditions(
+                    stock_video_path=source["source_path"],
+                    audio_path=self.audio_path,
+                    outputs=[
+                        (profile, tmp_dir / file_names[profile.name])
+                        for profile in resolved
+                    ],
+                    start=source["start"],
+                    duration=source["duration"],
+                    srt_path=source["srt_path"],
+                    crop=source["crop"],
+                    audio=self.audio,
+                    captions=source["captions"],
+                )
+            self.stats = {"cache_hit": False, **renderer.stats}
+
+        outputs = {}
+        for name, file_name in file_names.items():
+            outputs[name] = self.store.materialize(
+                self.store.file_path(self.RENDITIONS_KIND, key, file_name),
+                self.output_path.with_name(f"{self.script_uuid}_{file_name}"),
+            )
+        return outputs
+
+    def _generate_moviepy(self, stock_video_path: str):
+        """Legacy render path through MoviePy"""
+        # The output may be a hard link into the artifact store; never write
+        # through it
+        self.output_path.unlink(missing_ok=True)
+
+        from moviepy.editor import AudioFileClip
 
-    def generate(self, stock_video_path: "str | None" = None):
-        """Main orchestrator - ties everything together"""
         # Get audio and its length
         audio = AudioFileClip(str(self.audio_path))
-        audio_length = self.get_audio_length()
-
-        # Select random stock video if not provided
-        if stock_video_path is None:
-            stock_videos = list(self.stock_videos_dir.glob("*.*"))
-            if not stock_videos:
-                raise FileNotFoundError(
-                    f"No stock videos found in {self.stock_videos_dir}"
-                )
-            stock_video_path = str(random.choice(stock_videos))
-            logger.info(f"Using stock video: {stock_video_path}")
+        audio_length = audio.duration
 
         # Get and trim stock video with specified parameters
         video = self.get_stock_video_and_cut_to_length(stock_video_path, audio_length)
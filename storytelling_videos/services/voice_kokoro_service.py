@@ -1,18 +1,47 @@
+import json
+import re
+import time
 from pathlib import Path
-
-import soundfile as sf
-import torch  # noqa: F401
-from kokoro import KPipeline
+from typing import TYPE_CHECKING, Iterator, Optional
 
 from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.core.metrics import TTS_SPEED
+from storytelling_videos.core.model_registry import ModelKey, get_model_registry
+from storytelling_videos.services.artifact_store_service import ArtifactStore
+from storytelling_videos.services.audio_buffer import AudioBuffer
+from storytelling_videos.services.caption_service import ass_path_for, write_captions
+from storytelling_videos.services.inference_client import (
+    get_inference_client,
+    inference_server_enabled,
+)
+from storytelling_videos.services.subtitle_service import (
+    words_from_kokoro_tokens,
+    write_segment_spans,
+    write_word_srt,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = get_logger(__name__)
 
+# (paragraph index, float32 audio, word timings relative to the paragraph)
+AudioChunk = tuple[int, "np.ndarray", Optional[list]]
+
 
 class KokoroVoice:
-    _pipeline = None  # Class variable for lazy initialization
     _device = None
 
+    MODEL_ID = "hexgrad/Kokoro-82M"
+    SAMPLE_RATE = 24000
+    ARTIFACT_KIND = "tts"
+    CHUNK_KIND = "tts_chunk"
+    CHUNK_AUDIO_FILE = "audio.wav"
+    CHUNK_WORDS_FILE = "words.json"
+    AUDIO_FILE = "full_script_audio.wav"
+    SRT_FILE = "full_sub_words.srt"
+    SEGMENTS_FILE = "full_script_segments.json"
+
     def __init__(
         self,
         script_uuid: str,
@@ -27,13 +56,34 @@ class KokoroVoice:
         self.speed = speed
         self.output_dir = Path.cwd() / "saved_audio_kokoro" / script_uuid
         self.output_dir.mkdir(exist_ok=True, parents=True)
-        self.output_path = self.output_dir / "full_script_audio.wav"
+        self.output_path = self.output_dir / self.AUDIO_FILE
+        self.srt_path = self.output_dir / self.SRT_FILE
+        self.segments_path = self.output_dir / self.SEGMENTS_FILE
+        self.sample_rate = self.SAMPLE_RATE
         self.device = self._get_device()
+        self.store = ArtifactStore()
+        # Synthesized audio, kept for the later stages of the pipeline
+        self.audio: Optional[AudioBuffer] = None
+        # Throughput of the last synthesis, for stage metrics
+        self.stats: dict = {}
+        self.cache_params = {
+            "text": self.text,
+            "voice": self.voice,
+            "speed": float(self.speed),
+            "lang_code": self.lang_code,
+            "model": self.MODEL_ID,
+            "sample_rate": self.sample_rate,
+        }
+        self.cache_key = ArtifactStore.compute_key(
+            self.ARTIFACT_KIND, self.cache_params
+        )
 
     @staticmethod
     def _get_device():
         """Determine best device (cuda or cpu)"""
         if KokoroVoice._device is None:
+            import torch
+
             if torch.cuda.is_available():
                 logger.info("CUDA available - using GPU for TTS")
                 KokoroVoice._device = "cuda"
@@ -42,33 +92,253 @@ class KokoroVoice:
                 KokoroVoice._device = "cpu"
         return KokoroVoice._device
 
-    def get_pipeline(self):
-        # lazy initialize a single shared pipeline for the class
-        if KokoroVoice._pipeline is None:
-            KokoroVoice._pipeline = KPipeline(
-                lang_code=self.lang_code, device=self.device
-            )
-        return KokoroVoice._pipeline
-
-    def synthesize(self):
-        if self.output_path.exists():
-            logger.info("Audio file already exists.")
+    @classmethod
+    def model_key(cls, lang_code: str = "a") -> ModelKey:
+        return ModelKey("kokoro", cls.MODEL_ID, lang_code, cls._get_device())
+
+    @classmethod
+    def get_pipeline(cls, lang_code: str = "a"):
+        """Get the shared pipeline for this language from the model registry"""
+        device = cls._get_device()
+
+        def load():
+            from kokoro import KPipeline
+
+            return KPipeline(lang_code=lang_code, device=device)
+
+        return get_model_registry().get(cls.model_key(lang_code), loader=load)
+
+    def paragraphs(self) -> list[tuple[int, str]]:
+        """Split the text into paragraphs the same way Kokoro does"""
+        return [
+            (index, paragraph)
+            for index, paragraph in enumerate(re.split(r"\n+", self.text))
+            if paragraph.strip()
+        ]
+
+    def synthesize(self) -> Optional[Iterator[AudioChunk]]:
+        """
+        Start synthesis, unless the artifact store already has this audio
+
+        Returns:
+            Generator of (paragraph index, audio, word timings) chunks, or None
+            on a cache hit for the whole script
+        """
+        if self.store.lookup(self.ARTIFACT_KIND, self.cache_key) is not None:
+            logger.info(f"TTS cache hit: {self.cache_key[:12]}")
             return None
+        return self._paragraph_chunks()
+
+    def _paragraph_chunks(self) -> Iterator[AudioChunk]:
+        """
+        Yield the audio of every paragraph, synthesizing only changed ones
 
-        pipeline = self.get_pipeline()
-        return pipeline(
-            self.text, voice=self.voice, speed=self.speed, split_pattern=r"\n+"
+        Each paragraph is cached by (text, voice, speed, lang, model), so an
+        edit to one line of a script re-synthesizes only that paragraph.
+        Word timings are relative to the start of the paragraph.
+        """
+        import soundfile as sf
+
+        reused = synthesized = 0
+        for index, paragraph in self.paragraphs():
+            params = {**self.cache_params, "text": paragraph}
+            key = ArtifactStore.compute_key(self.CHUNK_KIND, params)
+
+            if self.store.lookup(self.CHUNK_KIND, key) is not None:
+                reused += 1
+                audio, _ = sf.read(
+                    self.store.file_path(self.CHUNK_KIND, key, self.CHUNK_AUDIO_FILE),
+                    dtype="float32",
+                )
+                words_path = self.store.file_path(
+                    self.CHUNK_KIND, key, self.CHUNK_WORDS_FILE
+                )
+                words = None
+                if words_path is not None:
+                    with open(words_path, encoding="utf-8") as f:
+                        words = json.load(f)
+            else:
+                synthesized += 1
+                audio, words = self.synthesize_text(
+                    paragraph, self.voice, self.speed, self.lang_code
+                )
+                with self.store.writer(self.CHUNK_KIND, key, params) as tmp_dir:
+                    sf.write(tmp_dir / self.CHUNK_AUDIO_FILE, audio, self.sample_rate)
+                    if words is not None:
+                        with open(
+                            tmp_dir / self.CHUNK_WORDS_FILE, "w", encoding="utf-8"
+                        ) as f:
+                            json.dump(words, f)
+
+            yield index, audio, words
+
+        logger.info(
+            f"TTS paragraphs: {synthesized} synthesized, {reused} reused from cache"
         )
 
-    def save_audio(self, generator):
+    @classmethod
+    def synthesize_text(
+        cls, paragraph: str, voice: str, speed: float, lang_code: str = "a"
+    ) -> tuple["np.ndarray", Optional[list]]:
+        """Synthesize one paragraph, on the inference server if one is configured"""
+        kwargs = {
+            "paragraph": paragraph,
+            "voice": voice,
+            "speed": speed,
+            "lang_code": lang_code,
+        }
+        if inference_server_enabled():
+            return get_inference_client().call("tts_paragraph", **kwargs)
+        return cls.synthesize_paragraph(**kwargs)
+
+    @classmethod
+    def synthesize_paragraph(
+        cls, paragraph: str, voice: str, speed: float, lang_code: str = "a"
+    ) -> tuple["np.ndarray", Optional[list]]:
+        """
+        Synthesize one paragraph in this process and collect its word timings
+
+        Returns:
+            Float32 audio at 24 kHz and word timings relative to the paragraph
+            (None if Kokoro produced no timestamps)
+        """
+        import numpy as np
+
+        pipeline = cls.get_pipeline(lang_code)
+        pieces: list[np.ndarray] = []
+        words: Optional[list[dict]] = []
+        offset = 0.0
+
+        for result in pipeline(
+            paragraph, voice=voice, speed=speed, split_pattern=r"\n+"
+        ):
+            if result.audio is None:
+                continue
+            audio = np.asarray(result.audio, dtype=np.float32)
+            pieces.append(audio)
+
+            if words is not None:
+                chunk_words = words_from_kokoro_tokens(result.tokens, offset)
+                if chunk_words is None:
+                    logger.warning(
+                        "Kokoro returned no token timestamps - "
+                        "subtitles will need forced alignment"
+                    )
+                    words = None
+                else:
+                    words.extend(chunk_words)
+
+            offset += len(audio) / cls.SAMPLE_RATE
+
+        audio = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+        return audio, words
+
+    def save_audio(self, generator, srt_path: Optional[Path] = None) -> Path:
+        """
+        Stitch the paragraph audio into the artifact store and script directory
+
+        Word timings of each paragraph are shifted by the paragraph's offset
+        in the stitched audio and stored with it.
+
+        Args:
+            generator: Chunk generator returned by `synthesize`
+            srt_path: If given, also place the Kokoro-timed word-level SRT here
+
+        Returns:
+            Path to the audio file
+        """
         if generator is None:
-            logger.info("Skipping save_audio - file already exists")
-            return self.output_path
+            logger.info("Skipping synthesis - using cached audio")
+            self.stats = {"cache_hit": True}
+        else:
+            with self.store.writer(
+                self.ARTIFACT_KIND, self.cache_key, self.cache_params
+            ) as tmp_dir:
+                self._write_artifact(generator, tmp_dir)
+
+        return self._materialize(srt_path)
+
+    def audio_buffer(self) -> AudioBuffer:
+        """The script audio in memory; read from disk once on a cache hit"""
+        if self.audio is None:
+            self.audio = AudioBuffer.from_file(self.output_path)
+        return self.audio
+
+    def _write_artifact(self, generator, tmp_dir: Path) -> None:
+        import numpy as np
+        import soundfile as sf
+
+        # The generator synthesizes lazily, so this times the synthesis too
+        started = time.perf_counter()
+        pieces: list[np.ndarray] = []
+        words: Optional[list[dict]] = []
+        # Paragraph index -> [start, end], used for forced alignment later
+        spans: dict[int, list[float]] = {}
+        offset = 0.0
 
         with sf.SoundFile(
-            self.output_path, mode="w", samplerate=24000, channels=1
+            tmp_dir / self.AUDIO_FILE,
+            mode="w",
+            samplerate=self.sample_rate,
+            channels=1,
         ) as f:
-            for _, _, audio in generator:
+            for index, audio, chunk_words in generator:
                 f.write(audio)
+                pieces.append(audio)
+
+                if words is not None and chunk_words is not None:
+                    words.extend(
+                        {**w, "start": w["start"] + offset, "end": w["end"] + offset}
+                        for w in chunk_words
+                    )
+                else:
+                    words = None
+
+                duration = len(audio) / self.sample_rate
+                spans[index] = [offset, offset + duration]
+                offset += duration
+
+        samples = np.concatenate(pieces) if pieces else np.zeros(0, np.float32)
+        self.audio = AudioBuffer(samples, self.sample_rate)
+
+        # Includes paragraphs reused from the chunk cache
+        wall = time.perf_counter() - started
+        self.stats = {
+            "cache_hit": False,
+            "audio_s": round(offset, 3),
+            "synthesis_s": round(wall, 3),
+        }
+        if offset and wall:
+            self.stats["audio_s_per_wall_s"] = round(offset / wall, 2)
+            TTS_SPEED.observe(offset / wall)
+
+        if spans:
+            write_segment_spans(spans, tmp_dir / self.SEGMENTS_FILE)
+        if words:
+            write_word_srt(words, tmp_dir / self.SRT_FILE)
+
+    def _materialize(self, srt_path: Optional[Path]) -> Path:
+        """Link the stored artifact files into the script directory"""
+        kind, key = self.ARTIFACT_KIND, self.cache_key
+        self.store.materialize(
+            self.store.file_path(kind, key, self.AUDIO_FILE), self.output_path
+        )
+
+        segments = self.store.file_path(kind, key, self.SEGMENTS_FILE)
+        if segments is not None:
+            self.store.materialize(segments, self.segments_path)
+        else:
+            self.segments_path.unlink(missing_ok=True)
+
+        if srt_path is not None:
+            srt = self.store.file_path(kind, key, self.SRT_FILE)
+            if srt is not None:
+                self.store.materialize(srt, srt_path)
+                logger.info(f"SRT built from Kokoro timestamps: {srt_path}")
+                write_captions(srt_path)
+            else:
+                # Do not leave subtitles of a previous synthesis behind
+                Path(srt_path).unlink(missing_ok=True)
+                ass_path_for(srt_path).unlink(missing_ok=True)
 
         return self.output_path
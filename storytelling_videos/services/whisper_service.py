@@ -5,7 +5,11 @@ Service for generating word-level subtitles using OpenAI Whisper
 from pathlib import Path
 from typing import Optional
 
-import whisper
+from storytelling_videos.services.caption_service import write_captions
+from storytelling_videos.services.subtitle_service import (
+    format_timestamp,
+    write_word_srt,
+)
 
 
 class WhisperSubtitleGenerator:
@@ -31,6 +35,8 @@ class WhisperSubtitleGenerator:
         Returns:
             Transcription result with word-level timestamps
         """
+        import whisper
+
         self.model = whisper.load_model(model_name)
         result: dict = self.model.transcribe(
             self.audio_path, language="en", verbose=False
@@ -40,11 +46,7 @@ class WhisperSubtitleGenerator:
     @staticmethod
     def format_timestamp(seconds: float) -> str:
         """Format timestamp in SRT format (HH:MM:SS,mmm)"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        millis = int((seconds % 1) * 1000)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+        return format_timestamp(seconds)
 
     def generate_word_level_srt(
         self, output_path: Optional[str] = None, model_name: str = "tiny"
@@ -67,49 +69,23 @@ class WhisperSubtitleGenerator:
         result = self.transcribe(model_name)
 
         # Extract word-level timing from segments
-        srt_content = []
-        subtitle_index = 1
-
+        words: list[dict] = []
         for segment in result.get("segments", []):  # type: ignore
-            # Check if segment has word-level details
             if "words" in segment:  # type: ignore
-                words_list = segment.get("words", [])  # type: ignore
-                for word_info in words_list:
-                    word: str = word_info.get("word", "").strip()  # type: ignore
-                    start: float = float(word_info.get("start", 0))  # type: ignore
-                    end: float = float(word_info.get("end", 0))  # type: ignore
-
-                    if word:  # Skip empty words
-                        start_time = self.format_timestamp(start)
-                        end_time = self.format_timestamp(end)
-
-                        srt_line = (
-                            f"{subtitle_index}\n{start_time} --> {end_time}\n{word}\n"
-                        )
-                        srt_content.append(srt_line)
-                        subtitle_index += 1
+                words.extend(segment.get("words", []))  # type: ignore
             else:
-                # Fallback: If word-level timing not available, create one subtitle per segment
-                word: str = segment.get("text", "").strip()  # type: ignore
-                start: float = float(segment.get("start", 0))  # type: ignore
-                end: float = float(segment.get("end", 0))  # type: ignore
-
-                if word:
-                    start_time = self.format_timestamp(start)
-                    end_time = self.format_timestamp(end)
-
-                    srt_line = (
-                        f"{subtitle_index}\n{start_time} --> {end_time}\n{word}\n"
-                    )
-                    srt_content.append(srt_line)
-                    subtitle_index += 1
-
-        # Write to file
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write("\n".join(srt_content))
+                # Fallback: If word-level timing not available, use the segment
+                words.append(
+                    {
+                        "word": segment.get("text", ""),  # type: ignore
+                        "start": segment.get("start", 0),  # type: ignore
+                        "end": segment.get("end", 0),  # type: ignore
+                    }
+                )
+
+        write_word_srt(words, Path(output_path))
+        # Phrase-grouped ASS next to the SRT, which the renderer burns in
+        write_captions(Path(output_path))
 
         return output_path
 
@@ -2,28 +2,76 @@
 Service for generating word-level subtitles using WhisperX
 """
 
+import bisect
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
 
-import whisperx
-
+from storytelling_videos.core.config_core import settings
 from storytelling_videos.core.loggings import get_logger
+from storytelling_videos.core.metrics import ALIGNMENT_RTF
+from storytelling_videos.core.model_registry import ModelKey, get_model_registry
+from storytelling_videos.services.artifact_store_service import (
+    ArtifactStore,
+    file_sha256,
+)
+from storytelling_videos.services.audio_buffer import AudioBuffer
+from storytelling_videos.services.caption_service import write_captions
+from storytelling_videos.services.inference_client import (
+    get_inference_client,
+    inference_server_enabled,
+)
+from storytelling_videos.services.subtitle_service import (
+    fill_missing_word_timings,
+    script_segments,
+    write_word_srt,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = get_logger(__name__)
 
+# Input rate of the Whisper and wav2vec2 models (whisperx.audio.SAMPLE_RATE)
+SAMPLE_RATE = 16000
+
+# Approximate resident size of faster-whisper models (int8), for the registry
+# budget; ctranslate2 models expose no torch parameters to measure
+WHISPER_SIZE_MB = {
+    "tiny": 75,
+    "base": 145,
+    "small": 480,
+    "medium": 1500,
+    "large": 3000,
+    "large-v2": 3000,
+    "large-v3": 3000,
+}
+
+# Silence between files of a shared transcription batch. As long as one Whisper
+# chunk, so VAD never merges speech of two files into the same chunk.
+BATCH_GAP_SECONDS = 30
+
 
 class WhisperXSubtitleGenerator:
     """Generate word-level SRT subtitles from audio using WhisperX"""
 
-    _model = None
-    _align_model = None
+    ARTIFACT_KIND = "srt"
+    SRT_FILE = "full_sub_words.srt"
 
-    def __init__(self, script_uuid: str, model_name: str = "tiny"):
+    def __init__(
+        self,
+        script_uuid: str,
+        model_name: str = "tiny",
+        audio: Optional[AudioBuffer] = None,
+    ):
         """
         Initialize WhisperX subtitle generator
 
         Args:
-            audio_path: Path to audio file
+            script_uuid: UUID of the script whose audio is subtitled
             model_name: Model to use (tiny, base, small, medium, large)
+            audio: The script audio already in memory; without it the WAV is
+                decoded once from disk
         """
         parent_dir = Path.cwd()
         audio_path = (
@@ -32,108 +80,374 @@ class WhisperXSubtitleGenerator:
         output_srt_path = (
             parent_dir / "saved_audio_kokoro" / script_uuid / "full_sub_words.srt"
         )
+        self.segments_path = (
+            parent_dir
+            / "saved_audio_kokoro"
+            / script_uuid
+            / "full_script_segments.json"
+        )
         self.audio_path = str(audio_path)
         self.model_name = model_name
         self.output_srt_path = output_srt_path
+        self.audio = audio
+        self._audio_16k = None
+        # Realtime factor of the last run, for stage metrics
+        self.stats: dict = {}
         # Try CUDA first, fall back to CPU if unavailable
         self.device = "cpu"
         self.compute_type = "int8"
-        self._load_models()
-
-    def _load_models(self):
-        """Load WhisperX model and alignment model"""
-        if WhisperXSubtitleGenerator._model is None:
-            logger.info(f"Loading WhisperX model: {self.model_name}")
-            WhisperXSubtitleGenerator._model = whisperx.load_model(
-                self.model_name, self.device, compute_type=self.compute_type
-            )
+        self.store = ArtifactStore()
 
-            logger.info("Loading alignment model...")
-            align_model, metadata = whisperx.load_align_model(
-                language_code="en", device=self.device
-            )
+    @staticmethod
+    def asr_model_key(model_name: str, device: str, compute_type: str) -> ModelKey:
+        return ModelKey("whisperx", model_name, "en", device, compute_type)
 
-            WhisperXSubtitleGenerator._align_model = (align_model, metadata)
+    @staticmethod
+    def align_model_key(device: str, language: str = "en") -> ModelKey:
+        return ModelKey("whisperx_align", "wav2vec2", language, device)
 
-    def transcribe(self) -> dict:
+    @classmethod
+    def get_asr_model(cls, model_name: str, device: str, compute_type: str):
+        """Get the WhisperX ASR model for this configuration from the registry"""
+
+        def load():
+            import whisperx
+
+            return whisperx.load_model(model_name, device, compute_type=compute_type)
+
+        return get_model_registry().get(
+            cls.asr_model_key(model_name, device, compute_type),
+            loader=load,
+            size_mb=WHISPER_SIZE_MB.get(model_name),
+        )
+
+    @classmethod
+    def get_align_model(cls, device: str, language: str = "en"):
+        """Get the wav2vec2 alignment model and metadata from the registry"""
+
+        def load():
+            import whisperx
+
+            return whisperx.load_align_model(language_code=language, device=device)
+
+        return get_model_registry().get(
+            cls.align_model_key(device, language), loader=load
+        )
+
+    def load_audio(self) -> "np.ndarray":
+        """The script audio as 16 kHz float32, resampled in memory if possible"""
+        if self._audio_16k is None:
+            if self.audio is not None:
+                self._audio_16k = self.audio.resample(SAMPLE_RATE).samples
+            else:
+                import whisperx
+
+                self._audio_16k = whisperx.load_audio(self.audio_path)
+        return self._audio_16k
+
+    def _record_rtf(self, mode: str, started: float) -> None:
+        """Record processing time over audio duration for the last run"""
+        processing = time.perf_counter() - started
+        duration = len(self.load_audio()) / SAMPLE_RATE
+        self.stats = {
+            "cache_hit": False,
+            "mode": mode,
+            "audio_s": round(duration, 3),
+            "processing_s": round(processing, 3),
+        }
+        if duration:
+            self.stats["realtime_factor"] = round(processing / duration, 4)
+            ALIGNMENT_RTF.observe(processing / duration, mode=mode)
+
+    @classmethod
+    def run_transcription(
+        cls,
+        audio: Union[str, "np.ndarray"],
+        model_name: str,
+        device: str,
+        compute_type: str,
+    ) -> dict:
+        """Transcribe and align 16 kHz audio (or an audio file) in this process"""
+        import whisperx
+
+        if isinstance(audio, str):
+            # Decode once for both transcription and alignment
+            audio = whisperx.load_audio(audio)
+
+        model = cls.get_asr_model(model_name, device, compute_type)
+        result = model.transcribe(
+            audio, language="en", batch_size=settings.WHISPERX_BATCH_SIZE
+        )
+
+        align_model, metadata = cls.get_align_model(device)
+        return whisperx.align(
+            result["segments"],
+            align_model,
+            metadata,
+            audio,
+            device,
+            return_char_alignments=False,
+        )
+
+    @classmethod
+    def run_batch_transcription(
+        cls,
+        audios: list[Union[str, "np.ndarray"]],
+        model_name: str,
+        device: str,
+        compute_type: str,
+    ) -> list[dict]:
         """
-        Transcribe audio and get word-level timestamps using WhisperX
+        Transcribe several 16 kHz buffers (or files) in shared batches, then
+        align each
+
+        The files are concatenated with silent gaps and transcribed in one
+        call, so short clips fill the ASR batch together instead of each
+        running a mostly empty batch. Segments are split back per file by
+        offset before alignment.
 
         Returns:
-            Transcription result with word-level timestamps
+            One alignment result per audio file, in order
         """
+        import numpy as np
+        import whisperx
+
+        audios = [
+            whisperx.load_audio(audio) if isinstance(audio, str) else audio
+            for audio in audios
+        ]
+        gap = np.zeros(BATCH_GAP_SECONDS * SAMPLE_RATE, dtype=np.float32)
+        pieces: list = []
+        offsets: list[float] = []
+        position = 0
+        for audio in audios:
+            offsets.append(position / SAMPLE_RATE)
+            pieces += [audio, gap]
+            position += len(audio) + len(gap)
 
-        result = WhisperXSubtitleGenerator._model.transcribe(
-            self.audio_path, language="en", batch_size=16
+        model = cls.get_asr_model(model_name, device, compute_type)
+        result = model.transcribe(
+            np.concatenate(pieces),
+            language="en",
+            batch_size=settings.WHISPERX_BATCH_SIZE,
         )
 
-        align_model, metadata = WhisperXSubtitleGenerator._align_model
-        result = whisperx.align(
-            result["segments"],
+        per_file: list[list[dict]] = [[] for _ in audios]
+        for segment in result["segments"]:
+            index = max(bisect.bisect_right(offsets, segment["start"]) - 1, 0)
+            duration = len(audios[index]) / SAMPLE_RATE
+            per_file[index].append(
+                {
+                    **segment,
+                    "start": segment["start"] - offsets[index],
+                    "end": min(segment["end"] - offsets[index], duration),
+                }
+            )
+
+        align_model, metadata = cls.get_align_model(device)
+        return [
+            whisperx.align(
+                segments,
+                align_model,
+                metadata,
+                audio,
+                device,
+                return_char_alignments=False,
+            )
+            for segments, audio in zip(per_file, audios)
+        ]
+
+    @classmethod
+    def run_alignment(cls, segments: list[dict], audio, device: str) -> dict:
+        """Force-align known segments against 16 kHz audio in this process"""
+        import whisperx
+
+        align_model, metadata = cls.get_align_model(device)
+        return whisperx.align(
+            segments,
             align_model,
             metadata,
-            self.audio_path,
-            self.device,
+            audio,
+            device,
             return_char_alignments=False,
         )
 
-        return result
+    def transcribe(self) -> dict:
+        """
+        Transcribe audio and get word-level timestamps using WhisperX
 
-    @staticmethod
-    def format_timestamp(seconds: float) -> str:
-        """Format timestamp in SRT format (HH:MM:SS,mmm)"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        millis = int((seconds % 1) * 1000)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
-
-    def generate_word_level_srt(self) -> Path:
+        Runs on the inference server if one is configured.
+
+        Returns:
+            Transcription result with word-level timestamps
+        """
+        kwargs = {
+            "audio": self.load_audio(),
+            "model_name": self.model_name,
+            "device": self.device,
+            "compute_type": self.compute_type,
+        }
+        if inference_server_enabled():
+            return get_inference_client().call("transcribe", **kwargs)
+        return self.run_transcription(**kwargs)
+
+    def align_script(self, script_text: str) -> dict:
+        """
+        Force-align the known script text against the audio
+
+        Skips the Whisper ASR model entirely: the script is split into
+        segments and fed straight into the wav2vec2 alignment step. Runs on
+        the inference server if one is configured.
+
+        Args:
+            script_text: Text that was synthesized into the audio
+
+        Returns:
+            Alignment result with word-level timestamps
+        """
+        audio = self.load_audio()
+        duration = len(audio) / SAMPLE_RATE
+        segments = script_segments(script_text, duration, self.segments_path)
+
+        kwargs = {"segments": segments, "audio": audio, "device": self.device}
+        if inference_server_enabled():
+            return get_inference_client().call("align", **kwargs)
+        return self.run_alignment(**kwargs)
+
+    def generate_word_level_srt(self, script_text: Optional[str] = None) -> Path:
         """
         Generate word-level SRT file from audio
 
+        Args:
+            script_text: Known script text. If given, the text is force-aligned
+                instead of transcribed.
+
         Returns:
             Path to generated SRT file
         """
-        output_file = Path(self.output_srt_path)
-
-        # Skip if SRT already exists
-        if output_file.exists():
-            logger.info(f"SRT file already exists: {self.output_srt_path}")
-            return output_file
-
-        logger.info("Transcribing audio with WhisperX...")
-        result = self.transcribe()
-
-        # Extract word-level timing from segments
-        srt_content = []
-        subtitle_index = 1
-
-        for segment in result.get("segments", []):  # type: ignore
-            # WhisperX provides word-level details in the "words" field
-            if "words" in segment:  # type: ignore
-                words_list = segment.get("words", [])  # type: ignore
-                for word_info in words_list:
-                    word: str = word_info.get("word", "").strip()  # type: ignore
-                    start: float = float(word_info.get("start", 0))  # type: ignore
-                    end: float = float(word_info.get("end", 0))  # type: ignore
-
-                    if word:  # Skip empty words
-                        start_time = self.format_timestamp(start)
-                        end_time = self.format_timestamp(end)
-
-                        srt_line = (
-                            f"{subtitle_index}\n{start_time} --> {end_time}\n{word}\n"
-                        )
-                        srt_content.append(srt_line)
-                        subtitle_index += 1
-
-        # Write to file
-        output_file = Path(self.output_srt_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write("\n".join(srt_content))
+        params = self.cache_params(script_text)
+        key = ArtifactStore.compute_key(self.ARTIFACT_KIND, params)
+        if self.store.lookup(self.ARTIFACT_KIND, key) is not None:
+            logger.info(f"SRT cache hit: {key[:12]}")
+            self.stats = {"cache_hit": True}
+        else:
+            started = time.perf_counter()
+            if script_text is not None:
+                logger.info("Aligning script text with WhisperX (no transcription)...")
+                result = self.align_script(script_text)
+            else:
+                logger.info("Transcribing audio with WhisperX...")
+                result = self.transcribe()
+            self._record_rtf(params["mode"], started)
+            self._store_result(key, params, result)
+
+        return self._materialize(key)
+
+    @classmethod
+    def generate_batch(
+        cls, generators: list["WhisperXSubtitleGenerator"]
+    ) -> list[Path]:
+        """
+        Transcribe several scripts' audio in shared WhisperX batches
+
+        Files already in the artifact store are skipped; the rest are grouped
+        by model configuration and transcribed together.
+
+        Args:
+            generators: One generator per script
+
+        Returns:
+            Path to the SRT file of each generator, in order
+        """
+        keys = []
+        groups: dict[tuple, list] = {}
+        for generator in generators:
+            params = generator.cache_params()
+            key = ArtifactStore.compute_key(cls.ARTIFACT_KIND, params)
+            keys.append(key)
+            generator.stats = {"cache_hit": True}
+            if generator.store.lookup(cls.ARTIFACT_KIND, key) is None:
+                config = (
+                    generator.model_name,
+                    generator.device,
+                    generator.compute_type,
+                )
+                groups.setdefault(config, []).append((generator, key, params))
+
+        for (model_name, device, compute_type), group in groups.items():
+            logger.info(
+                f"Transcribing {len(group)} files with WhisperX {model_name} "
+                f"in shared batches..."
+            )
+            kwargs = {
+                "audios": [generator.load_audio() for generator, _, _ in group],
+                "model_name": model_name,
+                "device": device,
+                "compute_type": compute_type,
+            }
+            started = time.perf_counter()
+            if inference_server_enabled():
+                results = get_inference_client().call("transcribe_batch", **kwargs)
+            else:
+                results = cls.run_batch_transcription(**kwargs)
+            processing = time.perf_counter() - started
+            duration = sum(len(audio) for audio in kwargs["audios"]) / SAMPLE_RATE
+            if duration:
+                ALIGNMENT_RTF.observe(processing / duration, mode="transcribe_batch")
+
+            for (generator, key, params), result in zip(group, results):
+                generator.stats = {
+                    "cache_hit": False,
+                    "mode": "transcribe_batch",
+                    "batch_files": len(group),
+                    "batch_processing_s": round(processing, 3),
+                }
+                if duration:
+                    generator.stats["realtime_factor"] = round(processing / duration, 4)
+                generator._store_result(key, params, result)
+
+        return [generator._materialize(key) for generator, key in zip(generators, keys)]
 
+    def _store_result(self, key: str, params: dict, result: dict) -> None:
+        """Write the word-level SRT of a WhisperX result into the store"""
+        # WhisperX provides word-level details in the "words" field
+        words = [
+            word_info
+            for segment in result.get("segments", [])  # type: ignore
+            for word_info in segment.get("words", [])  # type: ignore
+        ]
+        with self.store.writer(self.ARTIFACT_KIND, key, params) as tmp_dir:
+            write_word_srt(fill_missing_word_timings(words), tmp_dir / self.SRT_FILE)
+
+    def _materialize(self, key: str) -> Path:
+        """Link the stored SRT into the script directory and build its captions"""
+        self.store.materialize(
+            self.store.file_path(self.ARTIFACT_KIND, key, self.SRT_FILE),
+            Path(self.output_srt_path),
+        )
         logger.info(f"SRT file saved to: {self.output_srt_path}")
+        write_captions(self.output_srt_path)
         return self.output_srt_path
+
+    def cache_params(self, script_text: Optional[str] = None) -> dict:
+        """Inputs that determine the subtitles, used as the artifact key"""
+        params = {
+            "audio_sha256": file_sha256(Path(self.audio_path)),
+            "align_language": "en",
+        }
+        if script_text is not None:
+            segments_path = Path(self.segments_path)
+            params.update(
+                mode="align",
+                script_text=script_text,
+                segments_sha256=(
+                    file_sha256(segments_path) if segments_path.exists() else None
+                ),
+            )
+        else:
+            params.update(
+                mode="transcribe",
+                model_name=self.model_name,
+                compute_type=self.compute_type,
+            )
+        return params
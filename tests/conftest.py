@@ -0,0 +1,11 @@
+import os
+
+# Settings fail validation without these; the tests never reach the services
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+for name in (
+    "OPENROUTER_API",
+    "CLIENT_ID",
+    "CLIENT_SECRET",
+    "USER_AGENT",
+):
+    os.environ.setdefault(name, "test")
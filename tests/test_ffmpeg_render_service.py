@@ -0,0 +1,45 @@
+import math
+
+from storytelling_videos.services.ffmpeg_render_service import plan_segments
+
+FPS = 30
+
+
+def test_even_split_without_keyframes():
+    assert plan_segments(0, 30, FPS, [], 3, 5) == [
+        (0.0, 300),
+        (10.0, 300),
+        (20.0, 300),
+    ]
+
+
+def test_boundaries_snap_to_nearest_keyframe():
+    assert plan_segments(0, 30, FPS, [0, 9.5, 20.2, 29], 3, 5) == [
+        (0.0, 285),
+        (9.5, 321),
+        (20.2, 294),
+    ]
+
+
+def test_keyframe_leaving_short_chunk_is_rejected():
+    # The nearest keyframe to the split at 6s is 11.9s, 3 frames from the end
+    assert plan_segments(0, 12, FPS, [0, 11.9], 3, 5) == [(0.0, 360)]
+
+
+def test_falls_back_to_farther_keyframe():
+    # 17s is nearest to the split at 20s but only 3s after the 14s boundary
+    assert plan_segments(0, 30, FPS, [0, 14, 17, 24], 3, 5) == [
+        (0.0, 420),
+        (14.0, 300),
+        (24.0, 180),
+    ]
+
+
+def test_chunks_are_never_shorter_than_minimum():
+    keyframes = [i * 0.7 for i in range(100)]
+    for duration in (10, 23.3, 41, 67.9):
+        plan = plan_segments(1.5, duration, FPS, keyframes, 8, 4)
+        frames = [count for _, count in plan]
+        assert sum(frames) == math.ceil(duration * FPS)
+        if len(plan) > 1:
+            assert min(frames) >= 4 * FPS